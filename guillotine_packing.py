@@ -56,6 +56,11 @@ Usage :
 
 from __future__ import annotations
 
+import multiprocessing
+import os
+from bisect import insort
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 
 __version__ = "1.0.0"
@@ -68,20 +73,29 @@ __all__ = [
     "Placement",
     "PlanDecoupe",
     "optimiser_debit",
+    "map_processus",
 ]
 
 # Taille standard des panneaux bruts (mm)
 PANNEAU_STD_LONGUEUR: float = 2800
 PANNEAU_STD_LARGEUR: float = 2070
 
+# Nombre minimal de pieces unitaires a placer pour repartir les groupes
+# (epaisseur, couleur) sur plusieurs processus. Mesure sur deux groupes
+# equilibres : le demarrage d'un pool (spawn, ~0.3 s) et le transfert des
+# pieces et des plans ne sont rentabilises, avec 2 processus, qu'au-dela
+# d'environ 7000 pieces (4000 : 0.54 s en serie contre ~0.74 s en pool ;
+# 8000 : 1.86 s contre ~1.64 s).
+SEUIL_PACKING_PARALLELE: int = 8000
+
 
 # =========================================================================
 #  DATACLASSES
 # =========================================================================
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ParametresDebit:
-    """Parametres de decoupe.
+    """Parametres de decoupe (immuables, une instance peut etre partagee).
 
     Attributs:
         trait_scie:       Largeur du trait de scie en mm (espace perdu entre pieces).
@@ -100,9 +114,9 @@ class ParametresDebit:
     sens_fil: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PieceDebit:
-    """Piece rectangulaire a decouper.
+    """Piece rectangulaire a decouper (immuable, creee en grand nombre).
 
     Attributs:
         nom:       Designation de la piece (ex: "Rayon", "Separation").
@@ -256,21 +270,73 @@ def optimiser_debit(
             )
             groupes.setdefault(key, []).append((piece_unit, ld, wd))
 
-    plans: list[PlanDecoupe] = []
-
-    for (ep, couleur), group in groupes.items():
-        # Trier par surface decroissante
+    # Trier chaque groupe par surface decroissante
+    for group in groupes.values():
         group.sort(key=lambda x: x[1] * x[2], reverse=True)
 
-        plans_groupe = _bin_packing_guillotine(
-            group, panneau_utile_l, panneau_utile_w,
-            ep, couleur, params.trait_scie,
-        )
+    # Les groupes sont independants : les repartir sur plusieurs processus
+    # lorsque le volume le justifie (l'ordre des plans est conserve).
+    args = (
+        list(groupes.values()),
+        [panneau_utile_l] * len(groupes),
+        [panneau_utile_w] * len(groupes),
+        [ep for ep, _ in groupes],
+        [couleur for _, couleur in groupes],
+        [params.trait_scie] * len(groupes),
+    )
+    nb_unites = sum(len(group) for group in groupes.values())
+    resultats = None
+    if nb_unites >= SEUIL_PACKING_PARALLELE:
+        resultats = map_processus(_bin_packing_guillotine, *args,
+                                  nb_taches=len(groupes))
+    if resultats is None:
+        resultats = map(_bin_packing_guillotine, *args)
+
+    plans: list[PlanDecoupe] = []
+    for plans_groupe in resultats:
         plans.extend(plans_groupe)
 
     return plans, hors_gabarit
 
 
+# =========================================================================
+#  CALCUL PARALLELE
+# =========================================================================
+
+def map_processus(fonction, *iterables, nb_taches: int,
+                  chunksize: int = 1) -> list | None:
+    """Applique ``fonction`` aux elements de ``iterables`` dans un pool de processus.
+
+    Equivalent a ``list(map(fonction, *iterables))``, resultats dans l'ordre.
+    Les processus sont demarres en ``spawn`` et non en ``fork`` : l'appelant
+    peut etre un processus multi-threads (interface Qt), ou un enfant forke
+    peut se bloquer sur un verrou tenu par un autre thread au moment du fork.
+    ``fonction`` doit donc etre definie au niveau d'un module importable.
+
+    Args:
+        fonction: Fonction a appliquer.
+        *iterables: Arguments, comme pour ``map``.
+        nb_taches: Nombre de taches, pour dimensionner le pool.
+        chunksize: Nombre de taches envoyees a la fois a un processus.
+
+    Returns:
+        Liste des resultats, ou None si moins de deux processus seraient
+        utilises (un seul coeur ou une seule tache) ou si le pool n'a pas pu
+        fonctionner : l'appelant fait alors le calcul en serie.
+    """
+    nb_workers = min(nb_taches, os.cpu_count() or 1)
+    if nb_workers < 2:
+        return None
+    try:
+        with ProcessPoolExecutor(
+            max_workers=nb_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as ex:
+            return list(ex.map(fonction, *iterables, chunksize=chunksize))
+    except (OSError, BrokenProcessPool):
+        return None
+
+
 # =========================================================================
 #  FONCTIONS INTERNES
 # =========================================================================
@@ -331,29 +397,23 @@ def _bin_packing_guillotine(
 def _trouver_meilleure_zone(
     zones: list[ZoneLibre], ld: float, wd: float, sens_fil: bool
 ) -> tuple[int, bool, float]:
-    """Trouve la zone libre la mieux adaptee. Retourne (index, rotation, score)."""
-    best_idx = -1
-    best_rotation = False
-    best_score = float('inf')
+    """Trouve la zone libre la mieux adaptee. Retourne (index, rotation, score).
 
+    Les zones libres d'un plan sont maintenues triees par surface croissante
+    (voir ``_effectuer_placement``) : la premiere zone qui accepte la piece
+    est donc celle qui laisse le moins de chute, et le parcours s'arrete
+    des qu'elle est trouvee.
+    """
     for i, zone in enumerate(zones):
-        # Orientation normale
-        if ld <= zone.w and wd <= zone.h:
-            score = zone.surface - ld * wd
-            if score < best_score:
-                best_score = score
-                best_idx = i
-                best_rotation = False
-
-        # Orientation pivotee
-        if not sens_fil and wd <= zone.w and ld <= zone.h:
-            score = zone.surface - ld * wd
-            if score < best_score:
-                best_score = score
-                best_idx = i
-                best_rotation = True
+        zw = zone.w
+        zh = zone.h
+        # Orientation normale, puis pivotee
+        if ld <= zw and wd <= zh:
+            return i, False, zw * zh - ld * wd
+        if not sens_fil and wd <= zw and ld <= zh:
+            return i, True, zw * zh - ld * wd
 
-    return best_idx, best_rotation, best_score
+    return -1, False, float('inf')
 
 
 def _effectuer_placement(
@@ -402,13 +462,15 @@ def _effectuer_placement(
     max_a = max((z.surface for z in zones_a), default=0)
     max_b = max((z.surface for z in zones_b), default=0)
 
-    if max_a >= max_b:
-        plan.zones_libres.extend(zones_a)
-    else:
-        plan.zones_libres.extend(zones_b)
+    # Inserer les nouvelles zones en conservant le tri par surface
+    # croissante (best fit) : la liste restante est deja triee.
+    for z in (zones_a if max_a >= max_b else zones_b):
+        insort(plan.zones_libres, z, key=_surface_zone)
+
 
-    # Trier par surface croissante (best fit)
-    plan.zones_libres.sort(key=lambda z: z.surface)
+def _surface_zone(zone: ZoneLibre) -> float:
+    """Cle de tri des zones libres (surface)."""
+    return zone.w * zone.h
 
 
 # =========================================================================
@@ -5,7 +5,8 @@ type (presets) et pieces manuelles dans une base de donnees SQLite locale.
 
 Il expose la classe ``Database`` qui encapsule toutes les operations CRUD
 ainsi que les constantes ``PARAMS_DEFAUT`` et ``SCHEMA_DEFAUT`` utilisees
-lors de la creation d'un nouvel amenagement.
+lors de la creation d'un nouvel amenagement, et ``charger_params`` qui
+decode les parametres stockes.
 """
 
 import sqlite3
@@ -160,6 +161,26 @@ CLES_CONFIG_TYPE = [
 ]
 
 
+def charger_params(params_json: str | None) -> dict:
+    """Decode les parametres JSON d'un amenagement.
+
+    Point d'entree unique pour lire la colonne ``params_json`` : une valeur
+    vide ou invalide donne les parametres par defaut.
+
+    Args:
+        params_json: Texte JSON tel que stocke en base, ou None.
+
+    Returns:
+        Dictionnaire des parametres.
+    """
+    if not params_json:
+        return dict(PARAMS_DEFAUT)
+    try:
+        return json.loads(params_json)
+    except json.JSONDecodeError:
+        return dict(PARAMS_DEFAUT)
+
+
 class Database:
     """Gestionnaire de base de donnees SQLite pour PlacardCAD.
 
@@ -395,6 +416,30 @@ class Database:
         ).fetchone()
         return dict(row) if row else None
 
+    def get_amenagements(self, amenagement_ids: list[int]) -> dict[int, dict]:
+        """Retourne plusieurs amenagements en une requete par lot de 500 ids.
+
+        Args:
+            amenagement_ids: Identifiants des amenagements recherches.
+
+        Returns:
+            Dictionnaire ``{id: amenagement}`` ; les identifiants inexistants
+            sont absents.
+        """
+        ids = list(amenagement_ids)
+        amenagements = {}
+        # Lots bornes : SQLite limite le nombre de parametres par requete
+        for debut in range(0, len(ids), 500):
+            lot = ids[debut:debut + 500]
+            rows = self.conn.execute(
+                "SELECT * FROM amenagements WHERE id IN "
+                f"({', '.join('?' * len(lot))})",
+                lot
+            ).fetchall()
+            for r in rows:
+                amenagements[r["id"]] = dict(r)
+        return amenagements
+
     def lister_amenagements(self, projet_id: int) -> list[dict]:
         """Retourne les amenagements d'un projet tries par numero croissant.
 
@@ -411,11 +456,31 @@ class Database:
         ).fetchall()
         return [dict(r) for r in rows]
 
+    def lister_amenagements_par_projet(self) -> dict[int, list[dict]]:
+        """Retourne tous les amenagements, regroupes par projet, en une requete.
+
+        Evite un appel a ``lister_amenagements`` par projet lorsque l'on
+        parcourt l'ensemble des projets.
+
+        Returns:
+            Dictionnaire ``{projet_id: [amenagement, ...]}``, chaque liste
+            etant triee par numero croissant. Les projets sans amenagement
+            sont absents.
+        """
+        rows = self.conn.execute(
+            "SELECT * FROM amenagements ORDER BY projet_id, numero"
+        ).fetchall()
+        par_projet: dict[int, list[dict]] = {}
+        for r in rows:
+            par_projet.setdefault(r["projet_id"], []).append(dict(r))
+        return par_projet
+
     def get_params(self, amenagement_id: int) -> dict:
         """Retourne les parametres d'un amenagement sous forme de dictionnaire.
 
-        Si l'amenagement n'existe pas ou si ses parametres sont vides,
-        retourne une copie de ``PARAMS_DEFAUT``.
+        Si l'amenagement n'existe pas ou si ses parametres sont vides ou
+        invalides, retourne une copie de ``PARAMS_DEFAUT`` (voir
+        ``charger_params``).
 
         Args:
             amenagement_id: Identifiant de l'amenagement.
@@ -428,9 +493,7 @@ class Database:
             "SELECT params_json FROM amenagements WHERE id = ?",
             (amenagement_id,)
         ).fetchone()
-        if row and row["params_json"]:
-            return json.loads(row["params_json"])
-        return dict(PARAMS_DEFAUT)
+        return charger_params(row["params_json"] if row else None)
 
     # --- Configurations type (presets) ---
 
@@ -632,3 +695,30 @@ class Database:
             (projet_id,)
         ).fetchall()
         return [dict(r) for r in rows]
+
+    def lister_pieces_manuelles_par_projet(self) -> dict[int, list[dict]]:
+        """Retourne toutes les pieces manuelles, regroupees par projet.
+
+        Returns:
+            Dictionnaire ``{projet_id: [piece, ...]}`` (pieces triees par id).
+            Les projets sans piece manuelle sont absents.
+        """
+        rows = self.conn.execute(
+            "SELECT * FROM pieces_manuelles ORDER BY projet_id, id"
+        ).fetchall()
+        par_projet: dict[int, list[dict]] = {}
+        for r in rows:
+            par_projet.setdefault(r["projet_id"], []).append(dict(r))
+        return par_projet
+
+    def compter_pieces_manuelles_par_projet(self) -> dict[int, int]:
+        """Retourne le nombre de pieces manuelles de chaque projet.
+
+        Returns:
+            Dictionnaire ``{projet_id: nombre}``. Les projets sans piece
+            manuelle sont absents.
+        """
+        rows = self.conn.execute(
+            "SELECT projet_id, COUNT(*) FROM pieces_manuelles GROUP BY projet_id"
+        ).fetchall()
+        return {r[0]: r[1] for r in rows}
@@ -19,7 +19,9 @@ from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 
 from .placard_builder import FicheFabrication, PieceInfo
-from .optimisation_debit import pieces_depuis_fiche, ParametresDebit
+from .optimisation_debit import (
+    PARAMS_DEBIT_DEFAUT, ParametresDebit, pieces_depuis_fiche,
+)
 from guillotine_packing import optimiser_debit
 
 
@@ -58,7 +60,7 @@ def generer_liste_courses(
             - visserie: list[dict] - {nom, quantite, description}.
     """
     if params_debit is None:
-        params_debit = ParametresDebit()
+        params_debit = PARAMS_DEBIT_DEFAUT
 
     # --- Collecter toutes les pieces et quincaillerie ---
     all_fiches: list[FicheFabrication] = []
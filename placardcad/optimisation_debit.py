@@ -2,7 +2,8 @@
 
 Ce module re-exporte le moteur standalone ``guillotine_packing``
 et ajoute la fonction ``pieces_depuis_fiche`` qui fait le pont
-entre la FicheFabrication de PlacardCAD et les PieceDebit du moteur.
+entre la FicheFabrication de PlacardCAD et les PieceDebit du moteur
+(en deux temps, via les donnees immuables de ``donnees_debit_fiche``).
 
 Pour utiliser le moteur d'optimisation dans un autre projet,
 importez directement ``guillotine_packing`` (aucune dependance).
@@ -16,6 +17,10 @@ Re-exports:
     Placement: Dataclass representant le placement d'une piece.
     PlanDecoupe: Dataclass representant un plan de decoupe complet.
     optimiser_debit: Fonction principale d'optimisation de debit.
+    map_processus: Execution d'une fonction dans un pool de processus.
+
+Constantes:
+    PARAMS_DEBIT_DEFAUT: Instance partagee des parametres de debit par defaut.
 """
 
 # Re-export complet du moteur standalone
@@ -28,15 +33,70 @@ from guillotine_packing import (  # noqa: F401
     Placement,
     PlanDecoupe,
     optimiser_debit,
+    map_processus,
 )
 
-from .placard_builder import FicheFabrication
+from .database import charger_params
+from .placard_builder import FicheFabrication, generer_fiche
+from .schema_parser import schema_vers_config
+
+
+# Parametres par defaut partages (ParametresDebit est immuable)
+PARAMS_DEBIT_DEFAUT = ParametresDebit()
 
 
 # =========================================================================
 #  CONVERSION FICHE -> PIECES (specifique PlacardCAD)
 # =========================================================================
 
+def donnees_debit_fiche(fiche: FicheFabrication) -> tuple[tuple, ...]:
+    """Extrait les donnees de debit d'une fiche sous forme immuable.
+
+    Exclut les tasseaux (bois massif, pas de debit panneau). Le resultat ne
+    depend ni du projet ni de l'amenagement et ne peut pas etre modifie :
+    il peut etre memorise et partage entre amenagements identiques.
+
+    Args:
+        fiche: Fiche de fabrication source.
+
+    Returns:
+        Un tuple par piece a debiter : ``(numero, nom, reference, longueur,
+        largeur, epaisseur, couleur, quantite, sens_fil)``, ou ``numero`` est
+        le rang de la piece dans la fiche (a partir de 1) et ``reference``
+        celle deja attribuee a la piece (chaine vide sinon).
+    """
+    return tuple(
+        (i, p.nom, p.reference, p.longueur, p.largeur, p.epaisseur,
+         p.couleur_fab or "Standard", p.quantite, getattr(p, "sens_fil", True))
+        for i, p in enumerate(fiche.pieces, 1)
+        # Les tasseaux sont du bois massif, pas du panneau a debiter
+        if not (p.materiau and "tasseau" in p.materiau.lower())
+    )
+
+
+def pieces_depuis_donnees(donnees: tuple[tuple, ...],
+                          projet_id: int = 0,
+                          amenagement_id: int = 0) -> list[PieceDebit]:
+    """Construit les PieceDebit d'un amenagement depuis ``donnees_debit_fiche``.
+
+    Les pieces sans reference recoivent ``P{projet}/A{amenagement}/N{rang}``.
+    """
+    return [
+        PieceDebit(
+            nom=nom,
+            reference=ref or f"P{projet_id}/A{amenagement_id}/N{i:02d}",
+            longueur=longueur,
+            largeur=largeur,
+            epaisseur=epaisseur,
+            couleur=couleur,
+            quantite=quantite,
+            sens_fil=sens_fil,
+        )
+        for (i, nom, ref, longueur, largeur, epaisseur, couleur, quantite,
+             sens_fil) in donnees
+    ]
+
+
 def pieces_depuis_fiche(fiche: FicheFabrication,
                         projet_id: int = 0,
                         amenagement_id: int = 0) -> list[PieceDebit]:
@@ -44,20 +104,43 @@ def pieces_depuis_fiche(fiche: FicheFabrication,
 
     Exclut les tasseaux (bois massif, pas de debit panneau).
     """
-    pieces = []
-    for i, p in enumerate(fiche.pieces, 1):
-        # Les tasseaux sont du bois massif, pas du panneau a debiter
-        if p.materiau and "tasseau" in p.materiau.lower():
-            continue
-        ref = p.reference or f"P{projet_id}/A{amenagement_id}/N{i:02d}"
-        pieces.append(PieceDebit(
-            nom=p.nom,
-            reference=ref,
-            longueur=p.longueur,
-            largeur=p.largeur,
-            epaisseur=p.epaisseur,
-            couleur=p.couleur_fab or "Standard",
-            quantite=p.quantite,
-            sens_fil=getattr(p, "sens_fil", True),
-        ))
-    return pieces
+    return pieces_depuis_donnees(donnees_debit_fiche(fiche),
+                                 projet_id, amenagement_id)
+
+
+# =========================================================================
+#  SCHEMA -> DONNEES DE DEBIT (utilisable dans un pool de processus)
+# =========================================================================
+
+def donnees_debit_schema(schema_txt: str,
+                         params_json: str | None) -> tuple[tuple, ...]:
+    """Genere les donnees de debit d'un amenagement tel que stocke en base.
+
+    Sans dependance a l'interface : peut s'executer dans un processus de
+    calcul sans importer PyQt5.
+
+    Args:
+        schema_txt: Schema compact de l'amenagement.
+        params_json: Parametres JSON de l'amenagement (ou None).
+
+    Returns:
+        Donnees de debit (voir ``donnees_debit_fiche``).
+    """
+    config = schema_vers_config(schema_txt, charger_params(params_json))
+    return donnees_debit_fiche(generer_fiche(config))
+
+
+def donnees_debit_schema_ou_erreur(cle: tuple[str, str | None]):
+    """Variante de ``donnees_debit_schema`` pour ``map_processus``.
+
+    Args:
+        cle: Couple ``(schema_txt, params_json)``.
+
+    Returns:
+        Tuple ``(donnees, None)``, ou ``(None, message)`` si la generation
+        echoue : l'erreur est retournee, pas levee.
+    """
+    try:
+        return donnees_debit_schema(*cle), None
+    except Exception as e:
+        return None, str(e)
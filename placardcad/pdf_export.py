@@ -15,15 +15,23 @@ Chaque page d'amenagement contient:
 """
 
 import re
+import weakref
+from collections.abc import Iterable, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen import canvas
 
-from .placard_builder import Rect as PlacardRect, FicheFabrication
+from .placard_builder import (
+    Rect as PlacardRect, FicheFabrication, grouper_par_type,
+)
 from .optimisation_debit import (
-    ParametresDebit, PlanDecoupe, Placement,
+    PARAMS_DEBIT_DEFAUT, ParametresDebit, PlanDecoupe, Placement,
     optimiser_debit, pieces_depuis_fiche,
 )
 
@@ -44,6 +52,35 @@ COULEURS_TYPE = {
     "tasseau": (colors.Color(0.85, 0.65, 0.13), colors.Color(0.55, 0.41, 0.08)),
 }
 
+# Couleurs fixes des traces (instanciees une seule fois a l'import)
+_C_HACHURE_FOND = colors.Color(0.85, 0.85, 0.85)
+_C_HACHURE_TRAIT = colors.Color(0.33, 0.33, 0.33)
+_C_RAPPEL_COMP = colors.Color(0.67, 0.83, 1.0)
+_C_COTE_COMP = colors.Color(0.0, 0.4, 0.8)
+_C_RAPPEL_HAUTEUR = colors.Color(1.0, 0.83, 0.67)
+_C_COTE_HAUTEUR = colors.Color(0.8, 0.4, 0.0)
+_C_COTE_RAYON = colors.Color(0.0, 0.55, 0.27)
+_C_ENTETE_TABLEAU = colors.Color(0.2, 0.2, 0.2)
+_C_LIGNE_ALTERNEE = colors.Color(0.95, 0.95, 0.95)
+_C_PANNEAU_FOND = colors.Color(0.96, 0.94, 0.90)
+_C_PANNEAU_TRAIT = colors.Color(0.4, 0.35, 0.3)
+_C_GRIS_FONCE = colors.Color(0.3, 0.3, 0.3)
+_C_TEXTE_PIECE = colors.Color(0.15, 0.15, 0.15)
+_C_FILIGRANE = colors.Color(0.35, 0.33, 0.30, alpha=0.25)
+
+# Chasse des caracteres ASCII (en 1/1000 de corps) des polices de mise en
+# page, mesuree une seule fois a l'import.
+_CHASSES_ASCII = {
+    police: tuple(pdfmetrics.stringWidth(chr(i), police, 1000)
+                  for i in range(128))
+    for police in ("Helvetica", "Helvetica-Bold")
+}
+
+# Formats des cotes et dimensions, appeles une fois par piece ou par cote :
+# la methode format liee evite de re-analyser le gabarit a chaque appel.
+_FMT_MM = "{:.0f}".format
+_FMT_DIM = "{:.0f}x{:.0f}".format
+
 
 # =========================================================================
 #  HELPERS
@@ -67,6 +104,168 @@ def _attribuer_references(fiche: FicheFabrication, projet_id: int = 0,
         piece.reference = f"P{p_id}/A{a_id}/N{i:02d}"
 
 
+# Police courante (nom, corps) de chaque canvas, telle que fixee par _police.
+# Suivie ici plutot que lue dans les attributs prives du canvas ; elle est
+# oubliee a chaque page (_nouvelle_page) et retablie apres restoreState
+# (_etat_graphique), comme le fait ReportLab.
+_polices_courantes: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _police(c: canvas.Canvas, nom: str, taille: float):
+    """Selectionne une police seulement si elle differe de la police courante.
+
+    Un appel redondant n'emet aucun operateur PDF.
+
+    Args:
+        c: Canvas ReportLab.
+        nom: Nom de la police.
+        taille: Corps en points.
+    """
+    police = (nom, taille)
+    if _polices_courantes.get(c) != police:
+        c.setFont(nom, taille)
+        _polices_courantes[c] = police
+
+
+def _nouvelle_page(c: canvas.Canvas):
+    """Termine la page courante ; ReportLab y reinitialise la police."""
+    c.showPage()
+    _polices_courantes.pop(c, None)
+
+
+@contextmanager
+def _etat_graphique(c: canvas.Canvas):
+    """Encadre un bloc par saveState/restoreState en suivant la police.
+
+    La police fixee par ``_police`` dans le bloc est annulee par
+    restoreState : la police suivie redevient celle d'avant le bloc.
+
+    Args:
+        c: Canvas ReportLab.
+    """
+    police = _polices_courantes.get(c)
+    c.saveState()
+    try:
+        yield
+    finally:
+        c.restoreState()
+        if police is None:
+            _polices_courantes.pop(c, None)
+        else:
+            _polices_courantes[c] = police
+
+
+@lru_cache(maxsize=4096)
+def _tronquer(texte: str, longueur: int) -> str:
+    """Tronque un libelle a ``longueur`` caracteres (resultat memorise).
+
+    Les memes noms de pieces reviennent sur de nombreuses lignes et pages ;
+    la memoisation evite de recreer la meme sous-chaine a chaque fois.
+
+    Args:
+        texte: Libelle a tronquer.
+        longueur: Nombre maximal de caracteres conserves.
+
+    Returns:
+        Le libelle tronque.
+    """
+    return texte[:longueur]
+
+
+@lru_cache(maxsize=4096)
+def _largeur_texte(texte: str, police: str, taille: float) -> float:
+    """Largeur d'un texte en points, via la table de chasses precalculee.
+
+    Les textes non ASCII ou les polices absentes de la table sont mesures
+    par ReportLab. Le resultat est memorise : les memes cotes et references
+    reviennent sur toutes les pages d'un export projet.
+
+    Args:
+        texte: Texte a mesurer.
+        police: Nom de la police.
+        taille: Corps de la police en points.
+
+    Returns:
+        Largeur du texte en points.
+    """
+    chasses = _CHASSES_ASCII.get(police)
+    if chasses is None or not texte.isascii():
+        return pdfmetrics.stringWidth(texte, police, taille)
+    return sum(map(chasses.__getitem__, map(ord, texte))) * taille * 0.001
+
+
+def _texte_centre(c: canvas.Canvas, x: float, y: float, texte: str):
+    """Equivalent de drawCentredString avec largeur memorisee.
+
+    Le texte est centre en x dans la police courante du canvas. Si elle
+    n'a pas ete fixee par ``_police`` sur cette page, la mesure est laissee
+    a ReportLab.
+
+    Args:
+        c: Canvas ReportLab.
+        x: Abscisse du centre du texte en points PDF.
+        y: Ordonnee de la ligne de base en points PDF.
+        texte: Texte a dessiner.
+    """
+    police = _polices_courantes.get(c)
+    if police is None:
+        c.drawCentredString(x, y, texte)
+    else:
+        c.drawString(x - _largeur_texte(texte, *police) / 2, y, texte)
+
+
+def _dessiner_lignes(c: canvas.Canvas, x: float, y: float, lignes: list[str],
+                     y_min: float, interligne: float) -> float:
+    """Dessine des lignes de texte successives dans un seul objet texte.
+
+    Les lignes sont emises de haut en bas tant que leur ligne de base reste
+    au-dessus de y_min, avec la police et la couleur courantes du canvas.
+
+    Args:
+        c: Canvas ReportLab.
+        x: Abscisse du debut des lignes en points PDF.
+        y: Ligne de base de la premiere ligne en points PDF.
+        lignes: Textes a dessiner, dans l'ordre.
+        y_min: Ligne de base minimale ; les lignes plus basses sont omises.
+        interligne: Pas vertical entre deux lignes en points.
+
+    Returns:
+        Position Y sous la derniere ligne dessinee.
+    """
+    nb = 0
+    y_fin = y
+    while nb < len(lignes) and y_fin >= y_min:
+        nb += 1
+        y_fin -= interligne
+    if nb:
+        t = c.beginText(x, y)
+        t.setLeading(interligne)
+        for ligne in lignes[:nb]:
+            t.textLine(ligne)
+        c.drawText(t)
+    return y_fin
+
+
+# Numero de compartiment dans le libelle d'un rayon ("Rayon C2 R1")
+_RE_RAYON_COMP = re.compile(r'Rayon C(\d+)')
+
+def _enregistrer_pdf(c: canvas.Canvas, filepath: str):
+    """Finalise le canvas et ecrit le PDF sur disque d'un seul bloc.
+
+    ReportLab construit d'abord le document complet en memoire, qui est
+    ensuite ecrit en une seule ecriture. Le fichier n'est ouvert qu'une
+    fois le dessin termine : une erreur de dessin ne laisse pas de PDF
+    tronque.
+
+    Args:
+        c: Canvas ReportLab entierement dessine.
+        filepath: Chemin du fichier PDF de destination.
+    """
+    donnees = c.getpdfdata()
+    with open(filepath, "wb") as f:
+        f.write(donnees)
+
+
 def _calculer_chants(fiche: FicheFabrication) -> dict:
     """Calcule le metrage lineaire de chant par couleur et epaisseur.
 
@@ -97,10 +296,95 @@ def _calculer_chants(fiche: FicheFabrication) -> dict:
     return chants
 
 
+@dataclass(slots=True)
+class _ArtefactsAmenagement:
+    """Donnees derivees d'une fiche, calculees une seule fois par amenagement.
+
+    Attributes:
+        chants: Metrage de chant par (couleur, epaisseur), cf. _calculer_chants.
+        materiaux: Resume {(epaisseur, couleur, materiau): {"surface", "nb"}}.
+        surface: Surface totale des pieces en m2.
+        pieces_debit: PieceDebit de l'amenagement (sans les tasseaux).
+    """
+    chants: dict
+    materiaux: dict
+    surface: float
+    pieces_debit: list
+
+
+def _preparer_artefacts(fiche: FicheFabrication, projet_id: int = 0,
+                        amenagement_id: int = 0) -> _ArtefactsAmenagement:
+    """Attribue les references et calcule les artefacts d'un amenagement.
+
+    Regroupe en un seul endroit les passes sur fiche.pieces necessaires a la
+    page d'amenagement et au debit, pour ne pas les refaire a chaque appel.
+
+    Args:
+        fiche: Fiche de fabrication de l'amenagement.
+        projet_id: Identifiant du projet pour les references.
+        amenagement_id: Identifiant de l'amenagement pour les references.
+
+    Returns:
+        Artefacts de l'amenagement.
+    """
+    _attribuer_references(fiche, projet_id, amenagement_id)
+
+    materiaux = {}
+    surface = 0.0
+    for p in fiche.pieces:
+        surface_piece = p.longueur * p.largeur * p.quantite / 1e6
+        surface += surface_piece
+        info = materiaux.setdefault((p.epaisseur, p.couleur_fab, p.materiau),
+                                    {"surface": 0, "nb": 0})
+        info["surface"] += surface_piece
+        info["nb"] += p.quantite
+
+    return _ArtefactsAmenagement(
+        chants=_calculer_chants(fiche),
+        materiaux=materiaux,
+        surface=surface,
+        pieces_debit=pieces_depuis_fiche(fiche, projet_id, amenagement_id),
+    )
+
+
 # =========================================================================
 #  DESSIN VUE DE FACE (directement sur le canvas)
 # =========================================================================
 
+# Cote (pt) en dessous de laquelle un rectangle est invisible a l'impression
+_COTE_VISIBLE_MIN = 0.3
+
+# Fleches de cotation : decalage des deux sommets de base par rapport a
+# la pointe, pour chaque orientation (taille 4 pt, demi-base 1.4 pt).
+_TAILLE_FLECHE = 4
+_FLECHE_DROITE = ((-_TAILLE_FLECHE, -_TAILLE_FLECHE * 0.35),
+                  (-_TAILLE_FLECHE, _TAILLE_FLECHE * 0.35))
+_FLECHE_GAUCHE = ((_TAILLE_FLECHE, -_TAILLE_FLECHE * 0.35),
+                  (_TAILLE_FLECHE, _TAILLE_FLECHE * 0.35))
+_FLECHE_HAUT = ((-_TAILLE_FLECHE * 0.35, -_TAILLE_FLECHE),
+                (_TAILLE_FLECHE * 0.35, -_TAILLE_FLECHE))
+_FLECHE_BAS = ((-_TAILLE_FLECHE * 0.35, _TAILLE_FLECHE),
+               (_TAILLE_FLECHE * 0.35, _TAILLE_FLECHE))
+
+
+def _dessiner_fleches(c: canvas.Canvas, fleches) -> None:
+    """Remplit plusieurs fleches de cotation en un seul chemin.
+
+    Args:
+        c: Canvas ReportLab sur lequel dessiner (couleur de remplissage
+            deja positionnee).
+        fleches: Iterable de tuples (x_pointe, y_pointe, gabarit) ou le
+            gabarit est l'une des constantes ``_FLECHE_*``.
+    """
+    p = c.beginPath()
+    for x, y, ((dx1, dy1), (dx2, dy2)) in fleches:
+        p.moveTo(x, y)
+        p.lineTo(x + dx1, y + dy1)
+        p.lineTo(x + dx2, y + dy2)
+        p.close()
+    c.drawPath(p, fill=1, stroke=0)
+
+
 def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
                        largeur_placard: float, hauteur_placard: float,
                        x_orig: float, y_orig: float,
@@ -123,9 +407,9 @@ def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
         draw_h: Hauteur disponible pour le dessin en points PDF.
     """
     if not rects or largeur_placard <= 0 or hauteur_placard <= 0:
-        c.setFont("Helvetica", 10)
+        _police(c, "Helvetica", 10)
         c.setFillColor(colors.grey)
-        c.drawCentredString(x_orig + draw_w / 2, y_orig + draw_h / 2, "Aucune geometrie")
+        _texte_centre(c, x_orig + draw_w / 2, y_orig + draw_h / 2, "Aucune geometrie")
         return
 
     marge = 30
@@ -141,10 +425,10 @@ def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
     oy = y_orig + marge + (view_h - total_h * scale) / 2 + padding * scale
 
     # Dessiner les rectangles
+    x_max = x_orig + draw_w
+    y_max = y_orig + draw_h
     ordre = ["sol", "mur", "panneau_mur", "separation", "rayon_haut", "rayon", "cremaillere_encastree", "cremaillere_applique", "tasseau"]
-    rects_par_type = {}
-    for r in rects:
-        rects_par_type.setdefault(r.type_elem, []).append(r)
+    rects_par_type = grouper_par_type(rects)
 
     for type_elem in ordre:
         if type_elem not in rects_par_type:
@@ -153,65 +437,61 @@ def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
             type_elem, (colors.lightgrey, colors.grey)
         )
 
+        lw = 0.2 if type_elem.startswith("cremaillere") else 0.5
+
+        # Passage mm -> points PDF de tout le groupe en une passe, en
+        # ecartant les rectangles invisibles (sous le seuil de visibilite
+        # dans les deux dimensions) ou hors de la zone de dessin.
+        coords = []
         for r in rects_par_type[type_elem]:
             sx = ox + r.x * scale
             sy = oy + r.y * scale
             sw = r.w * scale
             sh = r.h * scale
+            if sw < _COTE_VISIBLE_MIN and sh < _COTE_VISIBLE_MIN:
+                continue
+            if sx > x_max or sx + sw < x_orig or sy > y_max or sy + sh < y_orig:
+                continue
+            coords.append((sx, sy, sw, sh))
+        if not coords:
+            continue
 
-            c.setStrokeColor(stroke_color)
-            lw = 0.2 if type_elem.startswith("cremaillere") else 0.5
-            c.setLineWidth(lw)
+        c.setStrokeColor(stroke_color)
+        c.setLineWidth(lw)
 
-            if type_elem == "sol":
+        if type_elem == "sol":
+            for sx, sy, sw, sh in coords:
                 # Fond gris fonce + hachures diagonales
-                c.setFillColor(colors.Color(0.85, 0.85, 0.85))
+                c.setFillColor(_C_HACHURE_FOND)
                 c.rect(sx, sy, sw, sh, fill=1)
-                c.saveState()
-                p = c.beginPath()
-                p.rect(sx, sy, sw, sh)
-                c.clipPath(p, stroke=0)
-                c.setStrokeColor(colors.Color(0.33, 0.33, 0.33))
-                c.setLineWidth(0.4)
-                pas_h = 4
-                for d in range(int((sw + sh) / pas_h) + 1):
-                    x0 = sx + d * pas_h
-                    c.line(x0, sy + sh, x0 - sh, sy)
-                c.restoreState()
+                with _etat_graphique(c):
+                    p = c.beginPath()
+                    p.rect(sx, sy, sw, sh)
+                    c.clipPath(p, stroke=0)
+                    c.setStrokeColor(_C_HACHURE_TRAIT)
+                    c.setLineWidth(0.4)
+                    pas_h = 4
+                    for d in range(int((sw + sh) / pas_h) + 1):
+                        x0 = sx + d * pas_h
+                        c.line(x0, sy + sh, x0 - sh, sy)
                 # Contour
-                c.setStrokeColor(stroke_color)
-                c.setLineWidth(lw)
                 c.rect(sx, sy, sw, sh, fill=0)
-            else:
-                c.setFillColor(fill_color)
-                c.rect(sx, sy, sw, sh, fill=1)
-
-    # --- Helper fleche PDF ---
-    fl = 4  # taille fleche en points
-
-    def _fleche_h(tip_x, tip_y, vers_droite):
-        d = 1.0 if vers_droite else -1.0
-        p = c.beginPath()
-        p.moveTo(tip_x, tip_y)
-        p.lineTo(tip_x - d * fl, tip_y - fl * 0.35)
-        p.lineTo(tip_x - d * fl, tip_y + fl * 0.35)
-        p.close()
-        c.drawPath(p, fill=1, stroke=0)
-
-    def _fleche_v(tip_x, tip_y, vers_haut):
-        d = 1.0 if vers_haut else -1.0
-        p = c.beginPath()
-        p.moveTo(tip_x, tip_y)
-        p.lineTo(tip_x - fl * 0.35, tip_y - d * fl)
-        p.lineTo(tip_x + fl * 0.35, tip_y - d * fl)
-        p.close()
-        c.drawPath(p, fill=1, stroke=0)
+        else:
+            # Un seul chemin rempli + trace pour tout le groupe
+            c.setFillColor(fill_color)
+            chemin = c.beginPath()
+            for sx, sy, sw, sh in coords:
+                chemin.rect(sx, sy, sw, sh)
+            # Non nul : des rects superposes restent pleins (pas de trou
+            # comme avec la regle pair-impair par defaut)
+            c.drawPath(chemin, fill=1, stroke=1,
+                       fillMode=canvas.FILL_NON_ZERO)
 
     # --- Cotations globales ---
     c.setStrokeColor(colors.black)
     c.setFillColor(colors.black)
     c.setLineWidth(0.5)
-    c.setFont("Helvetica", 7)
+    _police(c, "Helvetica", 7)
 
     # Largeur totale (en bas)
     y_cot = oy - 50
@@ -219,14 +499,14 @@ def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
     x_right = ox + largeur_placard * scale
     c.line(x_left, y_cot, x_right, y_cot)
     c.setFillColor(colors.black)
-    _fleche_h(x_left, y_cot, False)
-    _fleche_h(x_right, y_cot, True)
+    _dessiner_fleches(c, ((x_left, y_cot, _FLECHE_GAUCHE),
+                          (x_right, y_cot, _FLECHE_DROITE)))
     c.setStrokeColor(colors.grey)
     c.setLineWidth(0.3)
     c.line(x_left, oy, x_left, y_cot - 3)
     c.line(x_right, oy, x_right, y_cot - 3)
     c.setFillColor(colors.black)
-    c.drawCentredString((x_left + x_right) / 2, y_cot - 10, f"{largeur_placard:.0f} mm")
+    _texte_centre(c, (x_left + x_right) / 2, y_cot - 10, f"{largeur_placard:.0f} mm")
 
     # Hauteur totale (a gauche)
     x_cot = ox - 30
@@ -236,121 +516,138 @@ def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
     c.setLineWidth(0.5)
     c.line(x_cot, y_bottom, x_cot, y_top)
     c.setFillColor(colors.black)
-    _fleche_v(x_cot, y_bottom, False)
-    _fleche_v(x_cot, y_top, True)
+    _dessiner_fleches(c, ((x_cot, y_bottom, _FLECHE_BAS),
+                          (x_cot, y_top, _FLECHE_HAUT)))
     c.setStrokeColor(colors.grey)
     c.setLineWidth(0.3)
     c.line(ox, y_bottom, x_cot - 3, y_bottom)
     c.line(ox, y_top, x_cot - 3, y_top)
 
-    c.saveState()
-    c.translate(x_cot - 8, (y_bottom + y_top) / 2)
-    c.rotate(90)
-    c.setFillColor(colors.black)
-    c.drawCentredString(0, 0, f"{hauteur_placard:.0f} mm")
-    c.restoreState()
+    with _etat_graphique(c):
+        c.translate(x_cot - 8, (y_bottom + y_top) / 2)
+        c.rotate(90)
+        c.setFillColor(colors.black)
+        _texte_centre(c, 0, 0, f"{hauteur_placard:.0f} mm")
 
     # --- Cotations compartiments et separations ---
-    seps = sorted(
-        [r for r in rects if r.type_elem == "separation"],
-        key=lambda r: r.x
-    )
+    # Les groupes par type servent aussi aux cotations : pas de nouveau
+    # parcours de tous les rectangles pour les separations ni le sol.
+    seps = sorted(rects_par_type.get("separation", ()), key=lambda r: r.x)
+    # Bords des compartiments : [0, sep1.x, sep1.x + w, ..., largeur]
+    edges = [0.0]
+    for s in seps:
+        edges.append(s.x)
+        edges.append(s.x + s.w)
+    edges.append(largeur_placard)
+
     if seps:
-        c.setFont("Helvetica", 5.5)
+        _police(c, "Helvetica", 5.5)
 
         # Largeurs compartiments (en bas, au-dessus de la largeur totale)
-        edges = [0.0]
-        for s in seps:
-            edges.append(s.x)
-            edges.append(s.x + s.w)
-        edges.append(largeur_placard)
 
         # Decaler sous le sol
-        sol_r = next((r for r in rects if r.type_elem == "sol"), None)
-        sol_bas_pdf = oy + sol_r.y * scale if sol_r else oy
+        sols = rects_par_type.get("sol")
+        sol_bas_pdf = oy + sols[0].y * scale if sols else oy
         y_cot_comp = sol_bas_pdf - 14
 
+        cotes_comp = []
         for i in range(0, len(edges), 2):
-            x_l = edges[i]
-            x_r = edges[i + 1]
-            w = x_r - x_l
-            if w <= 1:
-                continue
-
-            xl_pdf = ox + x_l * scale
-            xr_pdf = ox + x_r * scale
-
-            # Traits de rappel
-            c.setStrokeColor(colors.Color(0.67, 0.83, 1.0))
-            c.setLineWidth(0.3)
-            c.line(xl_pdf, oy, xl_pdf, y_cot_comp - 2)
-            c.line(xr_pdf, oy, xr_pdf, y_cot_comp - 2)
-
-            # Ligne de cote + fleches
-            c.setStrokeColor(colors.Color(0.0, 0.4, 0.8))
-            c.setFillColor(colors.Color(0.0, 0.4, 0.8))
-            c.setLineWidth(0.5)
-            c.line(xl_pdf, y_cot_comp, xr_pdf, y_cot_comp)
-            _fleche_h(xl_pdf, y_cot_comp, False)
-            _fleche_h(xr_pdf, y_cot_comp, True)
-
-            # Texte
-            c.drawCentredString((xl_pdf + xr_pdf) / 2, y_cot_comp + 2, f"{w:.0f}")
-
-        # Hauteurs separations (a droite)
+            w = edges[i + 1] - edges[i]
+            if w > 1:
+                cotes_comp.append((ox + edges[i] * scale,
+                                   ox + edges[i + 1] * scale, w))
+
+        # Deux passes : tous les traits de rappel (une couleur, un chemin),
+        # puis toutes les lignes de cote, fleches et textes.
+        c.setStrokeColor(_C_RAPPEL_COMP)
+        c.setLineWidth(0.3)
+        rappels = c.beginPath()
+        for xl_pdf, xr_pdf, _ in cotes_comp:
+            rappels.moveTo(xl_pdf, oy)
+            rappels.lineTo(xl_pdf, y_cot_comp - 2)
+            rappels.moveTo(xr_pdf, oy)
+            rappels.lineTo(xr_pdf, y_cot_comp - 2)
+        c.drawPath(rappels, stroke=1, fill=0)
+
+        c.setStrokeColor(_C_COTE_COMP)
+        c.setFillColor(_C_COTE_COMP)
+        c.setLineWidth(0.5)
+        lignes = c.beginPath()
+        fleches = []
+        for xl_pdf, xr_pdf, w in cotes_comp:
+            lignes.moveTo(xl_pdf, y_cot_comp)
+            lignes.lineTo(xr_pdf, y_cot_comp)
+            fleches.append((xl_pdf, y_cot_comp, _FLECHE_GAUCHE))
+            fleches.append((xr_pdf, y_cot_comp, _FLECHE_DROITE))
+            _texte_centre(c, (xl_pdf + xr_pdf) / 2, y_cot_comp + 2, _FMT_MM(w))
+        c.drawPath(lignes, stroke=1, fill=0)
+        _dessiner_fleches(c, fleches)
+
+        # Hauteurs separations (a droite), memes deux passes
         hauteurs = sorted(set(round(s.h) for s in seps), reverse=True)
 
-        x_base_pdf = ox + largeur_placard * scale + 20
-        for idx, h_val in enumerate(hauteurs):
-            x_cot_pdf = x_base_pdf + idx * 28
-
-            yb = oy
-            yt = oy + h_val * scale
-
-            # Traits de rappel
-            c.setStrokeColor(colors.Color(1.0, 0.83, 0.67))
-            c.setLineWidth(0.3)
-            c.line(ox + largeur_placard * scale, yb, x_cot_pdf + 2, yb)
-            c.line(ox + largeur_placard * scale, yt, x_cot_pdf + 2, yt)
-
-            # Ligne de cote + fleches
-            c.setStrokeColor(colors.Color(0.8, 0.4, 0.0))
-            c.setFillColor(colors.Color(0.8, 0.4, 0.0))
-            c.setLineWidth(0.5)
-            c.line(x_cot_pdf, yb, x_cot_pdf, yt)
-            _fleche_v(x_cot_pdf, yb, False)
-            _fleche_v(x_cot_pdf, yt, True)
+        x_droite_pdf = ox + largeur_placard * scale
+        x_base_pdf = x_droite_pdf + 20
+        cotes_sep = [
+            (x_base_pdf + idx * 28, oy + h_val * scale, h_val)
+            for idx, h_val in enumerate(hauteurs)
+        ]
+
+        c.setStrokeColor(_C_RAPPEL_HAUTEUR)
+        c.setLineWidth(0.3)
+        rappels = c.beginPath()
+        for x_cot_pdf, yt, _ in cotes_sep:
+            rappels.moveTo(x_droite_pdf, oy)
+            rappels.lineTo(x_cot_pdf + 2, oy)
+            rappels.moveTo(x_droite_pdf, yt)
+            rappels.lineTo(x_cot_pdf + 2, yt)
+        c.drawPath(rappels, stroke=1, fill=0)
+
+        c.setStrokeColor(_C_COTE_HAUTEUR)
+        c.setFillColor(_C_COTE_HAUTEUR)
+        c.setLineWidth(0.5)
+        lignes = c.beginPath()
+        fleches = []
+        for x_cot_pdf, yt, h_val in cotes_sep:
+            lignes.moveTo(x_cot_pdf, oy)
+            lignes.lineTo(x_cot_pdf, yt)
+            fleches.append((x_cot_pdf, oy, _FLECHE_BAS))
+            fleches.append((x_cot_pdf, yt, _FLECHE_HAUT))
 
             # Texte
-            c.saveState()
-            c.translate(x_cot_pdf + 6, (yb + yt) / 2)
-            c.rotate(90)
-            c.drawCentredString(0, 0, f"Sep. {h_val:.0f}")
-            c.restoreState()
+            with _etat_graphique(c):
+                c.translate(x_cot_pdf + 6, (oy + yt) / 2)
+                c.rotate(90)
+                _texte_centre(c, 0, 0, f"Sep. {h_val:.0f}")
+        c.drawPath(lignes, stroke=1, fill=0)
+        _dessiner_fleches(c, fleches)
 
     # --- Cotations hauteurs entre rayons par compartiment ---
+    # Les rayons sont deja regroupes par type : un seul passage sur ce
+    # groupe suffit pour les repartir par compartiment.
     rayons_par_comp: dict[int, list[float]] = {}
-    for r in rects:
-        if r.type_elem == "rayon":
-            m_rayon = re.match(r'Rayon C(\d+)', r.label)
-            if m_rayon:
-                cn = int(m_rayon.group(1))
-                rayons_par_comp.setdefault(cn, []).append(r.y)
+    for r in rects_par_type.get("rayon", ()):
+        m_rayon = _RE_RAYON_COMP.match(r.label)
+        if m_rayon:
+            rayons_par_comp.setdefault(int(m_rayon.group(1)), []).append(r.y)
 
     if rayons_par_comp:
         # Limite haute : dessous du rayon haut ou plafond
-        rh = next((r for r in rects if r.type_elem == "rayon_haut"), None)
-        z_plafond = rh.y if rh else hauteur_placard
+        rh = rects_par_type.get("rayon_haut")
+        z_plafond = rh[0].y if rh else hauteur_placard
 
-        # Bords des compartiments
-        edges_comp = [0.0]
-        for s in seps:
-            edges_comp.append(s.x)
-            edges_comp.append(s.x + s.w)
-        edges_comp.append(largeur_placard)
+        # Bords des compartiments (deja calcules pour les largeurs)
+        edges_comp = edges
 
-        coul_vert = colors.Color(0.0, 0.55, 0.27)
-        c.setFont("Helvetica", 5)
+        coul_vert = _C_COTE_RAYON
+        _police(c, "Helvetica", 5)
+        c.setStrokeColor(coul_vert)
+        c.setFillColor(coul_vert)
+        c.setLineWidth(0.4)
+
+        # Les cotes de tous les compartiments partagent police et couleur :
+        # un seul objet texte (BT/ET) au lieu d'un par cote.
+        textes = c.beginText()
 
         for comp_n, z_list in sorted(rayons_par_comp.items()):
             z_sorted = sorted(z_list)
@@ -365,10 +662,7 @@ def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
 
             niveaux = [0.0] + z_sorted + [z_plafond]
 
-            c.setStrokeColor(coul_vert)
-            c.setFillColor(coul_vert)
-            c.setLineWidth(0.4)
-
+            fleches = []
             for i in range(len(niveaux) - 1):
                 z_bas = niveaux[i]
                 z_haut = niveaux[i + 1]
@@ -377,14 +671,19 @@ def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
                 yb = oy + z_bas * scale
                 yh = oy + z_haut * scale
 
-                # Ligne verticale + fleches
+                # Ligne verticale (fleches groupees par compartiment)
                 c.line(x_cot, yb, x_cot, yh)
-                _fleche_v(x_cot, yb, False)
-                _fleche_v(x_cot, yh, True)
+                fleches.append((x_cot, yb, _FLECHE_BAS))
+                fleches.append((x_cot, yh, _FLECHE_HAUT))
 
                 # Texte a droite de la ligne
                 y_mid = (yb + yh) / 2
-                c.drawString(x_cot + 5, y_mid - 2, f"{h_val:.0f}")
+                textes.setTextOrigin(x_cot + 5, y_mid - 2)
+                textes.textOut(_FMT_MM(h_val))
+
+            _dessiner_fleches(c, fleches)
+
+        c.drawText(textes)
 
 
 # =========================================================================
@@ -394,7 +693,7 @@ def _dessiner_vue_face(c: canvas.Canvas, rects: list[PlacardRect],
 def _dessiner_tableau(c: canvas.Canvas, tab_x: float, tab_w: float,
                       y_start: float, row_h: float, font_size: float,
                       cols: list[tuple[str, int]],
-                      rows_data: list[list[str]]) -> float:
+                      rows_data: Iterable[Sequence[str]]) -> float:
     """Dessine un tableau generique avec en-tete et lignes de donnees.
 
     Le tableau comporte un en-tete sur fond sombre avec texte blanc,
@@ -410,7 +709,8 @@ def _dessiner_tableau(c: canvas.Canvas, tab_x: float, tab_w: float,
         font_size: Taille de police en points.
         cols: Liste de tuples (nom_colonne, largeur_colonne) definissant
             les colonnes du tableau.
-        rows_data: Liste de lignes, chaque ligne etant une liste de chaines
+        rows_data: Iterable de lignes (parcouru une seule fois, un
+            generateur suffit), chaque ligne etant une sequence de chaines
             correspondant aux valeurs des colonnes.
 
     Returns:
@@ -419,9 +719,9 @@ def _dessiner_tableau(c: canvas.Canvas, tab_x: float, tab_w: float,
     y = y_start
 
     # En-tete
-    c.setFillColor(colors.Color(0.2, 0.2, 0.2))
+    c.setFillColor(_C_ENTETE_TABLEAU)
     c.rect(tab_x, y - row_h, tab_w, row_h, fill=1, stroke=0)
-    c.setFont("Helvetica-Bold", font_size)
+    _police(c, "Helvetica-Bold", font_size)
     c.setFillColor(colors.white)
     cx = tab_x + 2
     for col_name, col_w in cols:
@@ -430,11 +730,11 @@ def _dessiner_tableau(c: canvas.Canvas, tab_x: float, tab_w: float,
     y -= row_h
 
     # Lignes de donnees
-    c.setFont("Helvetica", font_size)
+    _police(c, "Helvetica", font_size)
     nb_drawn = 0
     for i, row in enumerate(rows_data):
         if i % 2 == 1:
-            c.setFillColor(colors.Color(0.95, 0.95, 0.95))
+            c.setFillColor(_C_LIGNE_ALTERNEE)
             c.rect(tab_x, y - row_h, tab_w, row_h, fill=1, stroke=0)
         c.setFillColor(colors.black)
         cx = tab_x + 2
@@ -449,14 +749,19 @@ def _dessiner_tableau(c: canvas.Canvas, tab_x: float, tab_w: float,
     table_bottom = y
     c.setStrokeColor(colors.grey)
     c.setLineWidth(0.3)
+    grille = c.beginPath()
     for r_idx in range(nb_drawn + 2):
         y_line = table_top - r_idx * row_h
-        c.line(tab_x, y_line, tab_x + tab_w, y_line)
+        grille.moveTo(tab_x, y_line)
+        grille.lineTo(tab_x + tab_w, y_line)
     cx = tab_x
     for _, col_w in cols:
-        c.line(cx, table_top, cx, table_bottom)
+        grille.moveTo(cx, table_top)
+        grille.lineTo(cx, table_bottom)
         cx += col_w
-    c.line(tab_x + tab_w, table_top, tab_x + tab_w, table_bottom)
+    grille.moveTo(tab_x + tab_w, table_top)
+    grille.lineTo(tab_x + tab_w, table_bottom)
+    c.drawPath(grille, stroke=1, fill=0)
 
     return y
 
@@ -522,7 +827,8 @@ def _calculer_tailles(nb_pieces: int, nb_quinc: int, nb_materiaux: int,
 def _dessiner_page(c: canvas.Canvas, rects: list[PlacardRect], config: dict,
                    fiche: FicheFabrication, projet_info: dict | None,
                    amenagement_nom: str | None,
-                   projet_id: int, amenagement_id: int):
+                   projet_id: int, amenagement_id: int,
+                   artefacts: _ArtefactsAmenagement | None = None):
     """Dessine une page complete d'amenagement en paysage A4.
 
     La page comprend un cartouche en haut avec les informations du projet,
@@ -542,12 +848,18 @@ def _dessiner_page(c: canvas.Canvas, rects: list[PlacardRect], config: dict,
             ou None.
         projet_id: Identifiant du projet pour les references.
         amenagement_id: Identifiant de l'amenagement pour les references.
+        artefacts: Artefacts deja calcules par _preparer_artefacts, ou None
+            pour les calculer ici.
     """
     page_w, page_h = landscape(A4)
     marge = 10 * mm
 
-    # Attribuer les references
-    _attribuer_references(fiche, projet_id, amenagement_id)
+    # Attribuer les references et pre-calculer materiaux, surface et chants
+    if artefacts is None:
+        artefacts = _preparer_artefacts(fiche, projet_id, amenagement_id)
+    materiaux = artefacts.materiaux
+    surface = artefacts.surface
+    chants = artefacts.chants
 
     # =================================================================
     #  CARTOUCHE (en haut)
@@ -561,10 +873,10 @@ def _dessiner_page(c: canvas.Canvas, rects: list[PlacardRect], config: dict,
     if amenagement_nom:
         titre += f" - {amenagement_nom}"
 
-    c.setFont("Helvetica-Bold", 12)
+    _police(c, "Helvetica-Bold", 12)
     c.drawString(marge, y_cartouche, titre)
 
-    c.setFont("Helvetica", 8)
+    _police(c, "Helvetica", 8)
     info_parts = []
     if client:
         info_parts.append(f"Client: {client}")
@@ -588,7 +900,7 @@ def _dessiner_page(c: canvas.Canvas, rects: list[PlacardRect], config: dict,
     vue_x = marge
     vue_y = marge
 
-    c.setFont("Helvetica-Bold", 9)
+    _police(c, "Helvetica-Bold", 9)
     c.setFillColor(colors.black)
     c.drawString(vue_x, y_sep - 12, "Vue de face")
 
@@ -601,17 +913,6 @@ def _dessiner_page(c: canvas.Canvas, rects: list[PlacardRect], config: dict,
     tab_x = marge + vue_w + marge
     tab_w = page_w - tab_x - marge
 
-    # Pre-calculer resume materiaux et chants
-    materiaux = {}
-    for p in fiche.pieces:
-        key = (p.epaisseur, p.couleur_fab, p.materiau)
-        if key not in materiaux:
-            materiaux[key] = {"surface": 0, "nb": 0}
-        materiaux[key]["surface"] += p.longueur * p.largeur * p.quantite / 1e6
-        materiaux[key]["nb"] += p.quantite
-
-    chants = _calculer_chants(fiche)
-
     # Tailles adaptees
     hauteur_dispo = y_sep - 12 - marge
     row_h, font_size = _calculer_tailles(
@@ -622,7 +923,7 @@ def _dessiner_page(c: canvas.Canvas, rects: list[PlacardRect], config: dict,
     y_cursor = y_sep - 12
 
     # --- Titre fiche ---
-    c.setFont("Helvetica-Bold", 9)
+    _police(c, "Helvetica-Bold", 9)
     c.setFillColor(colors.black)
     c.drawString(tab_x, y_cursor, "Fiche de debit")
     y_cursor -= 12
@@ -637,40 +938,42 @@ def _dessiner_page(c: canvas.Canvas, rects: list[PlacardRect], config: dict,
         ("Qte", 22),
         ("Chant", 65),
     ]
-    p_rows = []
-    for p in fiche.pieces:
-        p_rows.append([
+    p_rows = (
+        (
             p.reference,
-            p.nom[:28],
-            f"{p.longueur:.0f}",
-            f"{p.largeur:.0f}",
-            f"{p.epaisseur:.0f}",
+            _tronquer(p.nom, 28),
+            _FMT_MM(p.longueur),
+            _FMT_MM(p.largeur),
+            _FMT_MM(p.epaisseur),
             str(p.quantite),
-            p.chant_desc[:16],
-        ])
+            _tronquer(p.chant_desc, 16),
+        )
+        for p in fiche.pieces
+    )
 
     y_cursor = _dessiner_tableau(c, tab_x, tab_w, y_cursor, row_h, font_size,
                                  p_cols, p_rows)
 
     # --- Surface totale ---
     y_cursor -= 4
-    surface = sum(p.longueur * p.largeur * p.quantite / 1e6 for p in fiche.pieces)
-    c.setFont("Helvetica-Bold", font_size)
+    _police(c, "Helvetica-Bold", font_size)
     c.setFillColor(colors.black)
     c.drawString(tab_x, y_cursor, f"Surface totale : {surface:.2f} m2")
     y_cursor -= 14
 
     # --- Quincaillerie ---
     if fiche.quincaillerie:
-        c.setFont("Helvetica-Bold", 9)
+        _police(c, "Helvetica-Bold", 9)
         c.setFillColor(colors.black)
         c.drawString(tab_x, y_cursor, "Quincaillerie")
         y_cursor -= 12
 
         q_cols = [("Designation", 170), ("Qte", 30), ("Description", 152)]
-        q_rows = []
-        for q in fiche.quincaillerie:
-            q_rows.append([q["nom"][:42], str(q["quantite"]), q["description"][:38]])
+        q_rows = (
+            (_tronquer(q["nom"], 42), str(q["quantite"]),
+             _tronquer(q["description"], 38))
+            for q in fiche.quincaillerie
+        )
 
         y_cursor = _dessiner_tableau(c, tab_x, tab_w, y_cursor, row_h, font_size,
                                      q_cols, q_rows)
@@ -678,40 +981,35 @@ def _dessiner_page(c: canvas.Canvas, rects: list[PlacardRect], config: dict,
     # --- Chants ---
     if chants and y_cursor > marge + 30:
         y_cursor -= 10
-        c.setFont("Helvetica-Bold", 8)
+        _police(c, "Helvetica-Bold", 8)
         c.setFillColor(colors.black)
         c.drawString(tab_x, y_cursor, "Chants (metrage total)")
         y_cursor -= 10
 
-        c.setFont("Helvetica", font_size)
-        for (couleur, ep_chant), longueur_mm in chants.items():
-            if y_cursor < marge:
-                break
-            ml = longueur_mm / 1000
-            c.drawString(tab_x, y_cursor,
-                         f"{couleur} ep.{ep_chant}mm : {ml:.1f} ml")
-            y_cursor -= 9
+        _police(c, "Helvetica", font_size)
+        y_cursor = _dessiner_lignes(c, tab_x, y_cursor, [
+            f"{couleur} ep.{ep_chant}mm : {longueur_mm / 1000:.1f} ml"
+            for (couleur, ep_chant), longueur_mm in chants.items()
+        ], marge, 9)
 
     # --- Resume materiaux ---
     if materiaux and y_cursor > marge + 20:
         y_cursor -= 10
-        c.setFont("Helvetica-Bold", 8)
+        _police(c, "Helvetica-Bold", 8)
         c.setFillColor(colors.black)
         c.drawString(tab_x, y_cursor, "Resume materiaux")
         y_cursor -= 10
 
-        c.setFont("Helvetica", font_size)
-        for (ep, coul, mat), info in materiaux.items():
-            if y_cursor < marge:
-                break
-            c.drawString(tab_x, y_cursor,
-                         f"{mat} {ep:.0f}mm {coul}: {info['surface']:.2f}m2 ({info['nb']} pcs)")
-            y_cursor -= 9
+        _police(c, "Helvetica", font_size)
+        y_cursor = _dessiner_lignes(c, tab_x, y_cursor, [
+            f"{mat} {ep:.0f}mm {coul}: {info['surface']:.2f}m2 ({info['nb']} pcs)"
+            for (ep, coul, mat), info in materiaux.items()
+        ], marge, 9)
 
     # --- Note etiquettes ---
     y_cursor -= 6
     if y_cursor > marge + 5:
-        c.setFont("Helvetica-Oblique", 6)
+        _police(c, "Helvetica-Oblique", 6)
         c.setFillColor(colors.grey)
         c.drawString(tab_x, y_cursor,
                      "Ref. format: P{projet}/A{amenagement}/N{piece} - a reporter sur etiquettes panneaux")
@@ -737,6 +1035,43 @@ COULEURS_PIECES_DEBIT = [
 #  DESSIN PAGE PLAN DE DEBIT
 # =========================================================================
 
+def _disposer_legende(textes: list[str], largeurs: list[float],
+                      x_min: float, x_max: float, y_haut: float,
+                      y_min: float, pas_x: float = 12, pas_y: float = 8,
+                      ) -> list[tuple[float, float, str]]:
+    """Calcule en une passe la position de chaque entree de legende.
+
+    Les entrees sont posees de gauche a droite et passent a la ligne
+    suivante des que la largeur disponible est depassee. La disposition
+    s'arrete lorsque la ligne courante descend sous ``y_min``.
+
+    Args:
+        textes: Textes des entrees de legende.
+        largeurs: Largeur deja mesuree de chaque texte (pt).
+        x_min: Abscisse de debut de ligne.
+        x_max: Abscisse maximale atteinte par une entree et son espacement.
+        y_haut: Ordonnee de la premiere ligne.
+        y_min: Ordonnee minimale autorisee.
+        pas_x: Espacement horizontal entre deux entrees.
+        pas_y: Interligne.
+
+    Returns:
+        Liste de tuples (x, y, texte) a dessiner.
+    """
+    positions = []
+    x, y = x_min, y_haut
+    for txt, tw in zip(textes, largeurs):
+        avance = tw + pas_x
+        if x + avance > x_max:
+            y -= pas_y
+            x = x_min
+        if y < y_min:
+            break
+        positions.append((x, y, txt))
+        x += avance
+    return positions
+
+
 def _dessiner_page_debit(c: canvas.Canvas, plan: PlanDecoupe,
                          params: ParametresDebit,
                          numero: int, total: int,
@@ -768,11 +1103,11 @@ def _dessiner_page_debit(c: canvas.Canvas, plan: PlanDecoupe,
     if amenagement_nom:
         titre += f" - {amenagement_nom}"
 
-    c.setFont("Helvetica-Bold", 11)
+    _police(c, "Helvetica-Bold", 11)
     c.setFillColor(colors.black)
     c.drawString(marge, y_top, titre)
 
-    c.setFont("Helvetica", 8)
+    _police(c, "Helvetica", 8)
     info = f"{nom_projet}  |  {plan.couleur} ep.{plan.epaisseur:.0f}mm"
     info += f"  |  Panneau brut: {params.panneau_longueur:.0f}x{params.panneau_largeur:.0f}mm"
     info += f"  |  Trait scie: {params.trait_scie:.0f}mm  Surcote: {params.surcote:.0f}mm  Delig.: {params.delignage:.0f}mm"
@@ -797,28 +1132,28 @@ def _dessiner_page_debit(c: canvas.Canvas, plan: PlanDecoupe,
     oy = draw_y + (draw_h - pw * scale) / 2
 
     # --- Dessiner le panneau ---
-    c.setFillColor(colors.Color(0.96, 0.94, 0.90))
-    c.setStrokeColor(colors.Color(0.4, 0.35, 0.3))
+    c.setFillColor(_C_PANNEAU_FOND)
+    c.setStrokeColor(_C_PANNEAU_TRAIT)
     c.setLineWidth(1)
     c.rect(ox, oy, pl * scale, pw * scale, fill=1)
 
     # Dimensions du panneau
-    c.setFont("Helvetica", 6)
-    c.setFillColor(colors.Color(0.4, 0.35, 0.3))
-    c.drawCentredString(ox + pl * scale / 2, oy - 8, f"{pl:.0f} mm")
-    c.saveState()
-    c.translate(ox - 6, oy + pw * scale / 2)
-    c.rotate(90)
-    c.drawCentredString(0, 0, f"{pw:.0f} mm")
-    c.restoreState()
+    _police(c, "Helvetica", 6)
+    c.setFillColor(_C_PANNEAU_TRAIT)
+    _texte_centre(c, ox + pl * scale / 2, oy - 8, f"{pl:.0f} mm")
+    with _etat_graphique(c):
+        c.translate(ox - 6, oy + pw * scale / 2)
+        c.rotate(90)
+        _texte_centre(c, 0, 0, f"{pw:.0f} mm")
 
     # --- Dessiner les pieces ---
     nb_couleurs = len(COULEURS_PIECES_DEBIT)
-    legende = []
 
+    # Rectangles des pieces (meme trait pour toutes)
+    c.setStrokeColor(_C_GRIS_FONCE)
+    c.setLineWidth(0.5)
+    textes_pieces = []
     for idx, plc in enumerate(plan.placements):
-        couleur_fill = COULEURS_PIECES_DEBIT[idx % nb_couleurs]
-
         if plc.rotation:
             pw_piece = plc.largeur_debit * scale
             ph_piece = plc.longueur_debit * scale
@@ -829,39 +1164,36 @@ def _dessiner_page_debit(c: canvas.Canvas, plan: PlanDecoupe,
         px = ox + plc.x * scale
         py = oy + plc.y * scale
 
-        # Rectangle piece
-        c.setFillColor(couleur_fill)
-        c.setStrokeColor(colors.Color(0.3, 0.3, 0.3))
-        c.setLineWidth(0.5)
+        c.setFillColor(COULEURS_PIECES_DEBIT[idx % nb_couleurs])
         c.rect(px, py, pw_piece, ph_piece, fill=1)
 
-        # Texte dans la piece
-        cx_piece = px + pw_piece / 2
-        cy_piece = py + ph_piece / 2
-
-        ref = plc.piece.reference
-        dim_txt = f"{plc.piece.longueur:.0f}x{plc.piece.largeur:.0f}"
-
         # Adapter la taille du texte a la piece
         font_sz = min(7, pw_piece / 8, ph_piece / 4)
         font_sz = max(3.5, font_sz)
-
-        c.setFont("Helvetica-Bold", font_sz)
-        c.setFillColor(colors.Color(0.15, 0.15, 0.15))
-        c.drawCentredString(cx_piece, cy_piece + font_sz * 0.3, ref)
-        c.setFont("Helvetica", font_sz * 0.85)
-        c.drawCentredString(cx_piece, cy_piece - font_sz * 0.7, dim_txt)
-
+        textes_pieces.append((px + pw_piece / 2, py + ph_piece / 2, font_sz, plc))
+
+    # Textes par police : references, dimensions puis marques de rotation,
+    # pour ne changer de police que lorsque la taille change.
+    c.setFillColor(_C_TEXTE_PIECE)
+    for cx_piece, cy_piece, font_sz, plc in textes_pieces:
+        _police(c, "Helvetica-Bold", font_sz)
+        _texte_centre(c, cx_piece, cy_piece + font_sz * 0.3,
+                      plc.piece.reference)
+    for cx_piece, cy_piece, font_sz, plc in textes_pieces:
+        _police(c, "Helvetica", font_sz * 0.85)
+        _texte_centre(c, cx_piece, cy_piece - font_sz * 0.7,
+                      _FMT_DIM(plc.piece.longueur, plc.piece.largeur))
+    c.setFillColor(colors.red)
+    for cx_piece, cy_piece, font_sz, plc in textes_pieces:
         if plc.rotation:
-            c.setFont("Helvetica-Oblique", font_sz * 0.7)
-            c.setFillColor(colors.red)
-            c.drawCentredString(cx_piece, cy_piece - font_sz * 1.5, "R")
+            _police(c, "Helvetica-Oblique", font_sz * 0.7)
+            _texte_centre(c, cx_piece, cy_piece - font_sz * 1.5, "R")
 
-        legende.append((ref, plc.piece.nom))
+    legende = [(plc.piece.reference, plc.piece.nom) for plc in plan.placements]
 
     # --- Resume en bas ---
     y_res = marge + 48
-    c.setFont("Helvetica-Bold", 8)
+    _police(c, "Helvetica-Bold", 8)
     c.setFillColor(colors.black)
     nb = len(plan.placements)
     c.drawString(marge, y_res,
@@ -870,42 +1202,36 @@ def _dessiner_page_debit(c: canvas.Canvas, plan: PlanDecoupe,
                  f"  /  {plan.surface_panneau:.3f} m2")
 
     # Legende
-    y_leg = y_res - 12
-    c.setFont("Helvetica", 5.5)
-    c.setFillColor(colors.Color(0.3, 0.3, 0.3))
-    x_leg = marge
-    for ref, nom in legende:
-        txt = f"{ref}={nom[:25]}"
-        tw = c.stringWidth(txt, "Helvetica", 5.5)
-        if x_leg + tw + 12 > page_w - marge:
-            y_leg -= 8
-            x_leg = marge
-        if y_leg < marge:
-            break
+    _police(c, "Helvetica", 5.5)
+    c.setFillColor(_C_GRIS_FONCE)
+    textes = [f"{ref}={_tronquer(nom, 25)}" for ref, nom in legende]
+    largeurs = [_largeur_texte(txt, "Helvetica", 5.5) for txt in textes]
+    for x_leg, y_leg, txt in _disposer_legende(
+            textes, largeurs, marge, page_w - marge, y_res - 12, marge):
         c.drawString(x_leg, y_leg, txt)
-        x_leg += tw + 12
 
     # --- Filigrane couleur/epaisseur par-dessus (semi-transparent) ---
     filigrane = f"{plan.couleur} - ep.{plan.epaisseur:.0f}mm"
-    c.saveState()
-    c.setFillColor(colors.Color(0.35, 0.33, 0.30, alpha=0.25))
-    fil_size = min(18, pl * scale / max(len(filigrane), 1) * 1.2)
-    fil_size = max(10, fil_size)
-    c.setFont("Helvetica-Bold", fil_size)
-    for fx, fy in [(0.25, 0.25), (0.75, 0.25), (0.25, 0.75), (0.75, 0.75)]:
-        c.drawCentredString(
-            ox + pl * scale * fx,
-            oy + pw * scale * fy,
-            filigrane
-        )
-    c.restoreState()
+    with _etat_graphique(c):
+        c.setFillColor(_C_FILIGRANE)
+        fil_size = min(18, pl * scale / max(len(filigrane), 1) * 1.2)
+        fil_size = max(10, fil_size)
+        _police(c, "Helvetica-Bold", fil_size)
+        for fx, fy in [(0.25, 0.25), (0.75, 0.25), (0.25, 0.75), (0.75, 0.75)]:
+            _texte_centre(
+                c,
+                ox + pl * scale * fx,
+                oy + pw * scale * fy,
+                filigrane
+            )
 
 
 def _generer_et_dessiner_debit(c: canvas.Canvas, fiche: FicheFabrication,
                                 projet_info: dict | None,
                                 amenagement_nom: str | None,
                                 projet_id: int, amenagement_id: int,
-                                params_debit: ParametresDebit | None = None):
+                                params_debit: ParametresDebit | None = None,
+                                pieces: list | None = None):
     """Genere les plans de debit optimises et dessine les pages correspondantes.
 
     Convertit la fiche de fabrication en pieces de debit, lance l'optimisation
@@ -921,11 +1247,14 @@ def _generer_et_dessiner_debit(c: canvas.Canvas, fiche: FicheFabrication,
         amenagement_id: Identifiant de l'amenagement pour les references.
         params_debit: Parametres de debit (dimensions panneau, trait de scie, etc.).
             Si None, les parametres par defaut sont utilises.
+        pieces: PieceDebit deja extraites de la fiche, ou None pour les
+            extraire ici.
     """
     if params_debit is None:
-        params_debit = ParametresDebit()
+        params_debit = PARAMS_DEBIT_DEFAUT
 
-    pieces = pieces_depuis_fiche(fiche, projet_id, amenagement_id)
+    if pieces is None:
+        pieces = pieces_depuis_fiche(fiche, projet_id, amenagement_id)
     if not pieces:
         return
 
@@ -933,19 +1262,19 @@ def _generer_et_dessiner_debit(c: canvas.Canvas, fiche: FicheFabrication,
 
     total = len(plans)
     for i, plan in enumerate(plans):
-        c.showPage()
+        _nouvelle_page(c)
         _dessiner_page_debit(c, plan, params_debit, i + 1, total,
                              projet_info, amenagement_nom)
 
     # Page d'alerte si pieces hors gabarit
     if hors_gabarit:
-        c.showPage()
+        _nouvelle_page(c)
         page_w, page_h = landscape(A4)
         m = 10 * mm
-        c.setFont("Helvetica-Bold", 12)
+        _police(c, "Helvetica-Bold", 12)
         c.setFillColor(colors.red)
         c.drawString(m, page_h - m, "Pieces hors gabarit (ne rentrent pas dans un panneau)")
-        c.setFont("Helvetica", 9)
+        _police(c, "Helvetica", 9)
         c.setFillColor(colors.black)
         y = page_h - m - 25
         for p in hors_gabarit:
@@ -980,11 +1309,11 @@ def _dessiner_page_pieces_manuelles(c: canvas.Canvas, pieces_manuelles: list,
     # --- Cartouche ---
     y_top = page_h - marge
     nom_projet = projet_info.get("nom", "Projet") if projet_info else "Projet"
-    c.setFont("Helvetica-Bold", 12)
+    _police(c, "Helvetica-Bold", 12)
     c.setFillColor(colors.black)
     c.drawString(marge, y_top, f"REB & ELOI - {nom_projet}")
 
-    c.setFont("Helvetica", 8)
+    _police(c, "Helvetica", 8)
     info_parts = []
     if projet_info:
         if projet_info.get("client"):
@@ -1001,7 +1330,7 @@ def _dessiner_page_pieces_manuelles(c: canvas.Canvas, pieces_manuelles: list,
 
     # --- Titre ---
     y_cursor = y_sep - 15
-    c.setFont("Helvetica-Bold", 11)
+    _police(c, "Helvetica-Bold", 11)
     c.setFillColor(colors.black)
     c.drawString(marge, y_cursor, "Fiche de debit \u2014 Pieces complementaires")
     y_cursor -= 16
@@ -1026,18 +1355,19 @@ def _dessiner_page_pieces_manuelles(c: canvas.Canvas, pieces_manuelles: list,
         ("Qte", 40),
     ]
 
-    rows = []
-    for p in pieces_manuelles:
-        rows.append([
+    rows = (
+        (
             p.reference,
-            p.nom[:45],
-            f"{p.longueur:.0f}",
-            f"{p.largeur:.0f}",
-            f"{p.epaisseur:.0f}",
-            p.couleur[:40],
+            _tronquer(p.nom, 45),
+            _FMT_MM(p.longueur),
+            _FMT_MM(p.largeur),
+            _FMT_MM(p.epaisseur),
+            _tronquer(p.couleur, 40),
             "Oui" if p.sens_fil else "Non",
             str(p.quantite),
-        ])
+        )
+        for p in pieces_manuelles
+    )
 
     y_cursor = _dessiner_tableau(c, marge, tab_w, y_cursor, row_h, font_size,
                                  cols, rows)
@@ -1047,7 +1377,7 @@ def _dessiner_page_pieces_manuelles(c: canvas.Canvas, pieces_manuelles: list,
     surface = sum(p.longueur * p.largeur * p.quantite / 1e6
                   for p in pieces_manuelles)
     nb_total = sum(p.quantite for p in pieces_manuelles)
-    c.setFont("Helvetica-Bold", 8)
+    _police(c, "Helvetica-Bold", 8)
     c.setFillColor(colors.black)
     c.drawString(marge, y_cursor,
                  f"Surface totale : {surface:.2f} m\u00b2  |  "
@@ -1064,19 +1394,17 @@ def _dessiner_page_pieces_manuelles(c: canvas.Canvas, pieces_manuelles: list,
         materiaux[key]["nb"] += p.quantite
 
     if materiaux and y_cursor > marge + 20:
-        c.setFont("Helvetica-Bold", 9)
+        _police(c, "Helvetica-Bold", 9)
         c.setFillColor(colors.black)
         c.drawString(marge, y_cursor, "Resume materiaux")
         y_cursor -= 12
 
-        c.setFont("Helvetica", 7)
-        for (ep, coul), info in materiaux.items():
-            if y_cursor < marge:
-                break
-            c.drawString(marge + 10, y_cursor,
-                         f"{coul} ep.{ep:.0f}mm : {info['surface']:.2f} m\u00b2"
-                         f" ({info['nb']} pieces)")
-            y_cursor -= 10
+        _police(c, "Helvetica", 7)
+        y_cursor = _dessiner_lignes(c, marge + 10, y_cursor, [
+            f"{coul} ep.{ep:.0f}mm : {info['surface']:.2f} m\u00b2"
+            f" ({info['nb']} pieces)"
+            for (ep, coul), info in materiaux.items()
+        ], marge, 10)
 
 
 def _dessiner_debit_mixte(c: canvas.Canvas, all_pieces: list,
@@ -1101,19 +1429,19 @@ def _dessiner_debit_mixte(c: canvas.Canvas, all_pieces: list,
 
     total = len(plans)
     for i, plan in enumerate(plans):
-        c.showPage()
+        _nouvelle_page(c)
         _dessiner_page_debit(c, plan, params_debit, i + 1, total,
                              projet_info, "Tous amenagements")
 
     if hors_gabarit:
-        c.showPage()
+        _nouvelle_page(c)
         page_w, page_h = landscape(A4)
         m = 10 * mm
-        c.setFont("Helvetica-Bold", 12)
+        _police(c, "Helvetica-Bold", 12)
         c.setFillColor(colors.red)
         c.drawString(m, page_h - m,
                      "Pieces hors gabarit (ne rentrent pas dans un panneau)")
-        c.setFont("Helvetica", 9)
+        _police(c, "Helvetica", 9)
         c.setFillColor(colors.black)
         y = page_h - m - 25
         for p in hors_gabarit:
@@ -1171,11 +1499,11 @@ def _dessiner_pages_liste_pieces(c: canvas.Canvas, all_pieces: list,
     for p in pieces_triees:
         all_rows.append([
             p.reference,
-            p.nom[:42],
-            f"{p.longueur:.0f}",
-            f"{p.largeur:.0f}",
-            f"{p.epaisseur:.0f}",
-            p.couleur[:40],
+            _tronquer(p.nom, 42),
+            _FMT_MM(p.longueur),
+            _FMT_MM(p.largeur),
+            _FMT_MM(p.epaisseur),
+            _tronquer(p.couleur, 40),
             "Oui" if p.sens_fil else "Non",
             str(p.quantite),
         ])
@@ -1193,7 +1521,7 @@ def _dessiner_pages_liste_pieces(c: canvas.Canvas, all_pieces: list,
 
     for page_idx in range(nb_pages):
         if page_idx > 0:
-            c.showPage()
+            _nouvelle_page(c)
 
         start = page_idx * rows_per_page
         end = min(start + rows_per_page, len(all_rows))
@@ -1201,14 +1529,14 @@ def _dessiner_pages_liste_pieces(c: canvas.Canvas, all_pieces: list,
 
         # --- Cartouche ---
         y_top = page_h - marge
-        c.setFont("Helvetica-Bold", 12)
+        _police(c, "Helvetica-Bold", 12)
         c.setFillColor(colors.black)
         titre_page = f"Liste des pieces a decouper \u2014 {nom_projet}"
         if nb_pages > 1:
             titre_page += f" ({page_idx + 1}/{nb_pages})"
         c.drawString(marge, y_top, titre_page)
 
-        c.setFont("Helvetica", 8)
+        _police(c, "Helvetica", 8)
         info_parts = []
         if projet_info:
             if projet_info.get("client"):
@@ -1232,7 +1560,7 @@ def _dessiner_pages_liste_pieces(c: canvas.Canvas, all_pieces: list,
     y_cursor -= 10
     surface = sum(p.longueur * p.largeur * p.quantite / 1e6 for p in all_pieces)
     nb_total = sum(p.quantite for p in all_pieces)
-    c.setFont("Helvetica-Bold", 8)
+    _police(c, "Helvetica-Bold", 8)
     c.setFillColor(colors.black)
     c.drawString(marge, y_cursor,
                  f"Surface totale : {surface:.2f} m\u00b2  |  "
@@ -1248,19 +1576,17 @@ def _dessiner_pages_liste_pieces(c: canvas.Canvas, all_pieces: list,
         materiaux[key]["nb"] += p.quantite
 
     if materiaux and y_cursor > marge + 15:
-        c.setFont("Helvetica-Bold", 9)
+        _police(c, "Helvetica-Bold", 9)
         c.setFillColor(colors.black)
         c.drawString(marge, y_cursor, "Resume materiaux")
         y_cursor -= 12
 
-        c.setFont("Helvetica", 7)
-        for (ep, coul), info in materiaux.items():
-            if y_cursor < marge:
-                break
-            c.drawString(marge + 10, y_cursor,
-                         f"{coul} ep.{ep:.0f}mm : {info['surface']:.2f} m\u00b2"
-                         f" ({info['nb']} pieces)")
-            y_cursor -= 10
+        _police(c, "Helvetica", 7)
+        y_cursor = _dessiner_lignes(c, marge + 10, y_cursor, [
+            f"{coul} ep.{ep:.0f}mm : {info['surface']:.2f} m\u00b2"
+            f" ({info['nb']} pieces)"
+            for (ep, coul), info in materiaux.items()
+        ], marge, 10)
 
 
 def exporter_pdf_debit(filepath: str, all_pieces: list,
@@ -1296,18 +1622,18 @@ def exporter_pdf_debit(filepath: str, all_pieces: list,
     # Pages plans de debit
     total = len(plans)
     for i, plan in enumerate(plans):
-        c.showPage()
+        _nouvelle_page(c)
         _dessiner_page_debit(c, plan, params_debit, i + 1, total,
                              projet_info, titre)
 
     if hors_gabarit:
-        c.showPage()
+        _nouvelle_page(c)
         page_w, page_h = landscape(A4)
         m = 10 * mm
-        c.setFont("Helvetica-Bold", 12)
+        _police(c, "Helvetica-Bold", 12)
         c.setFillColor(colors.red)
         c.drawString(m, page_h - m, "Pieces hors gabarit")
-        c.setFont("Helvetica", 9)
+        _police(c, "Helvetica", 9)
         c.setFillColor(colors.black)
         y = page_h - m - 25
         for p in hors_gabarit:
@@ -1319,10 +1645,10 @@ def exporter_pdf_debit(filepath: str, all_pieces: list,
                 break
 
     # Page resume
-    c.showPage()
+    _nouvelle_page(c)
     _dessiner_resume_debit(c, plans, hors_gabarit, params_debit, projet_info, titre)
 
-    c.save()
+    _enregistrer_pdf(c, filepath)
     return filepath
 
 
@@ -1346,17 +1672,17 @@ def _dessiner_resume_debit(c: canvas.Canvas, plans: list[PlanDecoupe],
     page_w, page_h = landscape(A4)
     m = 10 * mm
 
-    c.setFont("Helvetica-Bold", 14)
+    _police(c, "Helvetica-Bold", 14)
     c.setFillColor(colors.black)
     c.drawString(m, page_h - m, f"Resume - {titre}")
 
     nom = projet_info.get("nom", "") if projet_info else ""
     if nom:
-        c.setFont("Helvetica", 10)
+        _police(c, "Helvetica", 10)
         c.drawString(m, page_h - m - 18, f"Projet: {nom}")
 
     y = page_h - m - 45
-    c.setFont("Helvetica", 9)
+    _police(c, "Helvetica", 9)
 
     # Regrouper par (epaisseur, couleur)
     groupes: dict[tuple, list[PlanDecoupe]] = {}
@@ -1370,11 +1696,11 @@ def _dessiner_resume_debit(c: canvas.Canvas, plans: list[PlanDecoupe],
         surf_pieces = sum(p.surface_pieces for p in plans_g)
         chute_moy = (1 - surf_pieces / surf_totale) * 100 if surf_totale > 0 else 0
 
-        c.setFont("Helvetica-Bold", 9)
+        _police(c, "Helvetica-Bold", 9)
         c.drawString(m, y, f"{coul} ep.{ep:.0f}mm")
         y -= 14
 
-        c.setFont("Helvetica", 9)
+        _police(c, "Helvetica", 9)
         c.drawString(m + 10, y,
                      f"Panneaux: {nb_panneaux} x "
                      f"({params.panneau_longueur:.0f}x{params.panneau_largeur:.0f}mm)")
@@ -1386,11 +1712,11 @@ def _dessiner_resume_debit(c: canvas.Canvas, plans: list[PlanDecoupe],
         y -= 20
 
     if hors_gabarit:
-        c.setFont("Helvetica-Bold", 9)
+        _police(c, "Helvetica-Bold", 9)
         c.setFillColor(colors.red)
         c.drawString(m, y, f"Pieces hors gabarit: {len(hors_gabarit)}")
         y -= 13
-        c.setFont("Helvetica", 8)
+        _police(c, "Helvetica", 8)
         c.setFillColor(colors.black)
         for p in hors_gabarit:
             c.drawString(m + 10, y,
@@ -1436,15 +1762,16 @@ def exporter_pdf(filepath: str, rects: list[PlacardRect], config: dict,
         Chemin du fichier PDF genere (identique a filepath).
     """
     if params_debit is None:
-        params_debit = ParametresDebit()
+        params_debit = PARAMS_DEBIT_DEFAUT
 
     c = canvas.Canvas(filepath, pagesize=landscape(A4))
+    artefacts = _preparer_artefacts(fiche, projet_id, amenagement_id)
     _dessiner_page(c, rects, config, fiche, projet_info, None,
-                   projet_id, amenagement_id)
+                   projet_id, amenagement_id, artefacts)
 
     # Page fiche de debit pour les pieces manuelles
     if pieces_manuelles:
-        c.showPage()
+        _nouvelle_page(c)
         _dessiner_page_pieces_manuelles(c, pieces_manuelles, projet_info)
 
     if all_pieces_projet:
@@ -1453,8 +1780,9 @@ def exporter_pdf(filepath: str, rects: list[PlacardRect], config: dict,
     else:
         # Debit pour cet amenagement seul
         _generer_et_dessiner_debit(c, fiche, projet_info, None,
-                                    projet_id, amenagement_id, params_debit)
-    c.save()
+                                    projet_id, amenagement_id, params_debit,
+                                    artefacts.pieces_debit)
+    _enregistrer_pdf(c, filepath)
     return filepath
 
 
@@ -1492,7 +1820,7 @@ def exporter_pdf_projet(filepath: str, amenagements_data: list[dict],
         Chemin du fichier PDF genere (identique a filepath).
     """
     if params_debit is None:
-        params_debit = ParametresDebit()
+        params_debit = PARAMS_DEBIT_DEFAUT
 
     c = canvas.Canvas(filepath, pagesize=landscape(A4))
 
@@ -1500,29 +1828,26 @@ def exporter_pdf_projet(filepath: str, amenagements_data: list[dict],
     all_pieces = []
     for i, am in enumerate(amenagements_data):
         if i > 0:
-            c.showPage()
+            _nouvelle_page(c)
+        am_id = am.get("amenagement_id", 0)
+        artefacts = _preparer_artefacts(am["fiche"], projet_id, am_id)
         _dessiner_page(
             c, am["rects"], am["config"], am["fiche"],
             projet_info, am.get("nom"),
-            projet_id, am.get("amenagement_id", 0),
+            projet_id, am_id, artefacts,
         )
         # Collecter les pieces de cet amenagement pour le debit global
-        am_pieces = pieces_depuis_fiche(
-            am["fiche"], projet_id, am.get("amenagement_id", 0)
-        )
-        all_pieces.extend(am_pieces)
+        all_pieces.extend(artefacts.pieces_debit)
 
-    # Ajouter les pieces manuelles
+    # --- Pieces manuelles : page fiche de debit + ajout au debit global ---
     if pieces_manuelles:
         all_pieces.extend(pieces_manuelles)
-
-    # --- Page fiche de debit pour les pieces manuelles ---
-    if pieces_manuelles:
-        c.showPage()
+        _nouvelle_page(c)
         _dessiner_page_pieces_manuelles(c, pieces_manuelles, projet_info)
 
     # --- Plans de debit mixtes (toutes pieces confondues) ---
-    _dessiner_debit_mixte(c, all_pieces, params_debit, projet_info)
+    if all_pieces:
+        _dessiner_debit_mixte(c, all_pieces, params_debit, projet_info)
 
-    c.save()
+    _enregistrer_pdf(c, filepath)
     return filepath
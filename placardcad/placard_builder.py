@@ -7,10 +7,22 @@ Ce module fournit :
     - L'integration FreeCAD optionnelle pour la 3D.
 
 Les fonctions principales sont ``calculer_largeurs_compartiments``,
-``calculer_dimensions_rayon`` et ``generer_geometrie_2d``.
+``calculer_dimensions_rayon`` et ``generer_geometrie_2d`` (``generer_fiche``
+n'en calcule que la fiche de fabrication) ; ``grouper_par_type``
+regroupe les rectangles produits par type d'element pour le rendu.
 """
 
+from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple
+
+
+# Gabarits des lignes repetees de la fiche texte (une ligne par piece,
+# quincaillerie ou materiau) : le format est analyse une seule fois.
+_FMT_LIGNE_PIECE = "  {:<4} {:<35} {:<8.0f} {:<8.0f} {:<5.0f} {:<4} {:<20} {}".format
+_FMT_LIGNE_QUINC = "    {:<40} x{:<4} {}".format
+_FMT_LIGNE_MATERIAU = "    {} {:.0f}mm {}: {:.2f} m2 ({} pieces)".format
 
 
 class PieceInfo:
@@ -33,6 +45,10 @@ class PieceInfo:
         sens_fil: ``True`` si le sens du fil est dans le sens de la longueur.
     """
 
+    __slots__ = ("nom", "longueur", "largeur", "epaisseur", "materiau",
+                 "couleur_fab", "chant_desc", "quantite", "notes",
+                 "reference", "sens_fil")
+
     def __init__(self, nom: str, longueur: float, largeur: float, epaisseur: float,
                  materiau: str = "Agglomere melamine", couleur_fab: str = "",
                  chant_desc: str = "", quantite: int = 1, notes: str = "",
@@ -130,63 +146,55 @@ class FicheFabrication:
             Chaine de caracteres multi-lignes formatee pour affichage
             ou export texte.
         """
-        lines = []
-        lines.append("=" * 80)
-        lines.append("  FICHE DE FABRICATION - AMENAGEMENT INTERIEUR PLACARD")
-        lines.append("=" * 80)
-        lines.append(f"  Date : {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-        lines.append("")
-        lines.append("  DIMENSIONS GLOBALES")
-        lines.append(f"    Hauteur   : {config['hauteur']} mm")
-        lines.append(f"    Largeur   : {config['largeur']} mm")
-        lines.append(f"    Profondeur: {config['profondeur']} mm")
-        lines.append("")
-        lines.append("-" * 80)
-        lines.append("  LISTE DES PANNEAUX")
-        lines.append("-" * 80)
-        lines.append(f"  {'No':<4} {'Designation':<35} {'Long.':<8} {'Larg.':<8} "
-                     f"{'Ep.':<5} {'Qte':<4} {'Chant':<20} {'Notes'}")
-        lines.append("-" * 80)
-
+        lines = [
+            "=" * 80,
+            "  FICHE DE FABRICATION - AMENAGEMENT INTERIEUR PLACARD",
+            "=" * 80,
+            f"  Date : {datetime.now().strftime('%d/%m/%Y %H:%M')}",
+            "",
+            "  DIMENSIONS GLOBALES",
+            f"    Hauteur   : {config['hauteur']} mm",
+            f"    Largeur   : {config['largeur']} mm",
+            f"    Profondeur: {config['profondeur']} mm",
+            "",
+            "-" * 80,
+            "  LISTE DES PANNEAUX",
+            "-" * 80,
+            f"  {'No':<4} {'Designation':<35} {'Long.':<8} {'Larg.':<8} "
+            f"{'Ep.':<5} {'Qte':<4} {'Chant':<20} {'Notes'}",
+            "-" * 80,
+        ]
+
+        # Un seul parcours des pieces : lignes, surface totale et materiaux
+        surface_totale = 0.0
+        materiaux = defaultdict(lambda: {"surface": 0, "pieces": []})
         for i, p in enumerate(self.pieces, 1):
-            lines.append(
-                f"  {i:<4} {p.nom:<35} {p.longueur:<8.0f} {p.largeur:<8.0f} "
-                f"{p.epaisseur:<5.0f} {p.quantite:<4} {p.chant_desc:<20} {p.notes}"
-            )
+            lines.append(_FMT_LIGNE_PIECE(
+                i, p.nom, p.longueur, p.largeur,
+                p.epaisseur, p.quantite, p.chant_desc, p.notes,
+            ))
+            surface = p.longueur * p.largeur * p.quantite / 1e6
+            surface_totale += surface
+            info = materiaux[(p.epaisseur, p.couleur_fab, p.materiau)]
+            info["surface"] += surface
+            info["pieces"].append(p)
 
-        lines.append("")
-        surface_totale = sum(
-            p.longueur * p.largeur * p.quantite / 1e6 for p in self.pieces
-        )
-        lines.append(f"  Surface totale panneaux : {surface_totale:.2f} m2")
-        lines.append("")
+        lines.extend(("", f"  Surface totale panneaux : {surface_totale:.2f} m2", ""))
 
         if self.quincaillerie:
-            lines.append("-" * 80)
-            lines.append("  QUINCAILLERIE")
-            lines.append("-" * 80)
-            for q in self.quincaillerie:
-                lines.append(f"    {q['nom']:<40} x{q['quantite']:<4} {q['description']}")
+            lines.extend(("-" * 80, "  QUINCAILLERIE", "-" * 80))
+            lines.extend(
+                _FMT_LIGNE_QUINC(q["nom"], q["quantite"], q["description"])
+                for q in self.quincaillerie
+            )
             lines.append("")
 
-        lines.append("-" * 80)
-        lines.append("  RESUME MATERIAUX")
-        lines.append("-" * 80)
-
-        materiaux = {}
-        for p in self.pieces:
-            key = (p.epaisseur, p.couleur_fab, p.materiau)
-            if key not in materiaux:
-                materiaux[key] = {"surface": 0, "pieces": []}
-            materiaux[key]["surface"] += p.longueur * p.largeur * p.quantite / 1e6
-            materiaux[key]["pieces"].append(p)
-
-        for (ep, coul, mat), info in materiaux.items():
-            lines.append(f"    {mat} {ep:.0f}mm {coul}: {info['surface']:.2f} m2 "
-                         f"({len(info['pieces'])} pieces)")
-
-        lines.append("")
-        lines.append("=" * 80)
+        lines.extend(("-" * 80, "  RESUME MATERIAUX", "-" * 80))
+        lines.extend(
+            _FMT_LIGNE_MATERIAU(mat, ep, coul, info["surface"], len(info["pieces"]))
+            for (ep, coul, mat), info in materiaux.items()
+        )
+        lines.extend(("", "=" * 80))
         return "\n".join(lines)
 
 
@@ -229,17 +237,13 @@ def calculer_largeurs_compartiments(config: dict) -> list[float]:
 
     elif mode == "proportions":
         props_str = config["largeurs_compartiments"]
-        parts = props_str.split(",")
         fractions = []
-        for part in parts:
-            part = part.strip()
-            if "/" in part:
-                num, den = part.split("/")
-                fractions.append(float(num) / float(den))
-            else:
-                fractions.append(float(part))
-        total_frac = sum(fractions)
-        return [largeur_disponible * f / total_frac for f in fractions]
+        for part in props_str.split(","):
+            num, barre, den = part.strip().partition("/")
+            fractions.append(float(num) / float(den) if barre else float(num))
+        # Un seul facteur d'echelle pour toutes les proportions
+        facteur = largeur_disponible / sum(fractions)
+        return [f * facteur for f in fractions]
 
     elif mode == "dimensions":
         dims = config["largeurs_compartiments"]
@@ -279,38 +283,40 @@ def calculer_dimensions_rayon(config: dict, compartiment_idx: int,
     """
     comp = config["compartiments"][compartiment_idx]
     profondeur = config["profondeur"]
-    chant_ep = config["panneau_rayon"]["chant_epaisseur"]
-    retrait_av = config["panneau_rayon"].get("retrait_avant", 0)
-    retrait_ar = config["panneau_rayon"].get("retrait_arriere", 0)
+    pr = config["panneau_rayon"]
+    chant_ep = pr["chant_epaisseur"]
+    retrait_av = pr.get("retrait_avant", 0)
+    retrait_ar = pr.get("retrait_arriere", 0)
 
     prof_rayon = profondeur - chant_ep - retrait_av - retrait_ar
     larg_rayon = largeur_compartiment
 
-    saillie = config["crem_encastree"].get("saillie", 0)
+    # Encombrements lateraux possibles (identiques a gauche et a droite)
+    ce = config["crem_encastree"]
+    ca = config["crem_applique"]
+    jeu_encastree = ce.get("saillie", 0) + ce["jeu_rayon"]
+    jeu_panneau_mur = config["panneau_mur"]["epaisseur"] + jeu_encastree
+    jeu_applique = ca["epaisseur_saillie"] + ca["jeu_rayon"]
 
     # Cote gauche
     crem_g = comp.get("type_crem_gauche")
     panneau_mur_g = comp.get("panneau_mur_gauche", False)
     if panneau_mur_g:
-        larg_rayon -= (config["panneau_mur"]["epaisseur"]
-                       + saillie + config["crem_encastree"]["jeu_rayon"])
+        larg_rayon -= jeu_panneau_mur
     elif crem_g == "encastree":
-        larg_rayon -= (saillie + config["crem_encastree"]["jeu_rayon"])
+        larg_rayon -= jeu_encastree
     elif crem_g == "applique":
-        larg_rayon -= (config["crem_applique"]["epaisseur_saillie"]
-                       + config["crem_applique"]["jeu_rayon"])
+        larg_rayon -= jeu_applique
 
     # Cote droit
     crem_d = comp.get("type_crem_droite")
     panneau_mur_d = comp.get("panneau_mur_droite", False)
     if panneau_mur_d:
-        larg_rayon -= (config["panneau_mur"]["epaisseur"]
-                       + saillie + config["crem_encastree"]["jeu_rayon"])
+        larg_rayon -= jeu_panneau_mur
     elif crem_d == "encastree":
-        larg_rayon -= (saillie + config["crem_encastree"]["jeu_rayon"])
+        larg_rayon -= jeu_encastree
     elif crem_d == "applique":
-        larg_rayon -= (config["crem_applique"]["epaisseur_saillie"]
-                       + config["crem_applique"]["jeu_rayon"])
+        larg_rayon -= jeu_applique
 
     return prof_rayon, larg_rayon
 
@@ -319,12 +325,13 @@ def calculer_dimensions_rayon(config: dict, compartiment_idx: int,
 #  GEOMETRIE 2D (VUE DE FACE) POUR VIEWER ET PDF
 # =========================================================================
 
-class Rect:
+class Rect(NamedTuple):
     """Rectangle 2D pour le dessin en vue de face.
 
     Represente un element du placard dans le plan XZ (vue de face) :
     X correspond a la largeur (gauche vers droite) et Y correspond
-    a la hauteur (sol vers plafond).
+    a la hauteur (sol vers plafond). Les rectangles ne sont jamais
+    modifies apres leur generation : un tuple nomme immuable suffit.
 
     Attributes:
         x: Position horizontale du coin inferieur gauche en mm.
@@ -337,26 +344,13 @@ class Rect:
             (ex. ``"rayon"``, ``"separation"``, ``"mur"``).
     """
 
-    def __init__(self, x: float, y: float, w: float, h: float,
-                 couleur: str = "#C8B68C", label: str = "", type_elem: str = ""):
-        """Initialise un rectangle 2D.
-
-        Args:
-            x: Position horizontale du coin inferieur gauche en mm.
-            y: Position verticale du coin inferieur gauche en mm.
-            w: Largeur du rectangle en mm.
-            h: Hauteur du rectangle en mm.
-            couleur: Couleur de remplissage au format hexadecimal.
-            label: Libelle descriptif de l'element.
-            type_elem: Type d'element (ex. ``"rayon"``, ``"separation"``).
-        """
-        self.x = x
-        self.y = y
-        self.w = w
-        self.h = h
-        self.couleur = couleur
-        self.label = label
-        self.type_elem = type_elem
+    x: float
+    y: float
+    w: float
+    h: float
+    couleur: str = "#C8B68C"
+    label: str = ""
+    type_elem: str = ""
 
     def __repr__(self):
         """Retourne une representation textuelle du rectangle.
@@ -372,16 +366,49 @@ def rgb_to_hex(rgb: tuple | list) -> str:
 
     Args:
         rgb: Tuple ou liste de 3 flottants entre 0 et 1 representant
-            les composantes rouge, vert et bleu.
+            les composantes rouge, vert et bleu. Une composante hors de
+            cet intervalle est ramenee a la borne la plus proche.
 
     Returns:
         Chaine hexadecimale au format ``"#rrggbb"``.
     """
-    r, g, b = rgb[:3]
-    return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
+    # Les configurations issues du JSON fournissent des listes : la cle du
+    # cache doit etre un tuple.
+    return _rgb_to_hex(tuple(rgb[:3]))
+
+
+# Table des 256 octets en hexadecimal : evite le formateur a chaque composante
+_HEX = tuple(f"{i:02x}" for i in range(256))
+
+
+@lru_cache(maxsize=64)
+def _rgb_to_hex(rgb: tuple) -> str:
+    """Conversion memorisee d'un triplet RGB normalise (cf. ``rgb_to_hex``)."""
+    return "#" + "".join(_HEX[max(0, min(255, int(c * 255)))] for c in rgb)
+
+
+def grouper_par_type(rects: list[Rect]) -> dict[str, list[Rect]]:
+    """Regroupe les rectangles par type d'element, en conservant leur ordre.
+
+    Les consommateurs (viewer, PDF) dessinent couche par couche et cherchent
+    les separations, le sol ou les rayons : un regroupement unique evite de
+    reparcourir toute la liste pour chaque type.
+
+    Args:
+        rects: Rectangles produits par ``generer_geometrie_2d``.
+
+    Returns:
+        Dictionnaire ``{type_elem: [Rect, ...]}``.
+    """
+    groupes: dict[str, list[Rect]] = {}
+    for r in rects:
+        groupes.setdefault(r.type_elem, []).append(r)
+    return groupes
 
 
-def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
+def generer_geometrie_2d(
+    config: dict, *, geometrie: bool = True,
+) -> tuple[list[Rect], FicheFabrication]:
     """Genere la geometrie 2D (vue de face) et la fiche de fabrication.
 
     Parcourt la configuration complete du placard pour produire la liste
@@ -398,6 +425,8 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
         config: Dictionnaire de configuration complet du placard, tel que
             produit par ``schema_vers_config``. Doit contenir toutes les cles
             de dimensions, topologie, panneaux, cremailleres et tasseaux.
+        geometrie: Si False, seule la fiche de fabrication est calculee et
+            la liste des rectangles retournee est vide (voir ``generer_fiche``).
 
     Returns:
         Tuple ``(rectangles, fiche_fabrication)`` ou :
@@ -416,10 +445,41 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
     ep_rayon_haut = config["panneau_rayon_haut"]["epaisseur"]
 
     largeurs = calculer_largeurs_compartiments(config)
-    nb_comp = len(config["compartiments"])
+    compartiments = config["compartiments"]
+    separations = config["separations"]
+    nb_comp = len(compartiments)
+
+    # Sous-dictionnaires et valeurs lus une fois (utilises dans les boucles)
+    pr = config["panneau_rayon"]
+    prh = config["panneau_rayon_haut"]
+    ps = config["panneau_separation"]
+    pm = config["panneau_mur"]
+    ce = config["crem_encastree"]
+    ca = config["crem_applique"]
+    tass = config["tasseau"]
+    pm_ep = pm["epaisseur"]
+    ce_ep = ce["epaisseur"]
+    ce_saillie = ce.get("saillie", 0)
+    ca_saillie = ca["epaisseur_saillie"]
+    tass_l = tass["section_l"]
+    tass_h = tass["section_h"]
+    rh_on = config["rayon_haut"]
+    rh_pos = config["rayon_haut_position"]
+    # Dessous du rayon haut (ou plafond) et limite haute des rayons
+    z_sous_rh = H - rh_pos if rh_on else H
+    z_haut_rayons = H - rh_pos - ep_rayon_haut if rh_on else H
+
+    # Couleurs de rendu, identiques pour tous les elements d'un meme type
+    col_rayon = rgb_to_hex(pr["couleur_rgb"])
+    col_rh = rgb_to_hex(prh["couleur_rgb"])
+    col_sep = rgb_to_hex(ps["couleur_rgb"])
+    col_pm = rgb_to_hex(pm["couleur_rgb"])
+    col_ce = rgb_to_hex(ce["couleur_rgb"])
+    col_ca = rgb_to_hex(ca["couleur_rgb"])
+    col_tass = rgb_to_hex(tass["couleur_rgb"])
 
     # --- Murs ---
-    if config.get("afficher_murs", True):
+    if geometrie and config.get("afficher_murs", True):
         mur_ep = config.get("mur_epaisseur", 50)
         mur_ep2 = mur_ep * 2
         mur_coul = rgb_to_hex(config.get("mur_couleur_rgb", (0.85, 0.85, 0.82)))
@@ -435,18 +495,18 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
     x_courant = 0.0
 
     # --- Rayon haut ---
-    if config["rayon_haut"]:
-        z_rayon_haut = H - config["rayon_haut_position"]
-        rh_retrait_av = config["panneau_rayon_haut"].get("retrait_avant", 0)
-        rh_retrait_ar = config["panneau_rayon_haut"].get("retrait_arriere", 0)
-        prof_rh = P - config["panneau_rayon_haut"]["chant_epaisseur"] - rh_retrait_av - rh_retrait_ar
+    if rh_on:
+        z_rayon_haut = z_sous_rh
+        rh_retrait_av = prh.get("retrait_avant", 0)
+        rh_retrait_ar = prh.get("retrait_arriere", 0)
+        prof_rh = P - prh["chant_epaisseur"] - rh_retrait_av - rh_retrait_ar
 
         # Trouver les X des separations toute hauteur pour couper le rayon haut
         coupures_x = []
         x_acc = 0.0
-        for sep_idx in range(len(config["separations"])):
+        for sep_idx in range(len(separations)):
             x_acc += largeurs[sep_idx]
-            if config["separations"][sep_idx]["mode"] == "toute_hauteur":
+            if separations[sep_idx]["mode"] == "toute_hauteur":
                 coupures_x.append(x_acc)
             x_acc += ep_sep
 
@@ -464,37 +524,38 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
             if w_rh <= 0:
                 continue
             label = f"Rayon haut {seg_idx+1}" if len(bords) > 2 else "Rayon haut"
-            rects.append(Rect(
-                x_rh, z_rayon_haut, w_rh, ep_rayon_haut,
-                rgb_to_hex(config["panneau_rayon_haut"]["couleur_rgb"]),
-                label, "rayon_haut"
-            ))
+            if geometrie:
+                rects.append(Rect(
+                    x_rh, z_rayon_haut, w_rh, ep_rayon_haut,
+                    col_rh,
+                    label, "rayon_haut"
+                ))
             fiche.ajouter_piece(PieceInfo(
                 label, w_rh, prof_rh, ep_rayon_haut,
-                couleur_fab=config["panneau_rayon_haut"]["couleur_fab"],
-                chant_desc=f"Avant {config['panneau_rayon_haut']['chant_epaisseur']}mm",
+                couleur_fab=prh["couleur_fab"],
+                chant_desc=f"Avant {prh['chant_epaisseur']}mm",
                 notes="Pose sur tasseaux",
-                sens_fil=config["panneau_rayon_haut"].get("sens_fil", True),
+                sens_fil=prh.get("sens_fil", True),
             ))
 
     # --- Boucle compartiments ---
     for comp_idx in range(nb_comp):
-        comp = config["compartiments"][comp_idx]
+        comp = compartiments[comp_idx]
         larg_comp = largeurs[comp_idx]
         x_debut = x_courant
         x_fin = x_courant + larg_comp
 
         # --- Panneau mur gauche ---
         if comp.get("panneau_mur_gauche", False) and comp_idx == 0:
-            pm = config["panneau_mur"]
-            h_pm = H - config["rayon_haut_position"] if config["rayon_haut"] else H
-            rects.append(Rect(
-                0, 0, pm["epaisseur"], h_pm,
-                rgb_to_hex(pm["couleur_rgb"]),
-                "Panneau mur G", "panneau_mur"
-            ))
+            h_pm = z_sous_rh
+            if geometrie:
+                rects.append(Rect(
+                    0, 0, pm_ep, h_pm,
+                    col_pm,
+                    "Panneau mur G", "panneau_mur"
+                ))
             fiche.ajouter_piece(PieceInfo(
-                "Panneau mur gauche", h_pm, P - pm["chant_epaisseur"], pm["epaisseur"],
+                "Panneau mur gauche", h_pm, P - pm["chant_epaisseur"], pm_ep,
                 couleur_fab=pm["couleur_fab"],
                 chant_desc=f"Avant {pm['chant_epaisseur']}mm",
                 notes="Fixe au mur, cremailleres encastrees",
@@ -503,15 +564,15 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
 
         # --- Panneau mur droit ---
         if comp.get("panneau_mur_droite", False) and comp_idx == nb_comp - 1:
-            pm = config["panneau_mur"]
-            h_pm = H - config["rayon_haut_position"] if config["rayon_haut"] else H
-            rects.append(Rect(
-                L - pm["epaisseur"], 0, pm["epaisseur"], h_pm,
-                rgb_to_hex(pm["couleur_rgb"]),
-                "Panneau mur D", "panneau_mur"
-            ))
+            h_pm = z_sous_rh
+            if geometrie:
+                rects.append(Rect(
+                    L - pm_ep, 0, pm_ep, h_pm,
+                    col_pm,
+                    "Panneau mur D", "panneau_mur"
+                ))
             fiche.ajouter_piece(PieceInfo(
-                "Panneau mur droit", h_pm, P - pm["chant_epaisseur"], pm["epaisseur"],
+                "Panneau mur droit", h_pm, P - pm["chant_epaisseur"], pm_ep,
                 couleur_fab=pm["couleur_fab"],
                 chant_desc=f"Avant {pm['chant_epaisseur']}mm",
                 notes="Fixe au mur, cremailleres encastrees",
@@ -520,11 +581,11 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
 
         # --- Cremailleres ---
         if comp["rayons"] > 0:
-            h_sous_rayon = H - config["rayon_haut_position"] if config["rayon_haut"] else H
+            h_sous_rayon = z_sous_rh
 
             # Hauteur crem gauche = hauteur de la separation gauche (ou panneau mur)
             if comp_idx > 0:
-                sep_g = config["separations"][comp_idx - 1]
+                sep_g = separations[comp_idx - 1]
                 if sep_g["mode"] == "toute_hauteur":
                     h_crem_g = H
                 else:
@@ -534,7 +595,7 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
 
             # Hauteur crem droite = hauteur de la separation droite (ou panneau mur)
             if comp_idx < nb_comp - 1:
-                sep_d = config["separations"][comp_idx]
+                sep_d = separations[comp_idx]
                 if sep_d["mode"] == "toute_hauteur":
                     h_crem_d = H
                 else:
@@ -544,30 +605,30 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
 
             crem_g = comp.get("type_crem_gauche")
             panneau_mur_g = comp.get("panneau_mur_gauche", False)
-            ce = config["crem_encastree"]
-            ca = config["crem_applique"]
 
             # Cremaillere gauche
             if panneau_mur_g or crem_g == "encastree":
                 if panneau_mur_g:
-                    x_cg = x_debut + config["panneau_mur"]["epaisseur"] - ce["epaisseur"]
+                    x_cg = x_debut + pm_ep - ce_ep
                 else:
-                    x_cg = x_debut - ce["epaisseur"] + ce.get("saillie", 0)
-                rects.append(Rect(
-                    x_cg, 0, ce["epaisseur"], h_crem_g,
-                    rgb_to_hex(ce["couleur_rgb"]),
-                    f"Crem enc. G C{comp_idx+1}", "cremaillere_encastree"
-                ))
+                    x_cg = x_debut - ce_ep + ce_saillie
+                if geometrie:
+                    rects.append(Rect(
+                        x_cg, 0, ce_ep, h_crem_g,
+                        col_ce,
+                        f"Crem enc. G C{comp_idx+1}", "cremaillere_encastree"
+                    ))
                 fiche.ajouter_quincaillerie(
                     f"Cremaillere encastree (C{comp_idx+1} gauche)", 2,
                     f"L={h_crem_g:.0f}mm"
                 )
             elif crem_g == "applique":
-                rects.append(Rect(
-                    x_debut, 0, ca["epaisseur_saillie"], h_crem_g,
-                    rgb_to_hex(ca["couleur_rgb"]),
-                    f"Crem app. G C{comp_idx+1}", "cremaillere_applique"
-                ))
+                if geometrie:
+                    rects.append(Rect(
+                        x_debut, 0, ca_saillie, h_crem_g,
+                        col_ca,
+                        f"Crem app. G C{comp_idx+1}", "cremaillere_applique"
+                    ))
                 fiche.ajouter_quincaillerie(
                     f"Cremaillere applique (C{comp_idx+1} gauche)", 2,
                     f"L={h_crem_g:.0f}mm"
@@ -578,36 +639,36 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
             panneau_mur_d = comp.get("panneau_mur_droite", False)
             if panneau_mur_d or crem_d == "encastree":
                 if panneau_mur_d:
-                    x_cd = L - config["panneau_mur"]["epaisseur"]
+                    x_cd = L - pm_ep
                 else:
-                    x_cd = x_fin - ce.get("saillie", 0)
-                rects.append(Rect(
-                    x_cd, 0, ce["epaisseur"], h_crem_d,
-                    rgb_to_hex(ce["couleur_rgb"]),
-                    f"Crem enc. D C{comp_idx+1}", "cremaillere_encastree"
-                ))
+                    x_cd = x_fin - ce_saillie
+                if geometrie:
+                    rects.append(Rect(
+                        x_cd, 0, ce_ep, h_crem_d,
+                        col_ce,
+                        f"Crem enc. D C{comp_idx+1}", "cremaillere_encastree"
+                    ))
                 fiche.ajouter_quincaillerie(
                     f"Cremaillere encastree (C{comp_idx+1} droite)", 2,
                     f"L={h_crem_d:.0f}mm"
                 )
             elif crem_d == "applique":
-                rects.append(Rect(
-                    x_fin - ca["epaisseur_saillie"], 0, ca["epaisseur_saillie"], h_crem_d,
-                    rgb_to_hex(ca["couleur_rgb"]),
-                    f"Crem app. D C{comp_idx+1}", "cremaillere_applique"
-                ))
+                if geometrie:
+                    rects.append(Rect(
+                        x_fin - ca_saillie, 0, ca_saillie, h_crem_d,
+                        col_ca,
+                        f"Crem app. D C{comp_idx+1}", "cremaillere_applique"
+                    ))
                 fiche.ajouter_quincaillerie(
                     f"Cremaillere applique (C{comp_idx+1} droite)", 2,
                     f"L={h_crem_d:.0f}mm"
                 )
 
         # --- Rayons ---
+        # Hauteurs des rayons, reprises telles quelles par les tasseaux
+        z_rayons = []
         if comp["rayons"] > 0:
             prof_rayon, larg_rayon = calculer_dimensions_rayon(config, comp_idx, larg_comp)
-            z_haut_rayons = H
-            if config["rayon_haut"]:
-                z_haut_rayons = H - config["rayon_haut_position"] - ep_rayon_haut
-
             nb_rayons = comp["rayons"]
             espace = z_haut_rayons / (nb_rayons + 1)
 
@@ -628,32 +689,33 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
             x_rayon = x_debut
             crem_g = comp.get("type_crem_gauche")
             panneau_mur_g = comp.get("panneau_mur_gauche", False)
-            saillie = ce.get("saillie", 0)
             if panneau_mur_g:
-                x_rayon += config["panneau_mur"]["epaisseur"] + saillie + ce["jeu_rayon"]
+                x_rayon += pm_ep + ce_saillie + ce["jeu_rayon"]
             elif crem_g == "encastree":
-                x_rayon += saillie + ce["jeu_rayon"]
+                x_rayon += ce_saillie + ce["jeu_rayon"]
             elif crem_g == "applique":
-                x_rayon += ca["epaisseur_saillie"] + ca["jeu_rayon"]
+                x_rayon += ca_saillie + ca["jeu_rayon"]
 
-            for r_idx in range(nb_rayons):
-                z_rayon = espace * (r_idx + 1)
-                if pas_arrondi > 0:
-                    z_rayon = round(z_rayon / pas_arrondi) * pas_arrondi
-                rects.append(Rect(
-                    x_rayon, z_rayon, larg_rayon, ep_rayon,
-                    rgb_to_hex(config["panneau_rayon"]["couleur_rgb"]),
-                    f"Rayon C{comp_idx+1} R{r_idx+1}", "rayon"
-                ))
+            z_rayons = [espace * (r_idx + 1) for r_idx in range(nb_rayons)]
+            if pas_arrondi > 0:
+                z_rayons = [round(z / pas_arrondi) * pas_arrondi for z in z_rayons]
+
+            if geometrie:
+                for r_idx, z_rayon in enumerate(z_rayons):
+                    rects.append(Rect(
+                        x_rayon, z_rayon, larg_rayon, ep_rayon,
+                        col_rayon,
+                        f"Rayon C{comp_idx+1} R{r_idx+1}", "rayon"
+                    ))
 
             fiche.ajouter_piece(PieceInfo(
                 f"Rayon compartiment {comp_idx+1}",
                 larg_rayon, prof_rayon, ep_rayon,
-                couleur_fab=config["panneau_rayon"]["couleur_fab"],
-                chant_desc=f"Avant {config['panneau_rayon']['chant_epaisseur']}mm",
+                couleur_fab=pr["couleur_fab"],
+                chant_desc=f"Avant {pr['chant_epaisseur']}mm",
                 quantite=nb_rayons,
                 notes="Sur cremailleres",
-                sens_fil=config["panneau_rayon"].get("sens_fil", True),
+                sens_fil=pr.get("sens_fil", True),
             ))
 
             # --- Taquets de cremailleres ---
@@ -674,8 +736,7 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
                 )
 
         # --- Tasseaux ---
-        tass = config["tasseau"]
-        longueur_tasseau = P - config["panneau_rayon"]["chant_epaisseur"] - tass["retrait_avant"]
+        longueur_tasseau = P - pr["chant_epaisseur"] - tass["retrait_avant"]
 
         trh_g = comp.get("tasseau_rayon_haut_gauche", False)
         trh_d = comp.get("tasseau_rayon_haut_droite", False)
@@ -685,68 +746,64 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
         nb_tass_g = 0
         nb_tass_d = 0
 
-        if config["rayon_haut"] and (trh_g or trh_d):
-            z_rh = H - config["rayon_haut_position"]
-            z_tass = z_rh - tass["section_h"]
+        # Positions X des tasseaux, communes au rayon haut et a tous les rayons
+        if comp_idx == 0:
+            x_tg = pm_ep if comp.get("panneau_mur_gauche") else 0
+        else:
+            x_tg = x_debut
+        if comp_idx == nb_comp - 1:
+            x_td = L - pm_ep - tass_l if comp.get("panneau_mur_droite") else L - tass_l
+        else:
+            x_td = x_fin - tass_l
+
+        if rh_on and (trh_g or trh_d):
+            z_tass = z_sous_rh - tass_h
 
             if trh_g:
-                x_tg = config["panneau_mur"]["epaisseur"] if (comp_idx == 0 and comp.get("panneau_mur_gauche")) else (0 if comp_idx == 0 else x_debut)
-                rects.append(Rect(
-                    x_tg, z_tass, tass["section_l"], tass["section_h"],
-                    rgb_to_hex(tass["couleur_rgb"]),
-                    f"Tasseau RH G C{comp_idx+1}", "tasseau"
-                ))
+                if geometrie:
+                    rects.append(Rect(
+                        x_tg, z_tass, tass_l, tass_h,
+                        col_tass,
+                        f"Tasseau RH G C{comp_idx+1}", "tasseau"
+                    ))
                 nb_tass_g += 1
 
             if trh_d:
-                if comp_idx == nb_comp - 1:
-                    x_td = L - config["panneau_mur"]["epaisseur"] - tass["section_l"] if comp.get("panneau_mur_droite") else L - tass["section_l"]
-                else:
-                    x_td = x_fin - tass["section_l"]
-                rects.append(Rect(
-                    x_td, z_tass, tass["section_l"], tass["section_h"],
-                    rgb_to_hex(tass["couleur_rgb"]),
-                    f"Tasseau RH D C{comp_idx+1}", "tasseau"
-                ))
+                if geometrie:
+                    rects.append(Rect(
+                        x_td, z_tass, tass_l, tass_h,
+                        col_tass,
+                        f"Tasseau RH D C{comp_idx+1}", "tasseau"
+                    ))
                 nb_tass_d += 1
 
-        if comp["rayons"] > 0 and (tr_g or tr_d):
-            z_haut_rayons = H - config["rayon_haut_position"] - ep_rayon_haut if config["rayon_haut"] else H
-            nb_rayons = comp["rayons"]
-            espace = z_haut_rayons / (nb_rayons + 1)
-
-            for r_idx in range(nb_rayons):
-                z_r = espace * (r_idx + 1)
-                if pas_arrondi > 0:
-                    z_r = round(z_r / pas_arrondi) * pas_arrondi
-                z_tass_r = z_r - tass["section_h"]
+        if z_rayons and (tr_g or tr_d):
+            for r_idx, z_r in enumerate(z_rayons):
+                z_tass_r = z_r - tass_h
 
                 if tr_g:
-                    x_tg = config["panneau_mur"]["epaisseur"] if (comp_idx == 0 and comp.get("panneau_mur_gauche")) else (0 if comp_idx == 0 else x_debut)
-                    rects.append(Rect(
-                        x_tg, z_tass_r, tass["section_l"], tass["section_h"],
-                        rgb_to_hex(tass["couleur_rgb"]),
-                        f"Tasseau R{r_idx+1} G C{comp_idx+1}", "tasseau"
-                    ))
+                    if geometrie:
+                        rects.append(Rect(
+                            x_tg, z_tass_r, tass_l, tass_h,
+                            col_tass,
+                            f"Tasseau R{r_idx+1} G C{comp_idx+1}", "tasseau"
+                        ))
                     nb_tass_g += 1
 
                 if tr_d:
-                    if comp_idx == nb_comp - 1:
-                        x_td = L - config["panneau_mur"]["epaisseur"] - tass["section_l"] if comp.get("panneau_mur_droite") else L - tass["section_l"]
-                    else:
-                        x_td = x_fin - tass["section_l"]
-                    rects.append(Rect(
-                        x_td, z_tass_r, tass["section_l"], tass["section_h"],
-                        rgb_to_hex(tass["couleur_rgb"]),
-                        f"Tasseau R{r_idx+1} D C{comp_idx+1}", "tasseau"
-                    ))
+                    if geometrie:
+                        rects.append(Rect(
+                            x_td, z_tass_r, tass_l, tass_h,
+                            col_tass,
+                            f"Tasseau R{r_idx+1} D C{comp_idx+1}", "tasseau"
+                        ))
                     nb_tass_d += 1
 
         if nb_tass_g > 0:
             support = "mur" if comp_idx == 0 else f"separation {comp_idx}"
             fiche.ajouter_piece(PieceInfo(
                 f"Tasseau C{comp_idx+1} gauche ({support})",
-                longueur_tasseau, tass["section_l"], tass["section_h"],
+                longueur_tasseau, tass_l, tass_h,
                 materiau="Tasseau bois", quantite=nb_tass_g,
                 notes=f"Biseaute en bout, fixe sur {support}"
             ))
@@ -754,36 +811,37 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
             support = "mur" if comp_idx == nb_comp - 1 else f"separation {comp_idx+1}"
             fiche.ajouter_piece(PieceInfo(
                 f"Tasseau C{comp_idx+1} droite ({support})",
-                longueur_tasseau, tass["section_l"], tass["section_h"],
+                longueur_tasseau, tass_l, tass_h,
                 materiau="Tasseau bois", quantite=nb_tass_d,
                 notes=f"Biseaute en bout, fixe sur {support}"
             ))
 
         # --- Separation apres ce compartiment ---
         if comp_idx < nb_comp - 1:
-            sep = config["separations"][comp_idx]
+            sep = separations[comp_idx]
             x_sep = x_fin
 
-            if sep["mode"] == "sous_rayon" and config["rayon_haut"]:
-                h_sep = H - config["rayon_haut_position"]
+            if sep["mode"] == "sous_rayon" and rh_on:
+                h_sep = z_sous_rh
             else:
                 h_sep = H
 
-            prof_sep = P - config["panneau_separation"]["chant_epaisseur"]
+            prof_sep = P - ps["chant_epaisseur"]
 
-            rects.append(Rect(
-                x_sep, 0, ep_sep, h_sep,
-                rgb_to_hex(config["panneau_separation"]["couleur_rgb"]),
-                f"Separation {comp_idx+1}", "separation"
-            ))
+            if geometrie:
+                rects.append(Rect(
+                    x_sep, 0, ep_sep, h_sep,
+                    col_sep,
+                    f"Separation {comp_idx+1}", "separation"
+                ))
 
             fiche.ajouter_piece(PieceInfo(
                 f"Separation {comp_idx+1}",
                 h_sep, prof_sep, ep_sep,
-                couleur_fab=config["panneau_separation"]["couleur_fab"],
-                chant_desc=f"Avant {config['panneau_separation']['chant_epaisseur']}mm",
+                couleur_fab=ps["couleur_fab"],
+                chant_desc=f"Avant {ps['chant_epaisseur']}mm",
                 notes=f"Mode: {sep['mode']}",
-                sens_fil=config["panneau_separation"].get("sens_fil", True),
+                sens_fil=ps.get("sens_fil", True),
             ))
 
         x_courant = x_fin
@@ -791,3 +849,18 @@ def generer_geometrie_2d(config: dict) -> tuple[list[Rect], FicheFabrication]:
             x_courant += ep_sep
 
     return rects, fiche
+
+
+def generer_fiche(config: dict) -> FicheFabrication:
+    """Genere uniquement la fiche de fabrication d'un placard.
+
+    Equivalent a ``generer_geometrie_2d(config)[1]`` sans construire les
+    rectangles de la vue de face, inutiles pour le debit et les etiquettes.
+
+    Args:
+        config: Dictionnaire de configuration complet du placard.
+
+    Returns:
+        Instance ``FicheFabrication`` contenant les pieces et la quincaillerie.
+    """
+    return generer_geometrie_2d(config, geometrie=False)[1]
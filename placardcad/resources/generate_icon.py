@@ -1,10 +1,22 @@
 """Generateur d'icone pour PlacardCAD / REB & ELOI."""
 
+from functools import lru_cache
+
 from PIL import Image, ImageDraw, ImageFont
 import os
 
 SIZE = 256
 PAD = 20
+POLICE_TEXTE = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+
+@lru_cache(maxsize=1)
+def _police_texte() -> ImageFont.ImageFont:
+    """Charge une seule fois la police du texte "R&E" (police par defaut si absente)."""
+    try:
+        return ImageFont.truetype(POLICE_TEXTE, 22)
+    except (OSError, IOError):
+        return ImageFont.load_default()
 
 
 def generer_icone(taille: int = SIZE) -> Image.Image:
@@ -72,21 +84,20 @@ def generer_icone(taille: int = SIZE) -> Image.Image:
         draw.rectangle([sep_x + sep_w + 2, ry, ix + iw - 2, ry + rayon_h], fill=bois)
 
     # Cremailleres (petits traits verticaux sur les bords de la separation)
-    crem_color = (120, 120, 120)
+    # Les quatre cremailleres sont identiques : les traits sont dessines une
+    # fois dans un masque, puis le masque est applique a chaque position.
+    crem_color = (120, 120, 120, 255)
     crem_w = 3
-    # Gauche de la separation
-    for i in range(zone_y_haut + 8, zone_y_bas - 4, 8):
-        draw.rectangle([sep_x - crem_w, i, sep_x, i + 2], fill=crem_color)
-    # Droite de la separation
-    for i in range(zone_y_haut + 8, zone_y_bas - 4, 8):
-        draw.rectangle([sep_x + sep_w, i, sep_x + sep_w + crem_w, i + 2],
-                        fill=crem_color)
-    # Mur gauche interieur
-    for i in range(zone_y_haut + 8, zone_y_bas - 4, 8):
-        draw.rectangle([ix, i, ix + crem_w, i + 2], fill=crem_color)
-    # Mur droit interieur
-    for i in range(zone_y_haut + 8, zone_y_bas - 4, 8):
-        draw.rectangle([ix + iw - crem_w, i, ix + iw, i + 2], fill=crem_color)
+    traits = range(zone_y_haut + 8, zone_y_bas - 4, 8)
+    if traits:
+        y0 = traits[0]
+        masque = Image.new("L", (crem_w + 1, traits[-1] + 3 - y0), 0)
+        draw_masque = ImageDraw.Draw(masque)
+        for i in traits:
+            draw_masque.rectangle([0, i - y0, crem_w, i - y0 + 2], fill=255)
+        # Gauche et droite de la separation, murs gauche et droit interieurs
+        for x0 in (sep_x - crem_w, sep_x + sep_w, ix, ix + iw - crem_w):
+            img.paste(crem_color, (x0, y0), masque)
 
     # Tasseaux sous rayon haut (petits triangles)
     tass_color = bois_fonce
@@ -109,10 +120,7 @@ def generer_icone(taille: int = SIZE) -> Image.Image:
                   (tx, rh_y + rh_h + tass_size)], fill=tass_color)
 
     # Texte "R&E" en bas
-    try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 22)
-    except (OSError, IOError):
-        font = ImageFont.load_default()
+    font = _police_texte()
     text = "R&E"
     text_color = (230, 220, 200)
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -128,21 +136,22 @@ def main():
     """Genere les icones en plusieurs tailles."""
     out_dir = os.path.dirname(os.path.abspath(__file__))
 
-    # PNG 256x256
+    # Un seul rendu 256x256, source de toutes les tailles
     icon = generer_icone(256)
+
+    # PNG 256x256
     icon.save(os.path.join(out_dir, "icon_256.png"))
 
     # PNG 64x64
-    icon_64 = generer_icone(256).resize((64, 64), Image.LANCZOS)
+    icon_64 = icon.resize((64, 64), Image.LANCZOS)
     icon_64.save(os.path.join(out_dir, "icon_64.png"))
 
     # PNG 128x128
-    icon_128 = generer_icone(256).resize((128, 128), Image.LANCZOS)
+    icon_128 = icon.resize((128, 128), Image.LANCZOS)
     icon_128.save(os.path.join(out_dir, "icon_128.png"))
 
     # ICO (multi-taille)
-    icon_ico = generer_icone(256)
-    icon_ico.save(
+    icon.save(
         os.path.join(out_dir, "icon.ico"),
         format="ICO",
         sizes=[(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
@@ -21,7 +21,25 @@ Symboles:
     - Derniere ligne (chiffres) : largeurs en mm par compartiment
 """
 
-import re
+# Chiffres ASCII : detection de la ligne des largeurs
+_CHIFFRES = frozenset("0123456789")
+
+# Decalages de colonne testes autour d'un separateur, par ordre de priorite
+_VOISINAGE = (0, -1, 1, -2, 2)
+
+
+def _present_autour(ligne: str, pos: int, symbole: str) -> bool:
+    """Indique si ``symbole`` apparait a 2 colonnes au plus de ``pos``.
+
+    Args:
+        ligne: Ligne du schema.
+        pos: Colonne du separateur.
+        symbole: Caractere recherche.
+
+    Returns:
+        True si le symbole est present dans la fenetre ``[pos-2, pos+2]``.
+    """
+    return ligne.find(symbole, max(pos - 2, 0), pos + 3) >= 0
 
 
 def parser_schema(schema_text: str) -> dict:
@@ -54,7 +72,10 @@ def parser_schema(schema_text: str) -> dict:
 
     # Detecter si la derniere ligne contient des largeurs
     last_line = lines[-1].strip()
-    has_widths = any(c.isdigit() for c in last_line)
+    if last_line.isascii():
+        has_widths = not _CHIFFRES.isdisjoint(last_line)
+    else:
+        has_widths = any(map(str.isdigit, last_line))
 
     content_lines = lines[:-1] if has_widths else lines[:]
     width_line = lines[-1] if has_widths else None
@@ -71,24 +92,23 @@ def parser_schema(schema_text: str) -> dict:
         rayon_lines = content_lines[:]
 
     # --- Trouver les positions des separateurs verticaux ---
-    all_positions = set()
+    # Par colonne : presence d'un separateur dur (| ou /) et presence d'un
+    # tasseau (*). Ces symboles sont rares dans une ligne : on saute de l'un
+    # a l'autre avec str.find plutot que d'examiner chaque caractere.
+    largeur_max = max(map(len, content_lines))
+    col_dur = bytearray(largeur_max)
+    col_etoile = bytearray(largeur_max)
     for line in content_lines:
-        for i, c in enumerate(line):
-            if c in ("|", "/", "*"):
-                all_positions.add(i)
-
-    hard_sep_positions = set()
-    star_only_positions = set()
-    for pos in all_positions:
-        has_hard = False
-        for line in content_lines:
-            if pos < len(line) and line[pos] in ("|", "/"):
-                has_hard = True
-                break
-        if has_hard:
-            hard_sep_positions.add(pos)
-        else:
-            star_only_positions.add(pos)
+        for symbole, colonnes in (("|", col_dur), ("/", col_dur), ("*", col_etoile)):
+            i = line.find(symbole)
+            while i >= 0:
+                colonnes[i] = 1
+                i = line.find(symbole, i + 1)
+
+    hard_sep_positions = {i for i, v in enumerate(col_dur) if v}
+    star_only_positions = {
+        i for i, v in enumerate(col_etoile) if v and not col_dur[i]
+    }
 
     all_sep = sorted(hard_sep_positions | star_only_positions)
 
@@ -117,22 +137,6 @@ def parser_schema(schema_text: str) -> dict:
     if len(sep_positions) < 2:
         raise ValueError("Le schema doit contenir au moins 2 separateurs verticaux (| ou /)")
 
-    # Map: position -> contient un * (tasseau) ?
-    cluster_has_star = {}
-    for i, cluster in enumerate(clusters):
-        has_star = False
-        for p in cluster:
-            if p in star_only_positions:
-                has_star = True
-                break
-            for line in content_lines:
-                if p < len(line) and line[p] == "*":
-                    has_star = True
-                    break
-            if has_star:
-                break
-        cluster_has_star[sep_positions[i]] = has_star
-
     nb_separateurs = len(sep_positions)
     nb_compartiments = nb_separateurs - 1
 
@@ -140,20 +144,25 @@ def parser_schema(schema_text: str) -> dict:
     tasseau_rh = {}
     if rayon_haut_line:
         for pos in sep_positions:
-            has_star = False
-            for delta in [0, -1, 1, -2, 2]:
-                p = pos + delta
-                if 0 <= p < len(rayon_haut_line) and rayon_haut_line[p] == "*":
-                    has_star = True
-                    break
-            tasseau_rh[pos] = has_star
+            tasseau_rh[pos] = _present_autour(rayon_haut_line, pos, "*")
 
     # --- Determiner le type de cremaillere par separateur ---
+    # Le premier | ou / rencontre (lignes dans l'ordre, puis colonnes par
+    # ordre de proximite) fixe le type : une simple priorite | > / par
+    # colonne ne suffirait pas quand une colonne melange les deux.
     sep_types = {}
     for pos in sep_positions:
         crem_type = None
+        debut, fin = max(pos - 2, 0), pos + 3
+        # Aucun separateur dur dans ces colonnes : inutile de sonder les lignes
+        if not any(col_dur[debut:fin]):
+            sep_types[pos] = crem_type
+            continue
         for line in content_lines:
-            for delta in [0, -1, 1, -2, 2]:
+            fenetre = line[debut:fin]
+            if "|" not in fenetre and "/" not in fenetre:
+                continue
+            for delta in _VOISINAGE:
                 p = pos + delta
                 if 0 <= p < len(line):
                     c = line[p]
@@ -180,18 +189,23 @@ def parser_schema(schema_text: str) -> dict:
         tasseau_rayons_d = False
 
         for line in rayon_lines:
-            zone = ""
-            if pos_droite < len(line):
-                zone = line[pos_gauche:pos_droite + 1]
-            elif pos_gauche < len(line):
-                zone = line[pos_gauche:]
-
-            inner_zone = zone[1:-1] if len(zone) > 2 else zone[1:] if len(zone) > 1 else ""
-            if "_" in inner_zone:
+            # Recherche du rayon entre les deux separateurs, bornee dans la
+            # ligne elle-meme (pas de sous-chaine allouee par compartiment).
+            # Ligne coupee avant le separateur droit : le dernier caractere
+            # est exclu, sauf si la zone se limite a 2 caracteres.
+            n = len(line)
+            if pos_droite < n:
+                fin = pos_droite
+            elif n - pos_gauche > 2:
+                fin = n - 1
+            else:
+                fin = n
+            if line.find("_", pos_gauche + 1, fin) >= 0:
                 nb_rayons += 1
-                if pos_gauche < len(line) and line[pos_gauche] == "*":
+                # Un rayon trouve apres pos_gauche garantit pos_gauche < n
+                if line[pos_gauche] == "*":
                     tasseau_rayons_g = True
-                if pos_droite < len(line) and line[pos_droite] == "*":
+                if pos_droite < n and line[pos_droite] == "*":
                     tasseau_rayons_d = True
 
         panneau_mur_g = (comp_idx == 0 and type_crem_g == "encastree")
@@ -221,15 +235,24 @@ def parser_schema(schema_text: str) -> dict:
         parts = [None] * nb_compartiments
 
         # Trouver chaque nombre et l'assigner au compartiment
-        # dont la zone contient le centre du nombre
-        for match in re.finditer(r'\d+', width_line):
-            center = (match.start() + match.end()) / 2
+        # dont la zone contient le centre du nombre (balayage direct des
+        # suites de chiffres, sans moteur d'expressions regulieres)
+        i, n = 0, len(width_line)
+        while i < n:
+            if not width_line[i].isdecimal():
+                i += 1
+                continue
+            j = i + 1
+            while j < n and width_line[j].isdecimal():
+                j += 1
+            center = (i + j) / 2
             for comp_idx in range(nb_compartiments):
                 pos_g = sep_positions[comp_idx]
                 pos_d = sep_positions[comp_idx + 1]
                 if pos_g < center < pos_d:
-                    parts[comp_idx] = int(match.group())
+                    parts[comp_idx] = int(width_line[i:j])
                     break
+            i = j
 
         if any(p is not None for p in parts):
             if all(p is not None for p in parts):
@@ -246,12 +269,9 @@ def parser_schema(schema_text: str) -> dict:
         # Si le separateur est present sur la ligne rayon haut (| ou /),
         # la separation est sur toute la hauteur
         mode = "sous_rayon"
-        if rayon_haut_line:
-            for delta in [0, -1, 1, -2, 2]:
-                p = pos + delta
-                if 0 <= p < len(rayon_haut_line) and rayon_haut_line[p] in ("|", "/"):
-                    mode = "toute_hauteur"
-                    break
+        if rayon_haut_line and (_present_autour(rayon_haut_line, pos, "|")
+                                or _present_autour(rayon_haut_line, pos, "/")):
+            mode = "toute_hauteur"
         separations.append({"mode": mode})
 
     return {
@@ -264,6 +284,100 @@ def parser_schema(schema_text: str) -> dict:
     }
 
 
+# Configuration par defaut, construite une seule fois a l'import.
+# Les cles issues du schema sont renseignees par ``schema_vers_config``.
+_CONFIG_DEFAUT = {
+    "hauteur": 2500,
+    "largeur": 3000,
+    "profondeur": 600,
+    # Cles fournies par le schema (emplacements reserves pour garder
+    # l'ordre des cles de la configuration)
+    "rayon_haut": None,
+    "rayon_haut_position": 300,
+    "mode_largeur": None,
+    "largeurs_compartiments": None,
+    "nombre_compartiments": None,
+    "separations": None,
+    "compartiments": None,
+    "panneau_separation": {
+        "epaisseur": 19,
+        "couleur_fab": "Chene clair",
+        "couleur_rgb": (0.82, 0.71, 0.55),
+        "chant_epaisseur": 1,
+        "chant_couleur_fab": "Chene clair",
+        "chant_couleur_rgb": (0.85, 0.74, 0.58),
+    },
+    "panneau_rayon": {
+        "epaisseur": 19,
+        "couleur_fab": "Chene clair",
+        "couleur_rgb": (0.82, 0.71, 0.55),
+        "chant_epaisseur": 1,
+        "chant_couleur_fab": "Chene clair",
+        "chant_couleur_rgb": (0.85, 0.74, 0.58),
+        "retrait_avant": 0,
+        "retrait_arriere": 0,
+    },
+    "panneau_rayon_haut": {
+        "epaisseur": 22,
+        "couleur_fab": "Chene clair",
+        "couleur_rgb": (0.82, 0.71, 0.55),
+        "chant_epaisseur": 1,
+        "chant_couleur_fab": "Chene clair",
+        "chant_couleur_rgb": (0.85, 0.74, 0.58),
+        "retrait_avant": 0,
+        "retrait_arriere": 0,
+    },
+    "crem_encastree": {
+        "largeur": 16,
+        "epaisseur": 5,
+        "saillie": 0,
+        "jeu_rayon": 2,
+        "pas": 32,
+        "retrait_avant": 80,
+        "retrait_arriere": 80,
+        "couleur_rgb": (0.6, 0.6, 0.6),
+    },
+    "crem_applique": {
+        "largeur": 25,
+        "epaisseur_saillie": 12,
+        "jeu_rayon": 2,
+        "pas": 32,
+        "retrait_avant": 80,
+        "retrait_arriere": 80,
+        "couleur_rgb": (0.6, 0.6, 0.6),
+    },
+    "tasseau": {
+        "section_h": 30,
+        "section_l": 30,
+        "retrait_avant": 20,
+        "couleur_rgb": (0.85, 0.75, 0.55),
+        "biseau_longueur": 15,
+    },
+    "panneau_mur": {
+        "epaisseur": 19,
+        "couleur_fab": "Chene clair",
+        "couleur_rgb": (0.82, 0.71, 0.55),
+        "chant_epaisseur": 1,
+        "chant_couleur_fab": "Chene clair",
+        "chant_couleur_rgb": (0.85, 0.74, 0.58),
+    },
+    "afficher_murs": True,
+    "mur_epaisseur": 50,
+    "mur_couleur_rgb": (0.85, 0.85, 0.82),
+    "mur_transparence": 85,
+    "export_fiche": True,
+    "dossier_export": "",
+    "debit": {
+        "panneau_longueur": 2800,
+        "panneau_largeur": 2070,
+        "trait_scie": 4.0,
+        "surcote": 2.0,
+        "delignage": 10.0,
+        "sens_fil": True,
+    },
+}
+
+
 def schema_vers_config(schema_text: str, params_generaux: dict | None = None) -> dict:
     """Combine un schema compact avec des parametres generaux pour produire une configuration complete.
 
@@ -281,106 +395,28 @@ def schema_vers_config(schema_text: str, params_generaux: dict | None = None) ->
         Dictionnaire de configuration complet contenant toutes les cles
         necessaires au constructeur : dimensions globales, topologie du
         schema, parametres de panneaux, cremailleres, tasseaux, murs
-        et options d'export.
+        et options d'export. Les sous-dictionnaires non surcharges sont
+        partages avec les valeurs par defaut et ne doivent pas etre modifies.
 
     Raises:
         ValueError: Si le schema est invalide (propage depuis ``parser_schema``).
     """
     parsed = parser_schema(schema_text)
 
-    config = {
-        "hauteur": 2500,
-        "largeur": 3000,
-        "profondeur": 600,
-        "rayon_haut": parsed["rayon_haut"],
-        "rayon_haut_position": 300,
-        "mode_largeur": parsed["mode_largeur"],
-        "largeurs_compartiments": parsed["largeurs_compartiments"],
-        "nombre_compartiments": parsed["nombre_compartiments"],
-        "separations": parsed["separations"],
-        "compartiments": parsed["compartiments"],
-        "panneau_separation": {
-            "epaisseur": 19,
-            "couleur_fab": "Chene clair",
-            "couleur_rgb": (0.82, 0.71, 0.55),
-            "chant_epaisseur": 1,
-            "chant_couleur_fab": "Chene clair",
-            "chant_couleur_rgb": (0.85, 0.74, 0.58),
-        },
-        "panneau_rayon": {
-            "epaisseur": 19,
-            "couleur_fab": "Chene clair",
-            "couleur_rgb": (0.82, 0.71, 0.55),
-            "chant_epaisseur": 1,
-            "chant_couleur_fab": "Chene clair",
-            "chant_couleur_rgb": (0.85, 0.74, 0.58),
-            "retrait_avant": 0,
-            "retrait_arriere": 0,
-        },
-        "panneau_rayon_haut": {
-            "epaisseur": 22,
-            "couleur_fab": "Chene clair",
-            "couleur_rgb": (0.82, 0.71, 0.55),
-            "chant_epaisseur": 1,
-            "chant_couleur_fab": "Chene clair",
-            "chant_couleur_rgb": (0.85, 0.74, 0.58),
-            "retrait_avant": 0,
-            "retrait_arriere": 0,
-        },
-        "crem_encastree": {
-            "largeur": 16,
-            "epaisseur": 5,
-            "saillie": 0,
-            "jeu_rayon": 2,
-            "pas": 32,
-            "retrait_avant": 80,
-            "retrait_arriere": 80,
-            "couleur_rgb": (0.6, 0.6, 0.6),
-        },
-        "crem_applique": {
-            "largeur": 25,
-            "epaisseur_saillie": 12,
-            "jeu_rayon": 2,
-            "pas": 32,
-            "retrait_avant": 80,
-            "retrait_arriere": 80,
-            "couleur_rgb": (0.6, 0.6, 0.6),
-        },
-        "tasseau": {
-            "section_h": 30,
-            "section_l": 30,
-            "retrait_avant": 20,
-            "couleur_rgb": (0.85, 0.75, 0.55),
-            "biseau_longueur": 15,
-        },
-        "panneau_mur": {
-            "epaisseur": 19,
-            "couleur_fab": "Chene clair",
-            "couleur_rgb": (0.82, 0.71, 0.55),
-            "chant_epaisseur": 1,
-            "chant_couleur_fab": "Chene clair",
-            "chant_couleur_rgb": (0.85, 0.74, 0.58),
-        },
-        "afficher_murs": True,
-        "mur_epaisseur": 50,
-        "mur_couleur_rgb": (0.85, 0.85, 0.82),
-        "mur_transparence": 85,
-        "export_fiche": True,
-        "dossier_export": "",
-        "debit": {
-            "panneau_longueur": 2800,
-            "panneau_largeur": 2070,
-            "trait_scie": 4.0,
-            "surcote": 2.0,
-            "delignage": 10.0,
-            "sens_fil": True,
-        },
-    }
+    # Copie superficielle du gabarit : les sous-dictionnaires non surcharges
+    # sont partages avec les valeurs par defaut (copie a l'ecriture plus bas).
+    config = _CONFIG_DEFAUT.copy()
+    config["rayon_haut"] = parsed["rayon_haut"]
+    config["mode_largeur"] = parsed["mode_largeur"]
+    config["largeurs_compartiments"] = parsed["largeurs_compartiments"]
+    config["nombre_compartiments"] = parsed["nombre_compartiments"]
+    config["separations"] = parsed["separations"]
+    config["compartiments"] = parsed["compartiments"]
 
     if params_generaux:
         for key, value in params_generaux.items():
             if isinstance(value, dict) and key in config and isinstance(config[key], dict):
-                config[key].update(value)
+                config[key] = {**config[key], **value}
             else:
                 config[key] = value
 
@@ -5,23 +5,191 @@ Permet de selectionner des amenagements a travers plusieurs projets,
 configurer les parametres de decoupe, et exporter le plan de debit en PDF.
 """
 
-import json
-
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QGroupBox, QFormLayout,
-    QTreeWidget, QTreeWidgetItem, QPushButton, QSpinBox, QDoubleSpinBox,
-    QCheckBox, QFileDialog, QMessageBox, QLabel,
+    QTreeWidget, QTreeWidgetItem, QTreeWidgetItemIterator, QPushButton,
+    QSpinBox, QDoubleSpinBox, QCheckBox, QFileDialog, QMessageBox, QLabel,
+    QProgressDialog,
+)
+from PyQt5.QtCore import (
+    Qt, QObject, QRunnable, QSignalBlocker, QThreadPool, pyqtSignal,
 )
-from PyQt5.QtCore import Qt
 
-from ..database import Database, PARAMS_DEFAUT
+from ..database import Database, charger_params
 from ..schema_parser import schema_vers_config
-from ..placard_builder import generer_geometrie_2d
 from ..optimisation_debit import (
-    ParametresDebit, PieceDebit, pieces_depuis_fiche,
+    ParametresDebit, PieceDebit, pieces_depuis_donnees, map_processus,
+    donnees_debit_schema, donnees_debit_schema_ou_erreur,
     PANNEAU_STD_LONGUEUR, PANNEAU_STD_LARGEUR,
 )
-from ..pdf_export import exporter_pdf_debit
+
+
+# Nombre minimal d'amenagements a generer (absents du cache) pour repartir
+# la generation sur plusieurs processus. Mesure : ~0.2 ms par amenagement
+# en serie, ~15 us de transfert par amenagement vers et depuis le pool, et
+# ~0.5 s pour demarrer le pool (spawn et imports des processus). Avec 2
+# processus, le pool n'est rentable qu'au-dela d'environ 5000 amenagements.
+SEUIL_GENERATION_PARALLELE: int = 5000
+
+# Donnees de debit deja calculees (voir ``donnees_debit_fiche``), par
+# (schema_txt, params_json) tels que stockes en base : un nouvel export sans
+# modification ne reparse ni ne regenere rien. Ces donnees sont des tuples
+# immuables : chaque amenagement en tire ses propres PieceDebit, sans
+# partager d'objet modifiable avec un autre amenagement identique.
+_TAILLE_CACHE_DEBIT = 256
+_cache_debit: dict[tuple[str, str | None], tuple[tuple, ...]] = {}
+
+
+def _memoriser_donnees(cle: tuple[str, str | None], donnees: tuple[tuple, ...]):
+    """Ajoute des donnees au cache en evincant les moins recemment utilisees."""
+    if len(_cache_debit) >= _TAILLE_CACHE_DEBIT:
+        del _cache_debit[next(iter(_cache_debit))]
+    _cache_debit[cle] = donnees
+
+
+def _donnees_amenagement(schema_txt: str, params_json: str | None) -> tuple[tuple, ...]:
+    """Retourne les donnees de debit d'un amenagement, depuis le cache si possible."""
+    cle = (schema_txt, params_json)
+    donnees = _cache_debit.pop(cle, None)
+    if donnees is None:
+        donnees = donnees_debit_schema(schema_txt, params_json)
+    _memoriser_donnees(cle, donnees)
+    return donnees
+
+
+def _generer_donnees_paralleles(cles: list[tuple[str, str | None]]) -> dict:
+    """Genere en parallele les donnees absentes du cache, si elles sont nombreuses.
+
+    Args:
+        cles: Couples ``(schema_txt, params_json)`` de la selection.
+
+    Returns:
+        Dictionnaire ``{cle: (donnees, erreur)}`` des donnees generees par
+        le pool ; vide si le volume ne justifie pas plusieurs processus ou si
+        le pool n'a pas pu fonctionner (voir ``map_processus``).
+    """
+    manquantes = list(dict.fromkeys(c for c in cles if c not in _cache_debit))
+    if len(manquantes) < SEUIL_GENERATION_PARALLELE:
+        return {}
+    resultats = map_processus(donnees_debit_schema_ou_erreur, manquantes,
+                              nb_taches=len(manquantes), chunksize=16)
+    if resultats is None:
+        return {}
+    generees = dict(zip(manquantes, resultats))
+    for cle, (donnees, erreur) in generees.items():
+        if erreur is None:
+            _memoriser_donnees(cle, donnees)
+    return generees
+
+
+def _verifier_schemas(selection: list[tuple]) -> tuple[list[tuple], list[str]]:
+    """Ecarte de la selection les amenagements dont le schema est invalide.
+
+    Controle rapide fait dans le thread de l'interface, avant le choix du
+    fichier : le schema est seulement lu (sans generer la fiche), une fois
+    par couple ``(schema_txt, params_json)`` absent du cache de debit.
+
+    Args:
+        selection: Elements de la selection (voir ``_pieces_selection``).
+
+    Returns:
+        Tuple ``(selection, erreurs)`` : selection sans les amenagements
+        invalides et messages de ces derniers.
+    """
+    retenus = []
+    erreurs = []
+    verifies: dict[tuple[str, str | None], str | None] = {}
+    for element in selection:
+        if element[0] == "amenagement":
+            cle = (element[4], element[5])
+            if cle not in _cache_debit and cle not in verifies:
+                try:
+                    schema_vers_config(cle[0], charger_params(cle[1]))
+                    verifies[cle] = None
+                except Exception as e:
+                    verifies[cle] = str(e)
+            erreur = verifies.get(cle)
+            if erreur is not None:
+                erreurs.append(f"{element[3]}: {erreur}")
+                continue
+        retenus.append(element)
+    return retenus, erreurs
+
+
+def _pieces_selection(selection: list[tuple]) -> tuple[list[PieceDebit], list[str]]:
+    """Construit les pieces de debit d'une selection deja lue en base.
+
+    Ne touche ni a la base ni aux widgets : peut s'executer hors du thread
+    de l'interface.
+
+    Args:
+        selection: Elements dans l'ordre de l'arbre, soit
+            ``("amenagement", projet_id, am_id, nom, schema_txt, params_json)``,
+            soit ``("pieces_manuelles", pieces)``.
+
+    Returns:
+        Tuple ``(pieces, erreurs)`` : pieces de debit dans l'ordre de la
+        selection et messages des amenagements ignores.
+    """
+    all_pieces: list[PieceDebit] = []
+    erreurs = []
+    generees = _generer_donnees_paralleles(
+        [(e[4], e[5]) for e in selection if e[0] == "amenagement"])
+    for element in selection:
+        if element[0] == "pieces_manuelles":
+            all_pieces.extend(element[1])
+            continue
+        _, projet_id, am_id, nom, schema_txt, params_json = element
+        donnees, erreur = generees.get((schema_txt, params_json), (None, None))
+        if erreur is not None:
+            erreurs.append(f"{nom}: {erreur}")
+            continue
+        try:
+            if donnees is None:
+                donnees = _donnees_amenagement(schema_txt, params_json)
+            all_pieces.extend(pieces_depuis_donnees(donnees, projet_id, am_id))
+        except Exception as e:
+            erreurs.append(f"{nom}: {e}")
+    return all_pieces, erreurs
+
+
+class _SignauxExport(QObject):
+    """Signaux de fin de l'export de debit (emis depuis le thread de travail)."""
+
+    termine = pyqtSignal(str, int, list)  # filepath, nb pieces, erreurs
+    echec = pyqtSignal(str)
+
+
+class _ExportDebitWorker(QRunnable):
+    """Genere les pieces puis le PDF de debit hors du thread de l'interface."""
+
+    def __init__(self, selection: list[tuple], params: ParametresDebit,
+                 projet_info: dict | None, filepath: str):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signaux = _SignauxExport()
+        self._selection = selection
+        self._params = params
+        self._projet_info = projet_info
+        self._filepath = filepath
+
+    def run(self):
+        try:
+            all_pieces, erreurs = _pieces_selection(self._selection)
+            if not all_pieces:
+                self.signaux.echec.emit(
+                    "Aucune piece a optimiser.\n" + "\n".join(erreurs))
+                return
+            # Import differe : ReportLab n'est charge qu'a l'export
+            from ..pdf_export import exporter_pdf_debit
+            exporter_pdf_debit(
+                self._filepath, all_pieces, self._params, self._projet_info,
+                titre="Optimisation de debit"
+            )
+        except Exception as e:
+            self.signaux.echec.emit(str(e))
+            return
+        self.signaux.termine.emit(self._filepath, len(all_pieces), erreurs)
 
 
 class DebitDialog(QDialog):
@@ -32,6 +200,9 @@ class DebitDialog(QDialog):
         self.db = db
         self.setWindowTitle("Optimisation de debit")
         self.resize(700, 550)
+        # Export de debit en cours dans le pool de threads
+        self._worker: _ExportDebitWorker | None = None
+        self._progression: QProgressDialog | None = None
         self._init_ui()
         self._charger_arbre()
 
@@ -55,6 +226,9 @@ class DebitDialog(QDialog):
         self.tree = QTreeWidget()
         self.tree.setHeaderLabels(["Projet / Amenagement", "Schema"])
         self.tree.setColumnWidth(0, 350)
+        # Connexion unique : _charger_arbre peut etre rappele sans cumuler
+        # les gestionnaires
+        self.tree.itemChanged.connect(self._on_item_changed)
         select_layout.addWidget(self.tree)
         layout.addWidget(grp_select)
 
@@ -120,6 +294,9 @@ class DebitDialog(QDialog):
         """Charge les projets et amenagements dans l'arbre."""
         self.tree.clear()
         projets = self.db.lister_projets()
+        # Deux requetes pour tout l'arbre plutot que deux par projet
+        amenagements_par_projet = self.db.lister_amenagements_par_projet()
+        pieces_par_projet = self.db.lister_pieces_manuelles_par_projet()
 
         for projet in projets:
             item_projet = QTreeWidgetItem([
@@ -131,7 +308,7 @@ class DebitDialog(QDialog):
             item_projet.setCheckState(0, Qt.Unchecked)
             item_projet.setData(0, Qt.UserRole, ("projet", projet["id"]))
 
-            amenagements = self.db.lister_amenagements(projet["id"])
+            amenagements = amenagements_par_projet.get(projet["id"], [])
             for am in amenagements:
                 schema_preview = (am["schema_txt"] or "")[:40].replace("\n", " ")
                 item_am = QTreeWidgetItem([am["nom"], schema_preview])
@@ -141,7 +318,7 @@ class DebitDialog(QDialog):
                 item_projet.addChild(item_am)
 
             # Noeud pieces manuelles
-            pieces_m = self.db.lister_pieces_manuelles(projet["id"])
+            pieces_m = pieces_par_projet.get(projet["id"], [])
             nb = len(pieces_m)
             if nb > 0:
                 label = f"Pieces manuelles ({nb})"
@@ -158,7 +335,6 @@ class DebitDialog(QDialog):
             self.tree.addTopLevelItem(item_projet)
 
         self.tree.expandAll()
-        self.tree.itemChanged.connect(self._on_item_changed)
 
     def _on_item_changed(self, item: QTreeWidgetItem, column: int):
         """Propage le check du projet vers ses enfants."""
@@ -166,28 +342,31 @@ class DebitDialog(QDialog):
         if not data or data[0] != "projet":
             return
         state = item.checkState(0)
-        self.tree.blockSignals(True)
-        for i in range(item.childCount()):
-            item.child(i).setCheckState(0, state)
-        self.tree.blockSignals(False)
+        with QSignalBlocker(self.tree):
+            for i in range(item.childCount()):
+                item.child(i).setCheckState(0, state)
 
     def _tout_cocher(self):
-        self.tree.blockSignals(True)
-        for i in range(self.tree.topLevelItemCount()):
-            item = self.tree.topLevelItem(i)
-            item.setCheckState(0, Qt.Checked)
-            for j in range(item.childCount()):
-                item.child(j).setCheckState(0, Qt.Checked)
-        self.tree.blockSignals(False)
+        self._cocher_tout(Qt.Checked)
 
     def _tout_decocher(self):
-        self.tree.blockSignals(True)
-        for i in range(self.tree.topLevelItemCount()):
-            item = self.tree.topLevelItem(i)
-            item.setCheckState(0, Qt.Unchecked)
-            for j in range(item.childCount()):
-                item.child(j).setCheckState(0, Qt.Unchecked)
-        self.tree.blockSignals(False)
+        self._cocher_tout(Qt.Unchecked)
+
+    def _cocher_tout(self, state: Qt.CheckState):
+        """Applique un etat de coche a tous les elements de l'arbre.
+
+        Le rafraichissement de la vue est suspendu pendant le parcours :
+        un seul repaint a la fin au lieu d'un par element.
+        """
+        self.tree.setUpdatesEnabled(False)
+        try:
+            with QSignalBlocker(self.tree):
+                it = QTreeWidgetItemIterator(self.tree)
+                while it.value():
+                    it.value().setCheckState(0, state)
+                    it += 1
+        finally:
+            self.tree.setUpdatesEnabled(True)
 
     def _get_params_debit(self) -> ParametresDebit:
         """Lit les parametres depuis les widgets."""
@@ -200,65 +379,79 @@ class DebitDialog(QDialog):
             sens_fil=self.chk_sens_fil.isChecked(),
         )
 
-    def _collecter_pieces(self) -> tuple[list[PieceDebit], dict | None]:
-        """Collecte toutes les pieces des amenagements et pieces manuelles coches."""
-        all_pieces: list[PieceDebit] = []
+    def _collecter_selection(self) -> tuple[list[tuple], dict | None]:
+        """Lit en base les amenagements et pieces manuelles coches.
+
+        Seule la lecture de la base et de l'arbre a lieu ici, dans le thread
+        de l'interface ; la generation des pieces est faite par
+        ``_pieces_selection``.
+
+        Returns:
+            Tuple ``(selection, projet_info)`` (voir ``_pieces_selection``).
+        """
+        # Phase 1 : elements coches, dans l'ordre de l'arbre (sans acces base)
+        coches = []
+        it = QTreeWidgetItemIterator(self.tree, QTreeWidgetItemIterator.Checked)
+        while it.value():
+            data = it.value().data(0, Qt.UserRole)
+            if data and data[0] != "projet":
+                coches.append(data)
+            it += 1
+
+        # Phase 2 : une seule lecture pour tous les amenagements coches
+        amenagements = self.db.get_amenagements(
+            [data[1] for data in coches if data[0] == "amenagement"])
+
+        selection: list[tuple] = []
         projet_info = None
-        erreurs = []
-
-        for i in range(self.tree.topLevelItemCount()):
-            item_projet = self.tree.topLevelItem(i)
-            data_projet = item_projet.data(0, Qt.UserRole)
-            projet_id = data_projet[1]
-
-            for j in range(item_projet.childCount()):
-                item_child = item_projet.child(j)
-                if item_child.checkState(0) != Qt.Checked:
+        # Projets deja lus (y compris introuvables) : une requete par projet
+        projets_lus: dict[int, dict | None] = {}
+
+        def lire_projet(pid: int) -> dict | None:
+            if pid not in projets_lus:
+                projets_lus[pid] = self.db.get_projet(pid)
+            return projets_lus[pid]
+
+        for data_child in coches:
+            if data_child[0] == "amenagement":
+                _, am_id, projet_id = data_child
+                am = amenagements.get(am_id)
+                if not am or not am["schema_txt"] or not am["schema_txt"].strip():
                     continue
 
-                data_child = item_child.data(0, Qt.UserRole)
-
-                if data_child[0] == "amenagement":
-                    am_id = data_child[1]
-                    am = self.db.get_amenagement(am_id)
-                    if not am or not am["schema_txt"] or not am["schema_txt"].strip():
-                        continue
-
-                    if projet_info is None:
-                        projet_info = self.db.get_projet(projet_id)
-
-                    try:
-                        params_json = am["params_json"]
-                        params = json.loads(params_json) if params_json else dict(PARAMS_DEFAUT)
-                    except json.JSONDecodeError:
-                        params = dict(PARAMS_DEFAUT)
-
-                    try:
-                        config = schema_vers_config(am["schema_txt"], params)
-                        _, fiche = generer_geometrie_2d(config)
-                        pieces = pieces_depuis_fiche(fiche, projet_id, am_id)
-                        all_pieces.extend(pieces)
-                    except Exception as e:
-                        erreurs.append(f"{am['nom']}: {e}")
-
-                elif data_child[0] == "pieces_manuelles":
-                    pid = data_child[1]
-                    if projet_info is None:
-                        projet_info = self.db.get_projet(pid)
-
-                    pieces_m = self.db.lister_pieces_manuelles(pid)
-                    for pm in pieces_m:
-                        ref = pm["reference"] or f"P{pid}/M{pm['id']:02d}"
-                        all_pieces.append(PieceDebit(
-                            nom=pm["nom"] or "Piece manuelle",
-                            reference=ref,
-                            longueur=pm["longueur"],
-                            largeur=pm["largeur"],
-                            epaisseur=pm["epaisseur"],
-                            couleur=pm["couleur"] or "Standard",
-                            quantite=pm["quantite"],
-                            sens_fil=bool(pm["sens_fil"]),
-                        ))
+                if projet_info is None:
+                    projet_info = lire_projet(projet_id)
+
+                selection.append(("amenagement", projet_id, am_id, am["nom"],
+                                  am["schema_txt"], am["params_json"]))
+
+            elif data_child[0] == "pieces_manuelles":
+                pid = data_child[1]
+                if projet_info is None:
+                    projet_info = lire_projet(pid)
+
+                pieces = [
+                    PieceDebit(
+                        nom=pm["nom"] or "Piece manuelle",
+                        reference=pm["reference"] or f"P{pid}/M{pm['id']:02d}",
+                        longueur=pm["longueur"],
+                        largeur=pm["largeur"],
+                        epaisseur=pm["epaisseur"],
+                        couleur=pm["couleur"] or "Standard",
+                        quantite=pm["quantite"],
+                        sens_fil=bool(pm["sens_fil"]),
+                    )
+                    for pm in self.db.lister_pieces_manuelles(pid)
+                ]
+                if pieces:
+                    selection.append(("pieces_manuelles", pieces))
+
+        return selection, projet_info
+
+    def _optimiser_et_exporter(self):
+        """Lance l'optimisation et l'export PDF en arriere-plan."""
+        selection, projet_info = self._collecter_selection()
+        selection, erreurs = _verifier_schemas(selection)
 
         if erreurs:
             QMessageBox.warning(
@@ -266,13 +459,7 @@ class DebitDialog(QDialog):
                 f"Amenagements ignores ({len(erreurs)}):\n" + "\n".join(erreurs)
             )
 
-        return all_pieces, projet_info
-
-    def _optimiser_et_exporter(self):
-        """Lance l'optimisation et exporte le PDF."""
-        all_pieces, projet_info = self._collecter_pieces()
-
-        if not all_pieces:
+        if not selection:
             QMessageBox.warning(self, "Optimisation",
                                 "Aucune piece a optimiser.\n"
                                 "Cochez au moins un amenagement ou des pieces manuelles.")
@@ -286,15 +473,48 @@ class DebitDialog(QDialog):
 
         params = self._get_params_debit()
 
-        try:
-            exporter_pdf_debit(
-                filepath, all_pieces, params, projet_info,
-                titre="Optimisation de debit"
-            )
-            QMessageBox.information(
-                self, "Export reussi",
-                f"Plan de debit exporte:\n{filepath}\n\n"
-                f"{len(all_pieces)} pieces traitees."
+        # Generation des pieces et du PDF dans le pool de threads : la
+        # fenetre reste reactive, une boite de progression bloque la saisie.
+        self._progression = QProgressDialog(
+            "Optimisation et export du plan de debit...", None, 0, 0, self)
+        self._progression.setWindowTitle("Optimisation de debit")
+        self._progression.setWindowModality(Qt.WindowModal)
+        self._progression.setMinimumDuration(0)
+        self._progression.show()
+        self.btn_exporter.setEnabled(False)
+
+        self._worker = _ExportDebitWorker(selection, params, projet_info, filepath)
+        self._worker.signaux.termine.connect(self._on_export_termine)
+        self._worker.signaux.echec.connect(self._on_export_echec)
+        QThreadPool.globalInstance().start(self._worker)
+
+    def reject(self):
+        """Refuse la fermeture tant qu'un export est en cours."""
+        if self._worker is not None:
+            return
+        super().reject()
+
+    def _fin_export(self):
+        """Ferme la progression et libere le worker d'export."""
+        if self._progression is not None:
+            self._progression.close()
+            self._progression = None
+        self._worker = None
+        self.btn_exporter.setEnabled(True)
+
+    def _on_export_termine(self, filepath: str, nb_pieces: int, erreurs: list):
+        self._fin_export()
+        if erreurs:
+            QMessageBox.warning(
+                self, "Avertissement",
+                f"Amenagements ignores ({len(erreurs)}):\n" + "\n".join(erreurs)
             )
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", str(e))
+        QMessageBox.information(
+            self, "Export reussi",
+            f"Plan de debit exporte:\n{filepath}\n\n"
+            f"{nb_pieces} pieces traitees."
+        )
+
+    def _on_export_echec(self, message: str):
+        self._fin_export()
+        QMessageBox.critical(self, "Erreur", message)
@@ -3,6 +3,10 @@
 Contient la classe MainWindow qui orchestre l'ensemble de l'interface :
 arbre des projets, editeurs de schema et parametres, vue 2D de face,
 et toutes les actions d'export (PDF, DXF, FreeCAD, etiquettes, liste de courses).
+
+Les exports bases sur ReportLab (PDF, etiquettes, liste de courses) sont
+importes a la premiere utilisation : l'ouverture de la fenetre ne paie pas
+le chargement de ReportLab.
 """
 
 import json
@@ -26,15 +30,12 @@ from .viewer_3d import PlacardViewer
 from .debit_dialog import DebitDialog
 from .pieces_manuelles_editor import PiecesManualesEditor
 
-from ..database import Database, PARAMS_DEFAUT
+from ..database import Database, charger_params
 from ..schema_parser import schema_vers_config
 from ..placard_builder import generer_geometrie_2d
-from ..pdf_export import exporter_pdf, exporter_pdf_projet
 from ..optimisation_debit import pieces_depuis_fiche, PieceDebit, ParametresDebit
 from ..freecad_export import exporter_freecad
 from ..dxf_export import exporter_dxf
-from ..etiquettes_export import exporter_etiquettes
-from ..liste_courses import generer_liste_courses, exporter_liste_courses
 
 
 class MainWindow(QMainWindow):
@@ -71,9 +72,21 @@ class MainWindow(QMainWindow):
         self._auto_save_timer.setInterval(2000)
         self._auto_save_timer.setSingleShot(True)
         self._auto_save_timer.timeout.connect(self._sauvegarder_amenagement)
-
+        # Regeneration differee de la vue : une rafale de frappes dans les
+        # editeurs ne declenche qu'une seule regeneration
+        self._regen_timer = QTimer()
+        self._regen_timer.setInterval(150)
+        self._regen_timer.setSingleShot(True)
+        self._regen_timer.timeout.connect(self._regenerer_vue)
+        # (amenagement_id, schema_txt, params_json) deja enregistre en base,
+        # pour ne pas reecrire un amenagement inchange
+        self._derniere_sauvegarde = None
+
+        # Resultat de la derniere generation reussie (vue courante), reutilise
+        # par les exports de l'amenagement courant
         self._rects = []
         self._fiche = None
+        self._config = None
 
         self.setWindowTitle("PlacardCAD - Conception de placards")
         icon_path = os.path.join(os.path.dirname(__file__), "..", "resources", "icon_256.png")
@@ -308,11 +321,15 @@ class MainWindow(QMainWindow):
         self.schema_editor.set_schema(am["schema_txt"])
 
         # Charger les parametres
-        try:
-            params = json.loads(am["params_json"]) if am["params_json"] else dict(PARAMS_DEFAUT)
-        except json.JSONDecodeError:
-            params = dict(PARAMS_DEFAUT)
+        params = charger_params(am["params_json"])
         self.params_editor.set_params(params)
+        # Etat des editeurs juste apres chargement : equivalent au contenu en
+        # base, il n'a pas a etre reecrit tant qu'il n'est pas modifie
+        self._derniere_sauvegarde = (
+            amenagement_id,
+            self.schema_editor.get_schema(),
+            json.dumps(self.params_editor.get_params(), ensure_ascii=False),
+        )
 
         self.statusbar.showMessage(f"Amenagement: {am['nom']}")
 
@@ -322,31 +339,34 @@ class MainWindow(QMainWindow):
     def _on_schema_modifie(self, schema_text: str):
         """Slot appele quand le schema compact est modifie.
 
-        Demarre le timer de sauvegarde automatique et regenere la vue.
+        Demarre le timer de sauvegarde automatique et celui de regeneration
+        de la vue.
 
         Args:
             schema_text: Nouveau texte du schema compact.
         """
         self._auto_save_timer.start()
-        self._regenerer_vue()
+        self._regen_timer.start()
 
     def _on_params_modifies(self, params: dict):
         """Slot appele quand les parametres generaux sont modifies.
 
-        Demarre le timer de sauvegarde automatique et regenere la vue.
+        Demarre le timer de sauvegarde automatique et celui de regeneration
+        de la vue.
 
         Args:
             params: Dictionnaire des parametres mis a jour.
         """
         self._auto_save_timer.start()
-        self._regenerer_vue()
+        self._regen_timer.start()
 
     def _sauvegarder_amenagement(self):
         """Sauvegarde l'amenagement courant en base de donnees.
 
         Recupere le schema et les parametres depuis les editeurs
         et met a jour l'enregistrement en base. Ne fait rien si
-        aucun amenagement n'est selectionne.
+        aucun amenagement n'est selectionne ou si son contenu est
+        identique a celui deja enregistre.
         """
         if self._current_amenagement_id is None:
             return
@@ -355,11 +375,16 @@ class MainWindow(QMainWindow):
         params = self.params_editor.get_params()
         params_json = json.dumps(params, ensure_ascii=False)
 
+        etat = (self._current_amenagement_id, schema_txt, params_json)
+        if etat == self._derniere_sauvegarde:
+            return
+
         self.db.modifier_amenagement(
             self._current_amenagement_id,
             schema_txt=schema_txt,
             params_json=params_json,
         )
+        self._derniere_sauvegarde = etat
         self.statusbar.showMessage("Sauvegarde automatique effectuee.", 3000)
 
     # =====================================================================
@@ -371,11 +396,13 @@ class MainWindow(QMainWindow):
 
         Parse le schema compact, genere la geometrie 2D et met a jour
         le viewer. Affiche un message d'erreur dans la barre de statut
-        en cas de schema invalide.
+        en cas de schema invalide. Annule toute regeneration differee
+        en attente, devenue inutile.
         """
+        self._regen_timer.stop()
         schema_text = self.schema_editor.get_schema()
         if not schema_text.strip():
-            self.viewer.clear()
+            self._effacer_vue()
             return
 
         params = self.params_editor.get_params()
@@ -383,6 +410,7 @@ class MainWindow(QMainWindow):
         try:
             config = schema_vers_config(schema_text, params)
             self._rects, self._fiche = generer_geometrie_2d(config)
+            self._config = config
             self.viewer.set_geometrie(
                 self._rects,
                 config["largeur"],
@@ -394,18 +422,42 @@ class MainWindow(QMainWindow):
                 f"{len(self._fiche.quincaillerie)} quincailleries"
             )
         except Exception as e:
-            self.viewer.clear()
+            self._effacer_vue()
             self.statusbar.showMessage(f"Erreur schema: {e}")
 
+    def _regenerer_vue_si_en_attente(self):
+        """Applique immediatement une regeneration differee en attente.
+
+        Appele avant les exports, qui utilisent la derniere generation :
+        ils portent ainsi toujours sur le contenu courant des editeurs.
+        """
+        if self._regen_timer.isActive():
+            self._regenerer_vue()
+
+    def _effacer_vue(self):
+        """Vide le viewer et oublie la derniere generation (plus rien a exporter)."""
+        self._rects = []
+        self._fiche = None
+        self._config = None
+        self.viewer.clear()
+
     # =====================================================================
     #  EXPORT
     # =====================================================================
 
-    def _collecter_pieces_projet(self) -> list:
+    def _collecter_pieces_projet(
+        self, pieces_manuelles: list[PieceDebit] | None = None,
+    ) -> list:
         """Collecte les pieces de tous les amenagements et pieces manuelles du projet.
 
         Parcourt tous les amenagements du projet courant, genere leurs fiches
-        de debit, puis ajoute les pieces manuelles.
+        de debit, puis ajoute les pieces manuelles. La fiche de l'amenagement
+        ouvert dans l'editeur est reutilisee telle quelle au lieu d'etre
+        regeneree depuis la base.
+
+        Args:
+            pieces_manuelles: Pieces manuelles deja chargees, ou None pour
+                les lire en base.
 
         Returns:
             Liste de PieceDebit pour l'ensemble du projet. Liste vide si
@@ -419,30 +471,30 @@ class MainWindow(QMainWindow):
         # Pieces des amenagements
         amenagements = self.db.lister_amenagements(self._current_projet_id)
         for am in amenagements:
-            schema_txt = am["schema_txt"]
-            if not schema_txt or not schema_txt.strip():
-                continue
-            try:
-                params_json = am["params_json"]
-                params = json.loads(params_json) if params_json else dict(PARAMS_DEFAUT)
-            except json.JSONDecodeError:
-                params = dict(PARAMS_DEFAUT)
-            try:
-                config = schema_vers_config(schema_txt, params)
-                _, fiche = generer_geometrie_2d(config)
-                for i, p in enumerate(fiche.pieces, 1):
-                    p.reference = f"P{self._current_projet_id}/A{am['id']}/N{i:02d}"
-                am_pieces = pieces_depuis_fiche(
-                    fiche, self._current_projet_id, am["id"]
-                )
-                all_pieces.extend(am_pieces)
-            except Exception:
-                continue
+            if am["id"] == self._current_amenagement_id and self._fiche is not None:
+                fiche = self._fiche
+            else:
+                schema_txt = am["schema_txt"]
+                if not schema_txt or not schema_txt.strip():
+                    continue
+                params = charger_params(am["params_json"])
+                try:
+                    config = schema_vers_config(schema_txt, params)
+                    _, fiche = generer_geometrie_2d(config)
+                except Exception:
+                    continue
+            for i, p in enumerate(fiche.pieces, 1):
+                p.reference = f"P{self._current_projet_id}/A{am['id']}/N{i:02d}"
+            am_pieces = pieces_depuis_fiche(
+                fiche, self._current_projet_id, am["id"]
+            )
+            all_pieces.extend(am_pieces)
 
         # Pieces manuelles
-        all_pieces.extend(
-            self._collecter_pieces_manuelles(self._current_projet_id)
-        )
+        if pieces_manuelles is None:
+            pieces_manuelles = self._collecter_pieces_manuelles(
+                self._current_projet_id)
+        all_pieces.extend(pieces_manuelles)
 
         return all_pieces
 
@@ -499,22 +551,21 @@ class MainWindow(QMainWindow):
         et les informations du projet, puis l'ouvre avec le lecteur par defaut
         du systeme (xdg-open, open ou startfile selon la plateforme).
         """
+        self._regenerer_vue_si_en_attente()
         if not self._rects:
             QMessageBox.warning(self, "Apercu PDF",
                                 "Aucun amenagement a afficher. Editez un schema d'abord.")
             return
 
-        schema_text = self.schema_editor.get_schema()
-        params = self.params_editor.get_params()
-        config = schema_vers_config(schema_text, params)
+        config = self._config
 
         projet_info = None
         if self._current_projet_id:
             projet_info = self.db.get_projet(self._current_projet_id)
 
-        all_pieces = self._collecter_pieces_projet()
         pieces_m = (self._collecter_pieces_manuelles(self._current_projet_id)
                     if self._current_projet_id else [])
+        all_pieces = self._collecter_pieces_projet(pieces_m)
 
         try:
             tmp = tempfile.NamedTemporaryFile(
@@ -523,6 +574,7 @@ class MainWindow(QMainWindow):
             tmp_path = tmp.name
             tmp.close()
 
+            from ..pdf_export import exporter_pdf
             exporter_pdf(tmp_path, self._rects, config, self._fiche, projet_info,
                          projet_id=self._current_projet_id or 0,
                          amenagement_id=self._current_amenagement_id or 0,
@@ -549,6 +601,7 @@ class MainWindow(QMainWindow):
         sauvegarde, puis genere le PDF contenant la vue de face, la fiche
         de debit et le plan de decoupe.
         """
+        self._regenerer_vue_si_en_attente()
         if not self._rects:
             QMessageBox.warning(self, "Export PDF",
                                 "Aucun amenagement a exporter. Editez un schema d'abord.")
@@ -560,9 +613,7 @@ class MainWindow(QMainWindow):
         if not filepath:
             return
 
-        schema_text = self.schema_editor.get_schema()
-        params = self.params_editor.get_params()
-        config = schema_vers_config(schema_text, params)
+        config = self._config
 
         # Infos projet
         projet_info = None
@@ -570,11 +621,12 @@ class MainWindow(QMainWindow):
             projet_info = self.db.get_projet(self._current_projet_id)
 
         # Collecter toutes les pieces du projet pour debit mixte
-        all_pieces = self._collecter_pieces_projet()
         pieces_m = (self._collecter_pieces_manuelles(self._current_projet_id)
                     if self._current_projet_id else [])
+        all_pieces = self._collecter_pieces_projet(pieces_m)
 
         try:
+            from ..pdf_export import exporter_pdf
             exporter_pdf(filepath, self._rects, config, self._fiche, projet_info,
                          projet_id=self._current_projet_id or 0,
                          amenagement_id=self._current_amenagement_id or 0,
@@ -595,6 +647,7 @@ class MainWindow(QMainWindow):
         Affiche un avertissement si des amenagements sont ignores en
         raison d'erreurs de schema.
         """
+        self._regenerer_vue_si_en_attente()
         if not self._current_projet_id:
             QMessageBox.warning(self, "Export PDF projet",
                                 "Aucun projet selectionne.")
@@ -620,11 +673,7 @@ class MainWindow(QMainWindow):
             schema_txt = am["schema_txt"]
             if not schema_txt or not schema_txt.strip():
                 continue
-            try:
-                params_json = am["params_json"]
-                params = json.loads(params_json) if params_json else dict(PARAMS_DEFAUT)
-            except json.JSONDecodeError:
-                params = dict(PARAMS_DEFAUT)
+            params = charger_params(am["params_json"])
 
             try:
                 config = schema_vers_config(schema_txt, params)
@@ -646,6 +695,7 @@ class MainWindow(QMainWindow):
 
         try:
             pieces_m = self._collecter_pieces_manuelles(self._current_projet_id)
+            from ..pdf_export import exporter_pdf_projet
             exporter_pdf_projet(filepath, amenagements_data, projet_info,
                                 self._current_projet_id,
                                 params_debit=self._get_params_debit(),
@@ -666,6 +716,7 @@ class MainWindow(QMainWindow):
         Genere un fichier texte contenant la nomenclature des pieces,
         les dimensions et les quantites de l'amenagement courant.
         """
+        self._regenerer_vue_si_en_attente()
         if not self._fiche:
             QMessageBox.warning(self, "Export fiche",
                                 "Aucun amenagement a exporter.")
@@ -678,9 +729,7 @@ class MainWindow(QMainWindow):
         if not filepath:
             return
 
-        schema_text = self.schema_editor.get_schema()
-        params = self.params_editor.get_params()
-        config = schema_vers_config(schema_text, params)
+        config = self._config
 
         try:
             texte = self._fiche.generer_texte(config)
@@ -699,6 +748,7 @@ class MainWindow(QMainWindow):
         du schema et des parametres. Le fichier peut etre ouvert dans
         FreeCAD pour visualisation et modification.
         """
+        self._regenerer_vue_si_en_attente()
         if not self._rects:
             QMessageBox.warning(self, "Export FreeCAD",
                                 "Aucun amenagement a exporter. Editez un schema d'abord.")
@@ -712,9 +762,7 @@ class MainWindow(QMainWindow):
         if not filepath:
             return
 
-        schema_text = self.schema_editor.get_schema()
-        params = self.params_editor.get_params()
-        config = schema_vers_config(schema_text, params)
+        config = self._config
 
         try:
             exporter_freecad(filepath, config)
@@ -733,6 +781,7 @@ class MainWindow(QMainWindow):
         Genere un PDF avec une etiquette par piece de la fiche de
         fabrication, incluant les dimensions et la reference de chaque piece.
         """
+        self._regenerer_vue_si_en_attente()
         if not self._fiche:
             QMessageBox.warning(self, "Etiquettes",
                                 "Aucun amenagement a exporter. Editez un schema d'abord.")
@@ -749,6 +798,7 @@ class MainWindow(QMainWindow):
             projet_info = self.db.get_projet(self._current_projet_id)
 
         try:
+            from ..etiquettes_export import exporter_etiquettes
             exporter_etiquettes(
                 filepath, self._fiche,
                 projet_id=self._current_projet_id or 0,
@@ -796,11 +846,7 @@ class MainWindow(QMainWindow):
             schema_txt = am["schema_txt"]
             if not schema_txt or not schema_txt.strip():
                 continue
-            try:
-                params_json = am["params_json"]
-                params = json.loads(params_json) if params_json else dict(PARAMS_DEFAUT)
-            except json.JSONDecodeError:
-                params = dict(PARAMS_DEFAUT)
+            params = charger_params(am["params_json"])
 
             try:
                 config = schema_vers_config(schema_txt, params)
@@ -820,6 +866,7 @@ class MainWindow(QMainWindow):
 
         try:
             pieces_m = self._collecter_pieces_manuelles(self._current_projet_id)
+            from ..liste_courses import generer_liste_courses, exporter_liste_courses
             liste = generer_liste_courses(
                 amenagements_data,
                 params_debit=self._get_params_debit(),
@@ -852,6 +899,7 @@ class MainWindow(QMainWindow):
         Genere un fichier DXF compatible avec AutoCAD, LibreCAD et
         FreeCAD a partir de la geometrie et de la fiche de l'amenagement courant.
         """
+        self._regenerer_vue_si_en_attente()
         if not self._rects:
             QMessageBox.warning(self, "Export DXF",
                                 "Aucun amenagement a exporter. Editez un schema d'abord.")
@@ -863,9 +911,7 @@ class MainWindow(QMainWindow):
         if not filepath:
             return
 
-        schema_text = self.schema_editor.get_schema()
-        params = self.params_editor.get_params()
-        config = schema_vers_config(schema_text, params)
+        config = self._config
 
         try:
             exporter_dxf(filepath, self._rects, config, self._fiche)
@@ -35,6 +35,9 @@ class ParamsEditor(QWidget):
         self.db = db
         self._params = {}
         self._widgets = {}
+        self._cles_widgets = {}  # widget -> cle (inverse de _widgets)
+        # Garde unique : les slots ignorent les signaux emis pendant une
+        # ecriture des params vers les widgets
         self._blocked = False
         self._init_ui()
 
@@ -80,7 +83,7 @@ class ParamsEditor(QWidget):
         spin.setRange(minimum, maximum)
         spin.setSuffix(suffix)
         spin.valueChanged.connect(self._on_value_changed)
-        self._widgets[key] = spin
+        self._enregistrer_widget(key, spin)
         return spin
 
     def _creer_dspin(self, key: str, minimum: float = 0, maximum: float = 100,
@@ -90,21 +93,26 @@ class ParamsEditor(QWidget):
         spin.setSuffix(suffix)
         spin.setDecimals(decimals)
         spin.valueChanged.connect(self._on_value_changed)
-        self._widgets[key] = spin
+        self._enregistrer_widget(key, spin)
         return spin
 
     def _creer_check(self, key: str, label: str = "") -> QCheckBox:
         chk = QCheckBox(label)
         chk.stateChanged.connect(self._on_value_changed)
-        self._widgets[key] = chk
+        self._enregistrer_widget(key, chk)
         return chk
 
     def _creer_text(self, key: str) -> QLineEdit:
         edit = QLineEdit()
         edit.textChanged.connect(self._on_value_changed)
-        self._widgets[key] = edit
+        self._enregistrer_widget(key, edit)
         return edit
 
+    def _enregistrer_widget(self, key: str, widget: QWidget):
+        """Associe un widget du formulaire a sa cle de parametre."""
+        self._widgets[key] = widget
+        self._cles_widgets[widget] = key
+
     def _creer_onglet_dimensions(self) -> QWidget:
         widget = QWidget()
         form = QFormLayout(widget)
@@ -216,6 +224,9 @@ class ParamsEditor(QWidget):
         self._blocked = True
         try:
             self._ecrire_params_vers_widgets()
+            # Les widgets font foi (bornes, cles absentes) : une relecture
+            # complete ici suffit ensuite a mettre a jour la seule cle modifiee
+            self._lire_widgets_vers_params()
         finally:
             self._blocked = False
         self.params_modifies.emit(self._params)
@@ -333,7 +344,14 @@ class ParamsEditor(QWidget):
     def _on_value_changed(self, *args):
         if self._blocked:
             return
-        self._lire_widgets_vers_params()
+        # Seul le widget emetteur a change : inutile de relire tout le
+        # formulaire a chaque frappe
+        widget = self.sender()
+        key = self._cles_widgets.get(widget)
+        if key is None:
+            self._lire_widgets_vers_params()
+        else:
+            self._set_nested(self._params, key, self._lire_widget(widget))
         self.params_modifies.emit(self._params)
 
     def set_params(self, params: dict):
@@ -342,6 +360,9 @@ class ParamsEditor(QWidget):
         self._blocked = True
         try:
             self._ecrire_params_vers_widgets()
+            # Les widgets font foi (bornes, cles absentes) : une relecture
+            # complete ici suffit ensuite a mettre a jour la seule cle modifiee
+            self._lire_widgets_vers_params()
         finally:
             self._blocked = False
 
@@ -366,17 +387,16 @@ class ParamsEditor(QWidget):
     def _lire_widgets_vers_params(self):
         """Lit les widgets et met a jour les params."""
         for key, widget in self._widgets.items():
-            if isinstance(widget, QSpinBox):
-                value = widget.value()
-            elif isinstance(widget, QDoubleSpinBox):
-                value = widget.value()
-            elif isinstance(widget, QLineEdit):
-                value = widget.text()
-            elif isinstance(widget, QCheckBox):
-                value = widget.isChecked()
-            else:
-                continue
-            self._set_nested(self._params, key, value)
+            self._set_nested(self._params, key, self._lire_widget(widget))
+
+    @staticmethod
+    def _lire_widget(widget: QWidget):
+        """Valeur courante d'un widget du formulaire."""
+        if isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+            return widget.value()
+        if isinstance(widget, QLineEdit):
+            return widget.text()
+        return widget.isChecked()
 
     def _get_nested(self, d: dict, key: str):
         """Acces a une cle imbriquee comme 'panneau_separation.epaisseur'."""
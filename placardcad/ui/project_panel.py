@@ -156,6 +156,9 @@ class ProjectPanel(QWidget):
         """
         self.tree.clear()
         projets = self.db.lister_projets()
+        # Une requete par table plutot qu'une par projet
+        amenagements_par_projet = self.db.lister_amenagements_par_projet()
+        nb_pieces_par_projet = self.db.compter_pieces_manuelles_par_projet()
 
         for projet in projets:
             item_projet = QTreeWidgetItem([
@@ -167,14 +170,13 @@ class ProjectPanel(QWidget):
             font.setBold(True)
             item_projet.setFont(0, font)
 
-            amenagements = self.db.lister_amenagements(projet["id"])
-            for am in amenagements:
+            for am in amenagements_par_projet.get(projet["id"], ()):
                 item_am = QTreeWidgetItem([f"  {am['nom']}"])
                 item_am.setData(0, Qt.UserRole, ("amenagement", projet["id"], am["id"]))
                 item_projet.addChild(item_am)
 
             # Noeud Pieces manuelles
-            nb_pieces = len(self.db.lister_pieces_manuelles(projet["id"]))
+            nb_pieces = nb_pieces_par_projet.get(projet["id"], 0)
             label = f"  Pieces manuelles ({nb_pieces})" if nb_pieces else "  Pieces manuelles"
             item_pm = QTreeWidgetItem([label])
             item_pm.setData(0, Qt.UserRole, ("pieces_manuelles", projet["id"]))
@@ -5,28 +5,115 @@ Dessine la geometrie calculee par placard_builder.generer_geometrie_2d().
 Zoom molette, pan clic-milieu ou clic-gauche maintenu, double-clic = reset vue.
 """
 
+from functools import lru_cache
+
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QSizePolicy,
     QMenu, QApplication, QFileDialog,
 )
-from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtCore import Qt, QRectF, QPointF, QTimer
 from PyQt5.QtGui import (
     QPainter, QPen, QColor, QBrush, QFont, QFontMetrics, QPolygonF, QPixmap,
+    QPicture, QTransform,
+)
+
+from ..placard_builder import grouper_par_type
+
+
+@lru_cache(maxsize=None)
+def _gabarit_fleche(horizontale: bool, d: float, taille: float) -> QPolygonF:
+    """Triangle de fleche de cotation relatif a sa pointe (origine).
+
+    Le gabarit est construit une seule fois par orientation et par taille ;
+    chaque fleche est ensuite obtenue par simple translation sur sa pointe.
+    """
+    s = taille
+    if horizontale:
+        return QPolygonF([
+            QPointF(0.0, 0.0),
+            QPointF(-d * s, -s * 0.35),
+            QPointF(-d * s, s * 0.35),
+        ])
+    return QPolygonF([
+        QPointF(0.0, 0.0),
+        QPointF(-s * 0.35, -d * s),
+        QPointF(s * 0.35, -d * s),
+    ])
+
+
+# Style de chaque type d'element, dans l'ordre des couches de dessin :
+# (type_elem, couleur du trait, couleur de remplissage, epaisseur, motif)
+_STYLES_ELEMENTS = (
+    ("sol", "#444444", "#555555", 1, Qt.BDiagPattern),
+    ("mur", "#D5D5D0", "#E8E8E4", 1, Qt.Dense4Pattern),
+    ("panneau_mur", "#8B7355", "#D2B48C", 1, Qt.SolidPattern),
+    ("separation", "#8B7355", "#D2B48C", 2, Qt.SolidPattern),
+    ("rayon_haut", "#8B7355", "#DEB887", 1, Qt.SolidPattern),
+    ("rayon", "#8B7355", "#D2B48C", 1, Qt.SolidPattern),
+    ("cremaillere_encastree", "#708090", "#A0A0A0", 0.5, Qt.SolidPattern),
+    ("cremaillere_applique", "#CC0000", "#FF4444", 0.5, Qt.SolidPattern),
+    ("tasseau", "#8B6914", "#DAA520", 1, Qt.SolidPattern),
 )
 
 
+def _police(taille: int) -> QFont:
+    """Police par defaut a la taille donnee (en points)."""
+    font = QFont()
+    font.setPointSize(taille)
+    return font
+
+
 class PlacardViewer(QWidget):
     """Widget de visualisation du placard en vue de face."""
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._rects = []         # list[Rect] depuis placard_builder
+        self._rects_par_type = {}  # dict[type_elem, list[Rect]] (meme contenu)
+        # Memes rectangles en paires de coins (QPointF), Z inverse (origine
+        # en haut) : la vue s'en deduit par une QTransform echelle + decalage.
+        # Chaque coin est projete tel quel (et non via un QRectF x, y, w, h)
+        # pour garder exactement les arrondis de _to_screen
+        self._rects_mm = {}
+        self._cotations = None   # donnees de cotation (voir _preparer_cotations)
+        self._scene_cache = None  # (cle de vue, QPixmap) du dernier rendu
+        self._picture_cache = None  # (cle de zoom, QPicture) sans le pan
         self._placard_w = 3000   # largeur du placard en mm
         self._placard_h = 2500   # hauteur du placard en mm
         self._marge = 40         # marge en pixels
         self._show_labels = True
         self._show_dimensions = True
 
+        # Polices et metriques du dessin, creees une fois pour toutes
+        self._font_message = _police(12)
+        self._font_cote = _police(8)          # cotations globales
+        self._font_cote_sep = _police(7)      # compartiments et separations
+        self._font_cote_rayon = _police(6)    # hauteurs entre rayons
+        self._fm_cote = QFontMetrics(self._font_cote)
+        self._fm_cote_sep = QFontMetrics(self._font_cote_sep)
+        self._fm_cote_rayon = QFontMetrics(self._font_cote_rayon)
+        # Hauteurs de ligne, independantes du texte ; les largeurs des
+        # textes de cote sont mesurees dans _preparer_cotations
+        self._h_cote = self._fm_cote.height()
+        self._h_cote_sep = self._fm_cote_sep.height()
+        self._h_cote_rayon = self._fm_cote_rayon.height()
+
+        # Stylos et brosses, eux aussi crees une fois : (type, stylo, brosse)
+        # par couche d'elements, puis traits de cote et de rappel
+        self._styles_elements = [
+            (type_elem, QPen(QColor(trait), epaisseur),
+             QBrush(QColor(remplissage), motif))
+            for type_elem, trait, remplissage, epaisseur, motif
+            in _STYLES_ELEMENTS
+        ]
+        self._pen_cote = QPen(QColor("#333"), 1)
+        self._pen_rappel = QPen(QColor("#999"), 1, Qt.DotLine)
+        self._pen_cote_comp = QPen(QColor("#0066CC"), 1)
+        self._pen_rappel_comp = QPen(QColor("#AAD4FF"), 1, Qt.DotLine)
+        self._pen_cote_sep = QPen(QColor("#CC6600"), 1)
+        self._pen_rappel_sep = QPen(QColor("#FFD4AA"), 1, Qt.DotLine)
+        self._pen_cote_rayon = QPen(QColor(0, 140, 70), 1)
+
         # Zoom / pan
         self._zoom = 1.0
         self._pan_x = 0.0       # decalage en pixels
@@ -34,6 +121,16 @@ class PlacardViewer(QWidget):
         self._panning = False
         self._pan_start = QPointF()
 
+        # Rafraichissements pendant zoom/pan limites a un par trame (~60 Hz)
+        self._timer_rendu = QTimer(self)
+        self._timer_rendu.setSingleShot(True)
+        self._timer_rendu.setInterval(16)
+        self._timer_rendu.timeout.connect(self.update)
+
+        # Transformation de base memorisee : (cle, (scale, ox, oy)) ou la cle
+        # regroupe les seules grandeurs dont elle depend (taille widget/placard)
+        self._base_transform_cache = None
+
         self.setMinimumSize(400, 300)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.setStyleSheet("background-color: white;")
@@ -42,14 +139,31 @@ class PlacardViewer(QWidget):
     def set_geometrie(self, rects: list, largeur: float, hauteur: float):
         """Met a jour la geometrie a afficher."""
         self._rects = rects
+        self._rects_par_type = grouper_par_type(rects)
         self._placard_w = largeur
         self._placard_h = hauteur
+        self._rects_mm = {
+            type_elem: [
+                (QPointF(r.x, hauteur - (r.y + r.h)),
+                 QPointF(r.x + r.w, hauteur - r.y))
+                for r in rects_type
+            ]
+            for type_elem, rects_type in self._rects_par_type.items()
+        }
+        self._cotations = self._preparer_cotations()
+        self._scene_cache = None
+        self._picture_cache = None
         self._reset_view()
         self.update()
 
     def clear(self):
         """Efface la vue."""
         self._rects = []
+        self._rects_par_type = {}
+        self._rects_mm = {}
+        self._cotations = None
+        self._scene_cache = None
+        self._picture_cache = None
         self._reset_view()
         self.update()
 
@@ -90,7 +204,7 @@ class PlacardViewer(QWidget):
         self._pan_y = pos.y() - ratio * (pos.y() - self._pan_y)
         self._zoom = new_zoom
 
-        self.update()
+        self._demander_rendu()
 
     def mousePressEvent(self, event):
         """Debut du pan (clic milieu ou clic gauche)."""
@@ -106,7 +220,16 @@ class PlacardViewer(QWidget):
             self._pan_x += delta.x()
             self._pan_y += delta.y()
             self._pan_start = event.pos()
-            self.update()
+            self._demander_rendu()
+
+    def _demander_rendu(self):
+        """Planifie un rafraichissement, au plus un toutes les 16 ms.
+
+        Les evenements souris (molette, deplacement) peuvent arriver bien
+        plus vite que la frequence d'affichage : ils sont regroupes.
+        """
+        if not self._timer_rendu.isActive():
+            self._timer_rendu.start()
 
     def mouseReleaseEvent(self, event):
         """Fin du pan."""
@@ -125,7 +248,21 @@ class PlacardViewer(QWidget):
     # =================================================================
 
     def _get_base_transform(self) -> tuple:
-        """Calcule l'echelle de base et le decalage (sans zoom/pan utilisateur)."""
+        """Calcule l'echelle de base et le decalage (sans zoom/pan utilisateur).
+
+        Le resultat ne depend que des tailles du widget et du placard : il est
+        memorise et recalcule uniquement lorsque l'une d'elles change.
+        """
+        cle = (self.width(), self.height(), self._placard_w, self._placard_h)
+        cache = self._base_transform_cache
+        if cache is not None and cache[0] == cle:
+            return cache[1]
+        transform = self._calculer_base_transform()
+        self._base_transform_cache = (cle, transform)
+        return transform
+
+    def _calculer_base_transform(self) -> tuple:
+        """Calcul effectif de la transformation de base (sans cache)."""
         if self._placard_w <= 0 or self._placard_h <= 0:
             return 1.0, self._marge, self._marge
 
@@ -148,12 +285,15 @@ class PlacardViewer(QWidget):
 
         return scale, offset_x, offset_y
 
-    def _get_transform(self) -> tuple:
-        """Echelle et decalage avec zoom/pan utilisateur."""
+    def _get_transform(self, avec_pan: bool = True) -> tuple:
+        """Echelle et decalage avec zoom (et pan, sauf avec_pan=False)."""
         base_scale, base_ox, base_oy = self._get_base_transform()
         scale = base_scale * self._zoom
-        ox = base_ox * self._zoom + self._pan_x
-        oy = base_oy * self._zoom + self._pan_y
+        ox = base_ox * self._zoom
+        oy = base_oy * self._zoom
+        if avec_pan:
+            ox += self._pan_x
+            oy += self._pan_y
         return scale, ox, oy
 
     def _to_screen(self, x: float, z: float, scale: float,
@@ -172,9 +312,7 @@ class PlacardViewer(QWidget):
         if not self._rects:
             painter = QPainter(self)
             painter.setPen(QColor("#999"))
-            font = QFont()
-            font.setPointSize(12)
-            painter.setFont(font)
+            painter.setFont(self._font_message)
             painter.drawText(
                 self.rect(), Qt.AlignCenter,
                 "Editez le schema pour voir l'apercu"
@@ -182,147 +320,232 @@ class PlacardViewer(QWidget):
             painter.end()
             return
 
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        # Le rendu complet est conserve dans un QPixmap tant que la vue ne
+        # change pas : les simples reaffichages (fenetre decouverte, menu
+        # ferme...) se reduisent a une copie de l'image. Les commandes de
+        # dessin sont elles-memes enregistrees dans un QPicture par niveau de
+        # zoom : un pan ne fait que rejouer l'enregistrement decale.
+        dpr = self.devicePixelRatioF()
+        cle = (self.width(), self.height(), dpr,
+               self._zoom, self._pan_x, self._pan_y)
+        cache = self._scene_cache
+        if cache is None or cache[0] != cle:
+            pixmap = QPixmap(round(self.width() * dpr),
+                             round(self.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(QColor("white"))
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.translate(self._pan_x, self._pan_y)
+            painter.drawPicture(0, 0, self._picture_scene())
+            painter.end()
+            cache = self._scene_cache = (cle, pixmap)
 
-        scale, ox, oy = self._get_transform()
-
-        # Couleurs de type d'element
-        type_pens = {
-            "mur": (QColor("#D5D5D0"), QColor("#E8E8E4"), 1),
-            "sol": (QColor("#444444"), QColor("#555555"), 1),
-            "separation": (QColor("#8B7355"), QColor("#D2B48C"), 2),
-            "rayon_haut": (QColor("#8B7355"), QColor("#DEB887"), 1),
-            "rayon": (QColor("#8B7355"), QColor("#D2B48C"), 1),
-            "cremaillere_encastree": (QColor("#708090"), QColor("#A0A0A0"), 0.5),
-            "cremaillere_applique": (QColor("#CC0000"), QColor("#FF4444"), 0.5),
-            "panneau_mur": (QColor("#8B7355"), QColor("#D2B48C"), 1),
-            "tasseau": (QColor("#8B6914"), QColor("#DAA520"), 1),
-        }
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, cache[1])
+        painter.end()
 
-        # Dessiner les rectangles par ordre de couche
-        ordre = ["sol", "mur", "panneau_mur", "separation", "rayon_haut", "rayon", "cremaillere_encastree", "cremaillere_applique", "tasseau"]
-        rects_par_type = {}
-        for r in self._rects:
-            rects_par_type.setdefault(r.type_elem, []).append(r)
+    def _picture_scene(self) -> QPicture:
+        """Enregistrement de la scene au zoom courant, sans le pan.
+
+        Reconstruit seulement si la taille du widget ou le zoom a change
+        (la geometrie l'invalide dans ``set_geometrie``/``clear``).
+        """
+        cle = (self.width(), self.height(), self._zoom)
+        cache = self._picture_cache
+        if cache is None or cache[0] != cle:
+            picture = QPicture()
+            painter = QPainter(picture)
+            painter.setRenderHint(QPainter.Antialiasing)
+            self._dessiner_scene(painter, avec_pan=False)
+            painter.end()
+            cache = self._picture_cache = (cle, picture)
+        return cache[1]
 
-        for type_elem in ordre:
-            if type_elem not in rects_par_type:
-                continue
-            pen_color, fill_color, pen_width = type_pens.get(
-                type_elem, (QColor("#333"), QColor("#CCC"), 1)
-            )
+    def _dessiner_scene(self, painter: QPainter, avec_pan: bool = True):
+        """Dessine les elements du placard et les cotations.
 
-            for r in rects_par_type[type_elem]:
-                p1 = self._to_screen(r.x, r.y + r.h, scale, ox, oy)
-                p2 = self._to_screen(r.x + r.w, r.y, scale, ox, oy)
+        Args:
+            painter: QPainter cible.
+            avec_pan: Si False, dessine sans le decalage de pan.
+        """
+        scale, ox, oy = self._get_transform(avec_pan)
+        vue = QTransform(scale, 0, 0, scale, ox, oy)
 
-                rect_screen = QRectF(p1, p2)
+        # Dessiner les rectangles par ordre de couche
+        rects_mm = self._rects_mm
 
-                # Remplissage
-                if type_elem == "sol":
-                    painter.setBrush(QBrush(fill_color, Qt.BDiagPattern))
-                elif type_elem == "mur":
-                    painter.setBrush(QBrush(fill_color, Qt.Dense4Pattern))
-                else:
-                    painter.setBrush(QBrush(fill_color))
+        for type_elem, pen, brush in self._styles_elements:
+            if type_elem not in rects_mm:
+                continue
 
-                painter.setPen(QPen(pen_color, pen_width))
-                painter.drawRect(rect_screen)
+            # Un seul appel drawRects par couche (meme stylo, meme brosse)
+            rects_ecran = [
+                QRectF(vue.map(p1), vue.map(p2))
+                for p1, p2 in rects_mm[type_elem]
+            ]
+            painter.setPen(pen)
+            painter.setBrush(brush)
+            painter.drawRects(rects_ecran)
 
         # --- Cotations ---
         if self._show_dimensions:
             self._dessiner_cotations(painter, scale, ox, oy)
 
-        painter.end()
-
     # --- Fleches de cotation ---
 
     def _fleche_h(self, painter: QPainter, tip: QPointF, vers_droite: bool,
                   taille: float = 8):
         """Fleche horizontale pleine."""
-        s = taille
         d = 1.0 if vers_droite else -1.0
-        poly = QPolygonF([
-            tip,
-            QPointF(tip.x() - d * s, tip.y() - s * 0.35),
-            QPointF(tip.x() - d * s, tip.y() + s * 0.35),
-        ])
-        painter.setBrush(QBrush(painter.pen().color()))
-        painter.drawPolygon(poly)
+        painter.setBrush(painter.pen().brush())
+        painter.drawPolygon(_gabarit_fleche(True, d, taille).translated(tip))
 
     def _fleche_v(self, painter: QPainter, tip: QPointF, vers_bas: bool,
                   taille: float = 8):
         """Fleche verticale pleine."""
-        s = taille
         d = 1.0 if vers_bas else -1.0
-        poly = QPolygonF([
-            tip,
-            QPointF(tip.x() - s * 0.35, tip.y() - d * s),
-            QPointF(tip.x() + s * 0.35, tip.y() - d * s),
-        ])
-        painter.setBrush(QBrush(painter.pen().color()))
-        painter.drawPolygon(poly)
+        painter.setBrush(painter.pen().brush())
+        painter.drawPolygon(_gabarit_fleche(False, d, taille).translated(tip))
 
     # --- Cotations ---
 
+    def _preparer_cotations(self) -> dict:
+        """Precalcule les donnees de cotation independantes du zoom/pan.
+
+        Ces donnees (segments cotes et leurs textes : largeurs des
+        compartiments, hauteurs des separations, niveaux des rayons) ne
+        dependent que de la geometrie : elles sont calculees une fois par
+        ``set_geometrie`` et non a chaque dessin, tout comme la largeur
+        en pixels des textes centres sous une ligne de cote. Les segments
+        trop courts pour etre cotes sont ecartes ici.
+
+        Returns:
+            Dictionnaire des donnees utilisees par ``_dessiner_cotations``.
+        """
+        H = self._placard_h
+        L = self._placard_w
+
+        # Bas du sol (pour decaler les cotations en dessous)
+        sols = self._rects_par_type.get("sol")
+        sol_bas = sols[0].y if sols else 0
+
+        seps = sorted(self._rects_par_type.get("separation", ()),
+                      key=lambda r: r.x)
+
+        # Bords des compartiments
+        edges = [0.0]
+        for s in seps:
+            edges.append(s.x)
+            edges.append(s.x + s.w)
+        edges.append(L)
+
+        # Largeur totale : (texte, largeur du texte en pixels)
+        text_l = f"{L:.0f}"
+        largeur_totale = (text_l, self._fm_cote.horizontalAdvance(text_l))
+
+        # Largeurs des compartiments :
+        # (x gauche, x droite, texte, largeur du texte en pixels)
+        fm_s = self._fm_cote_sep
+        largeurs = []
+        for i in range(0, len(edges), 2):
+            x_l = edges[i]
+            x_r = edges[i + 1]
+            w = x_r - x_l
+            if w > 1:
+                text = f"{w:.0f}"
+                largeurs.append((x_l, x_r, text, fm_s.horizontalAdvance(text)))
+
+        hauteurs = [
+            (h_val, f"Sep. {h_val:.0f}")
+            for h_val in sorted(set(round(s.h) for s in seps), reverse=True)
+        ]
+
+        rayons_par_comp: dict[int, list[float]] = {}
+        for r in self._rects_par_type.get("rayon", ()):
+            if r.label.startswith("Rayon C"):
+                parts = r.label.split()
+                cn = int(parts[1][1:])
+                rayons_par_comp.setdefault(cn, []).append(r.y)
+
+        # Niveaux de chaque compartiment : sol, rayons, puis limite haute
+        # (dessous du rayon haut ou plafond)
+        rh = self._rects_par_type.get("rayon_haut")
+        z_plafond = rh[0].y if rh else H
+        niveaux_rayons = []
+        for comp_n, z_list in sorted(rayons_par_comp.items()):
+            ci = comp_n - 1
+            if ci * 2 + 1 >= len(edges):
+                continue
+            x_mid = (edges[ci * 2] + edges[ci * 2 + 1]) / 2
+            niveaux = [0.0] + sorted(z_list) + [z_plafond]
+            niveaux_rayons.append((x_mid, [
+                (z_bas, z_haut, f"{z_haut - z_bas:.0f}")
+                for z_bas, z_haut in zip(niveaux, niveaux[1:])
+            ]))
+
+        return {
+            "sol_bas": sol_bas,
+            "largeur_totale": largeur_totale,
+            "largeurs": largeurs,
+            "hauteurs": hauteurs,
+            "niveaux_rayons": niveaux_rayons,
+        }
+
     def _dessiner_cotations(self, painter: QPainter, scale: float,
                             ox: float, oy: float):
         """Dessine les cotations (dimensions globales, compartiments, separations)."""
-        font = QFont()
-        font.setPointSize(8)
+        font = self._font_cote
         painter.setFont(font)
-        fm = QFontMetrics(font)
+        h_texte = self._h_cote
 
         H = self._placard_h
         L = self._placard_w
         fl = 8  # taille fleche en pixels
 
-        # Bas du sol (pour decaler les cotations en dessous)
-        sol_rect = next((r for r in self._rects if r.type_elem == "sol"), None)
-        sol_bas = sol_rect.y if sol_rect else 0
+        cotations = self._cotations
+        sol_bas = cotations["sol_bas"]
 
         # === Cotation largeur totale (en bas) ===
         y_cot = sol_bas - 160
         p_left = self._to_screen(0, y_cot, scale, ox, oy)
         p_right = self._to_screen(L, y_cot, scale, ox, oy)
 
-        painter.setPen(QPen(QColor("#333"), 1))
+        painter.setPen(self._pen_cote)
         painter.drawLine(p_left, p_right)
         self._fleche_h(painter, p_left, vers_droite=False, taille=fl)
         self._fleche_h(painter, p_right, vers_droite=True, taille=fl)
 
         p_top_l = self._to_screen(0, 0, scale, ox, oy)
         p_top_r = self._to_screen(L, 0, scale, ox, oy)
-        painter.setPen(QPen(QColor("#999"), 1, Qt.DotLine))
+        painter.setPen(self._pen_rappel)
         painter.drawLine(p_top_l, p_left)
         painter.drawLine(p_top_r, p_right)
 
-        painter.setPen(QPen(QColor("#333"), 1))
-        text_l = f"{L:.0f}"
-        text_w = fm.horizontalAdvance(text_l)
+        painter.setPen(self._pen_cote)
+        text_l, text_w = cotations["largeur_totale"]
         mid_x = (p_left.x() + p_right.x()) / 2 - text_w / 2
-        painter.drawText(QPointF(mid_x, p_left.y() + fm.height()), text_l)
+        painter.drawText(QPointF(mid_x, p_left.y() + h_texte), text_l)
 
         # === Cotation hauteur totale (a gauche) ===
         x_cot = -60
         p_bottom = self._to_screen(x_cot, 0, scale, ox, oy)
         p_top = self._to_screen(x_cot, H, scale, ox, oy)
 
-        painter.setPen(QPen(QColor("#333"), 1))
+        painter.setPen(self._pen_cote)
         painter.drawLine(p_bottom, p_top)
         self._fleche_v(painter, p_bottom, vers_bas=True, taille=fl)
         self._fleche_v(painter, p_top, vers_bas=False, taille=fl)
 
         p_orig_b = self._to_screen(0, 0, scale, ox, oy)
         p_orig_t = self._to_screen(0, H, scale, ox, oy)
-        painter.setPen(QPen(QColor("#999"), 1, Qt.DotLine))
+        painter.setPen(self._pen_rappel)
         painter.drawLine(p_orig_b, p_bottom)
         painter.drawLine(p_orig_t, p_top)
 
-        painter.setPen(QPen(QColor("#333"), 1))
+        painter.setPen(self._pen_cote)
         text_h = f"{H:.0f}"
-        mid_y = (p_bottom.y() + p_top.y()) / 2 + fm.height() / 2
+        mid_y = (p_bottom.y() + p_top.y()) / 2 + h_texte / 2
         painter.save()
         painter.translate(p_top.x() - 5, mid_y)
         painter.rotate(-90)
@@ -330,57 +553,35 @@ class PlacardViewer(QWidget):
         painter.restore()
 
         # === Cotations compartiments et separations ===
-        seps = sorted(
-            [r for r in self._rects if r.type_elem == "separation"],
-            key=lambda r: r.x
-        )
-        font_s = QFont()
-        font_s.setPointSize(7)
-        painter.setFont(font_s)
-        fm_s = QFontMetrics(font_s)
+        painter.setFont(self._font_cote_sep)
+        h_texte_s = self._h_cote_sep
 
         # --- Largeurs compartiments (en bas, au-dessus de la largeur totale) ---
-        edges = [0.0]
-        for s in seps:
-            edges.append(s.x)
-            edges.append(s.x + s.w)
-        edges.append(L)
-
         z_cot_bas = sol_bas - 60
-        for i in range(0, len(edges), 2):
-            x_l = edges[i]
-            x_r = edges[i + 1]
-            w = x_r - x_l
-            if w <= 1:
-                continue
-
+        for x_l, x_r, text, tw in cotations["largeurs"]:
             p_l = self._to_screen(x_l, z_cot_bas, scale, ox, oy)
             p_r = self._to_screen(x_r, z_cot_bas, scale, ox, oy)
 
             # Traits de rappel
             p_hl = self._to_screen(x_l, 0, scale, ox, oy)
             p_hr = self._to_screen(x_r, 0, scale, ox, oy)
-            painter.setPen(QPen(QColor("#AAD4FF"), 1, Qt.DotLine))
+            painter.setPen(self._pen_rappel_comp)
             painter.drawLine(p_hl, p_l)
             painter.drawLine(p_hr, p_r)
 
             # Ligne de cote + fleches
-            painter.setPen(QPen(QColor("#0066CC"), 1))
+            painter.setPen(self._pen_cote_comp)
             painter.drawLine(p_l, p_r)
             self._fleche_h(painter, p_l, vers_droite=False, taille=fl)
             self._fleche_h(painter, p_r, vers_droite=True, taille=fl)
 
             # Texte
-            text = f"{w:.0f}"
-            tw = fm_s.horizontalAdvance(text)
             mid_x = (p_l.x() + p_r.x()) / 2 - tw / 2
-            painter.drawText(QPointF(mid_x, p_l.y() + fm_s.height()), text)
+            painter.drawText(QPointF(mid_x, p_l.y() + h_texte_s), text)
 
         # --- Hauteurs separations (a droite) ---
-        hauteurs = sorted(set(round(s.h) for s in seps), reverse=True)
-
         x_base = L + 36
-        for idx, h_val in enumerate(hauteurs):
+        for idx, (h_val, text) in enumerate(cotations["hauteurs"]):
             x_cot_r = x_base + idx * 44
 
             p_b = self._to_screen(x_cot_r, 0, scale, ox, oy)
@@ -389,19 +590,18 @@ class PlacardViewer(QWidget):
             # Traits de rappel
             p_ref_b = self._to_screen(L, 0, scale, ox, oy)
             p_ref_t = self._to_screen(L, h_val, scale, ox, oy)
-            painter.setPen(QPen(QColor("#FFD4AA"), 1, Qt.DotLine))
+            painter.setPen(self._pen_rappel_sep)
             painter.drawLine(QPointF(p_ref_b.x(), p_b.y()), p_b)
             painter.drawLine(QPointF(p_ref_t.x(), p_t.y()), p_t)
 
             # Ligne de cote + fleches
-            painter.setPen(QPen(QColor("#CC6600"), 1))
+            painter.setPen(self._pen_cote_sep)
             painter.drawLine(p_b, p_t)
             self._fleche_v(painter, p_b, vers_bas=True, taille=fl)
             self._fleche_v(painter, p_t, vers_bas=False, taille=fl)
 
             # Texte
-            text = f"Sep. {h_val:.0f}"
-            mid_y = (p_b.y() + p_t.y()) / 2 + fm_s.height() / 2
+            mid_y = (p_b.y() + p_t.y()) / 2 + h_texte_s / 2
             painter.save()
             painter.translate(p_t.x() + 5, mid_y)
             painter.rotate(-90)
@@ -411,50 +611,15 @@ class PlacardViewer(QWidget):
         painter.setFont(font)
 
         # --- Cotations hauteurs entre rayons par compartiment ---
-        rayons_par_comp: dict[int, list[float]] = {}
-        for r in self._rects:
-            if r.type_elem == "rayon" and r.label.startswith("Rayon C"):
-                parts = r.label.split()
-                cn = int(parts[1][1:])
-                rayons_par_comp.setdefault(cn, []).append(r.y)
-
-        if rayons_par_comp:
-            # Limite haute : dessous du rayon haut ou plafond
-            rh = next((r for r in self._rects if r.type_elem == "rayon_haut"), None)
-            z_plafond = rh.y if rh else H
-
-            # Bords des compartiments
-            edges_comp = [0.0]
-            for s in seps:
-                edges_comp.append(s.x)
-                edges_comp.append(s.x + s.w)
-            edges_comp.append(L)
-
-            coul_vert = QColor(0, 140, 70)
-            font_r = QFont()
-            font_r.setPointSize(6)
-            painter.setFont(font_r)
-            fm_r = QFontMetrics(font_r)
-
-            for comp_n, z_list in sorted(rayons_par_comp.items()):
-                z_sorted = sorted(z_list)
-                ci = comp_n - 1
-                if ci * 2 + 1 >= len(edges_comp):
-                    continue
+        niveaux_rayons = cotations["niveaux_rayons"]
+        if niveaux_rayons:
+            painter.setFont(self._font_cote_rayon)
+            h_texte_r = self._h_cote_rayon
 
-                x_l = edges_comp[ci * 2]
-                x_r = edges_comp[ci * 2 + 1]
-                x_mid = (x_l + x_r) / 2
-
-                niveaux = [0.0] + z_sorted + [z_plafond]
-
-                painter.setPen(QPen(coul_vert, 1))
-
-                for i in range(len(niveaux) - 1):
-                    z_bas = niveaux[i]
-                    z_haut = niveaux[i + 1]
-                    h_val = z_haut - z_bas
+            for x_mid, segments in niveaux_rayons:
+                painter.setPen(self._pen_cote_rayon)
 
+                for z_bas, z_haut, text in segments:
                     p_b = self._to_screen(x_mid, z_bas, scale, ox, oy)
                     p_t = self._to_screen(x_mid, z_haut, scale, ox, oy)
 
@@ -464,8 +629,7 @@ class PlacardViewer(QWidget):
                     self._fleche_v(painter, p_t, vers_bas=False, taille=6)
 
                     # Texte a droite de la ligne
-                    text = f"{h_val:.0f}"
-                    mid_y = (p_b.y() + p_t.y()) / 2 + fm_r.height() / 4
+                    mid_y = (p_b.y() + p_t.y()) / 2 + h_texte_r / 4
                     painter.drawText(QPointF(p_b.x() + 6, mid_y), text)
 
             painter.setFont(font)
@@ -505,49 +669,7 @@ class PlacardViewer(QWidget):
         painter.setRenderHint(QPainter.Antialiasing)
         painter.scale(factor, factor)
 
-        scale, ox, oy = self._get_transform()
-
-        type_pens = {
-            "mur": (QColor("#D5D5D0"), QColor("#E8E8E4"), 1),
-            "sol": (QColor("#444444"), QColor("#555555"), 1),
-            "separation": (QColor("#8B7355"), QColor("#D2B48C"), 2),
-            "rayon_haut": (QColor("#8B7355"), QColor("#DEB887"), 1),
-            "rayon": (QColor("#8B7355"), QColor("#D2B48C"), 1),
-            "cremaillere_encastree": (QColor("#708090"), QColor("#A0A0A0"), 0.5),
-            "cremaillere_applique": (QColor("#CC0000"), QColor("#FF4444"), 0.5),
-            "panneau_mur": (QColor("#8B7355"), QColor("#D2B48C"), 1),
-            "tasseau": (QColor("#8B6914"), QColor("#DAA520"), 1),
-        }
-
-        ordre = [
-            "sol", "mur", "panneau_mur", "separation", "rayon_haut",
-            "rayon", "cremaillere_encastree", "cremaillere_applique", "tasseau",
-        ]
-        rects_par_type = {}
-        for r in self._rects:
-            rects_par_type.setdefault(r.type_elem, []).append(r)
-
-        for type_elem in ordre:
-            if type_elem not in rects_par_type:
-                continue
-            pen_color, fill_color, pen_width = type_pens.get(
-                type_elem, (QColor("#333"), QColor("#CCC"), 1)
-            )
-            for r in rects_par_type[type_elem]:
-                p1 = self._to_screen(r.x, r.y + r.h, scale, ox, oy)
-                p2 = self._to_screen(r.x + r.w, r.y, scale, ox, oy)
-                rect_screen = QRectF(p1, p2)
-                if type_elem == "sol":
-                    painter.setBrush(QBrush(fill_color, Qt.BDiagPattern))
-                elif type_elem == "mur":
-                    painter.setBrush(QBrush(fill_color, Qt.Dense4Pattern))
-                else:
-                    painter.setBrush(QBrush(fill_color))
-                painter.setPen(QPen(pen_color, pen_width))
-                painter.drawRect(rect_screen)
-
-        if self._show_dimensions:
-            self._dessiner_cotations(painter, scale, ox, oy)
+        self._dessiner_scene(painter)
 
         painter.end()
         return pixmap
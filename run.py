@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """Point d'entree de PlacardCAD."""
 
-from placardcad.app import run
-
 if __name__ == "__main__":
+    # Import sous le garde : les processus de calcul (demarres en spawn)
+    # reimportent ce module sans charger l'interface PyQt5
+    from placardcad.app import run
     run()
@@ -139,3 +139,56 @@ class TestExportPDF:
             assert os.path.getsize(path) > 1000
         finally:
             os.unlink(path)
+
+
+class TestLegendeDebit:
+    """Tests de la disposition de la legende des plans de debit."""
+
+    def test_retour_a_la_ligne(self):
+        from placardcad.pdf_export import _disposer_legende
+        positions = _disposer_legende(
+            ["a", "b", "c"], [30.0, 30.0, 30.0], 0, 90, 100, 0)
+        assert [(x, y) for x, y, _ in positions] == [
+            (0, 100), (42.0, 100), (0, 92)]
+
+    def test_arret_sous_y_min(self):
+        from placardcad.pdf_export import _disposer_legende
+        positions = _disposer_legende(
+            ["a", "b", "c"], [80.0, 80.0, 80.0], 0, 100, 10, 0)
+        assert [txt for _, _, txt in positions] == ["a", "b"]
+
+    def test_largeur_texte_conforme_reportlab(self):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from placardcad.pdf_export import _largeur_texte
+        for txt in ("P1/A2/N03=Rayon C1", "Separation", "Equerre ete"):
+            for police in ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique"):
+                assert _largeur_texte(txt, police, 5.5) == pytest.approx(
+                    stringWidth(txt, police, 5.5))
+
+
+class TestPolicePDF:
+    """Tests du suivi de la police courante des canvas PDF."""
+
+    def test_police_reemise_apres_restore_et_page(self):
+        import io
+        import re
+        from reportlab.pdfgen import canvas
+        from placardcad.pdf_export import (
+            _police, _etat_graphique, _nouvelle_page,
+        )
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf, pageCompression=0)
+        _police(c, "Helvetica", 8)
+        with _etat_graphique(c):
+            _police(c, "Helvetica-Bold", 12)
+        # restoreState est revenu a Helvetica 8 : la police est re-emise
+        # une fois, puis l'appel redondant n'emet plus rien
+        _police(c, "Helvetica-Bold", 12)
+        _police(c, "Helvetica-Bold", 12)
+        _nouvelle_page(c)
+        _police(c, "Helvetica", 8)
+        c.save()
+        polices = re.findall(r"/F\d+ [\d.]+ Tf", buf.getvalue().decode("latin1"))
+        # Chaque page commence par la police initiale de ReportLab (/F1 12)
+        assert polices == ["/F1 12 Tf", "/F1 8 Tf", "/F2 12 Tf", "/F2 12 Tf",
+                           "/F1 12 Tf", "/F1 8 Tf"]
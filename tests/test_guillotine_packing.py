@@ -0,0 +1,44 @@
+"""
+Tests unitaires pour le module guillotine_packing.
+"""
+
+import guillotine_packing
+from guillotine_packing import ParametresDebit, PieceDebit, optimiser_debit
+
+
+def _pieces_deux_groupes():
+    """Pieces reparties sur deux groupes (epaisseur, couleur)."""
+    return [
+        PieceDebit("Rayon", "R1", 800, 500, 19, "Chene", quantite=6),
+        PieceDebit("Separation", "S1", 2400, 580, 19, "Chene", quantite=2),
+        PieceDebit("Fond", "F1", 1200, 600, 10, "Blanc", quantite=3,
+                   sens_fil=False),
+    ]
+
+
+def _signature(plans):
+    """Resume comparable d'une liste de plans de decoupe."""
+    return [
+        (plan.epaisseur, plan.couleur,
+         [(p.piece.reference, p.x, p.y, p.rotation) for p in plan.placements])
+        for plan in plans
+    ]
+
+
+class TestOptimiserDebit:
+    """Tests de l'optimisation de debit."""
+
+    def test_toutes_pieces_placees(self):
+        plans, hors_gabarit = optimiser_debit(
+            _pieces_deux_groupes(), ParametresDebit())
+        assert not hors_gabarit
+        assert sum(len(plan.placements) for plan in plans) == 11
+
+    def test_parallele_identique_au_sequentiel(self, monkeypatch):
+        params = ParametresDebit()
+        plans_seq, _ = optimiser_debit(_pieces_deux_groupes(), params)
+        monkeypatch.setattr(guillotine_packing, "SEUIL_PACKING_PARALLELE", 0)
+        # Au moins deux coeurs, sinon le pool n'est pas utilise
+        monkeypatch.setattr(guillotine_packing.os, "cpu_count", lambda: 2)
+        plans_par, _ = optimiser_debit(_pieces_deux_groupes(), params)
+        assert _signature(plans_par) == _signature(plans_seq)
@@ -5,7 +5,7 @@ Tests unitaires pour le constructeur de placard (geometrie 2D et fiche).
 import pytest
 from placardcad.schema_parser import schema_vers_config
 from placardcad.placard_builder import (
-    generer_geometrie_2d, calculer_largeurs_compartiments,
+    generer_geometrie_2d, generer_fiche, calculer_largeurs_compartiments,
     calculer_dimensions_rayon, Rect, PieceInfo, FicheFabrication,
 )
 
@@ -58,6 +58,16 @@ class TestCalculLargeurs:
         ratio = largeurs[0] / largeurs[1]
         assert abs(ratio - 500 / 800) < 0.01
 
+    def test_largeurs_proportions(self):
+        config = _config_3comp()
+        config["mode_largeur"] = "proportions"
+        config["largeurs_compartiments"] = "1/4, 1/2, 1"
+        largeurs = calculer_largeurs_compartiments(config)
+        disponible = (config["largeur"] - len(config["separations"])
+                      * config["panneau_separation"]["epaisseur"])
+        assert largeurs == pytest.approx(
+            [disponible / 7, disponible * 2 / 7, disponible * 4 / 7])
+
 
 class TestGenererGeometrie:
     """Tests de la generation de geometrie 2D."""
@@ -122,6 +132,37 @@ class TestGenererGeometrie:
                 assert r.x + r.w <= L + 1, f"{r.label} depasse a droite"
                 assert r.y + r.h <= H + 1, f"{r.label} depasse en haut"
 
+    def test_generer_fiche_identique(self):
+        config = _config_3comp()
+        _, fiche = generer_geometrie_2d(config)
+        seule = generer_fiche(config)
+        attrs = PieceInfo.__slots__
+        assert ([[getattr(p, a) for a in attrs] for p in seule.pieces]
+                == [[getattr(p, a) for a in attrs] for p in fiche.pieces])
+        assert seule.quincaillerie == fiche.quincaillerie
+
+    def test_donnees_debit_partageables(self):
+        """Les donnees de debit memorisees servent a plusieurs amenagements."""
+        from placardcad.optimisation_debit import (
+            donnees_debit_fiche, pieces_depuis_donnees, pieces_depuis_fiche,
+        )
+        _, fiche = generer_geometrie_2d(_config_2comp())
+        donnees = donnees_debit_fiche(fiche)
+        assert all(isinstance(d, tuple) for d in donnees)
+        pieces_a1 = pieces_depuis_donnees(donnees, 1, 1)
+        pieces_a2 = pieces_depuis_donnees(donnees, 1, 2)
+        assert pieces_a1 == pieces_depuis_fiche(fiche, 1, 1)
+        assert all(a.reference != b.reference
+                   for a, b in zip(pieces_a1, pieces_a2))
+
+    def test_couleur_hors_bornes(self):
+        """Une couleur stockee en 0-255 (ou negative) est bornee, sans erreur."""
+        config = _config_2comp()
+        config["panneau_rayon"]["couleur_rgb"] = [210, 180, -0.1]
+        rects, _ = generer_geometrie_2d(config)
+        rayons = [r for r in rects if r.type_elem == "rayon"]
+        assert rayons and all(r.couleur == "#ffff00" for r in rayons)
+
 
 class TestSeparationTouteHauteur:
     """Tests des separations toute hauteur."""